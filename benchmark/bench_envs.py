@@ -0,0 +1,192 @@
+# Scaling benchmarks of prima vita environment (whole headless runs over a grid of parameters)
+
+# Import required libraries
+import contextlib
+import itertools
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Peak RSS is read from the resource module (not available on Windows)
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Parameters varied by the scaling grid and their default values
+GRID = {
+    "initial_population": [10, 50, 100],
+    "initial_food": [75, 300],
+    "sensory_radius": [100, 200],
+    "max_allowed_population": [100, 500],
+}
+
+
+def peak_rss():
+    """
+    Return the peak resident set size of the current process in bytes (None if unknown)
+    """
+
+    if resource is None:
+        return None
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes and macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def directory_size(path):
+    """
+    Return the total size in bytes of all files under a directory
+    """
+
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            size += os.path.getsize(os.path.join(root, name))
+
+    return size
+
+
+def configurations(grid=GRID):
+    """
+    Return every combination of the values of a grid
+
+    Params
+    ======
+    grid (dict)
+        : Mapping from parameter name to the list of its values
+
+    Returns
+    =======
+    configurations (list)
+        : One params_dic per combination
+    """
+
+    names = list(grid.keys())
+
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def run_config(params_dic, ticks, seed):
+    """
+    Run prima vita environment headless for a number of ticks in the current process and measure it
+
+    Params
+    ======
+    params_dic (dict)
+        : Parameters of the environment
+    ticks      (int)
+        : Number of ticks to run
+    seed       (int)
+        : Seed of the random streams of the environment
+
+    Returns
+    =======
+    result (dict)
+        : Parameters, stop reason, ticks run, wall time, throughput (ticks and agent steps per
+          second), peak RSS, log bytes written and time spent in every phase of a tick
+    """
+
+    # Import here so that SDL is configured before pygame is loaded
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from pygeneses.envs.prima_vita import PrimaVita
+    from pygeneses.envs.prima_vita.event_log import read_ticks
+
+    params_dic = dict(params_dic, profile=True, seed=seed)
+
+    # Logs are written to a temporary directory (log_dir is relative to the working directory)
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="pygeneses_bench_")
+    os.chdir(work_dir)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            env = PrimaVita(params_dic=params_dic, log_dir_info="bench")
+            start = time.perf_counter()
+            env.run(max_ticks=ticks)
+            seconds = time.perf_counter() - start
+            env.life_log.close()
+
+        # Agents acting in a tick are the ones alive at the end of the previous tick
+        counters = read_ticks(env.log_dir)
+        agent_steps = int(params_dic["initial_population"]) + int(
+            counters["alive"][:-1].sum()
+        )
+
+        result = {
+            "params": {k: v for k, v in params_dic.items() if k not in ("profile", "seed")},
+            "stop_reason": env.stop_reason,
+            "ticks": len(counters),
+            "seconds": seconds,
+            "ticks_per_sec": len(counters) / seconds if seconds > 0 else 0.0,
+            "agent_steps": agent_steps,
+            "agent_steps_per_sec": agent_steps / seconds if seconds > 0 else 0.0,
+            "births": env.births,
+            "peak_rss": peak_rss(),
+            "log_bytes": directory_size(env.log_dir),
+            "phases": env.profiler.summary(),
+        }
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return result
+
+
+def run_config_isolated(params_dic, ticks, seed):
+    """
+    Run run_config in a fresh process (so that peak RSS is that of a single run)
+    """
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(run_config, (params_dic, ticks, seed))
+
+
+def run_scaling(grid=GRID, ticks=50, seed=0, isolated=True, verbose=True):
+    """
+    Run every configuration of a grid
+
+    Params
+    ======
+    grid     (dict)
+        : Mapping from parameter name to the list of its values (optional)
+    ticks    (int)
+        : Number of ticks of every run (optional)
+    seed     (int)
+        : Seed of the random streams of every run (optional)
+    isolated (bool)
+        : Whether to run every configuration in a fresh process (optional)
+    verbose  (bool)
+        : Whether to print a line per configuration (optional)
+
+    Returns
+    =======
+    results (list)
+        : Result of every configuration (see run_config)
+    """
+
+    run = run_config_isolated if isolated else run_config
+
+    results = []
+    for params_dic in configurations(grid):
+        result = run(params_dic, ticks, seed)
+        results.append(result)
+
+        if verbose:
+            print(
+                "%-88s %8.1f ticks/s %10.1f steps/s %8.1f MB %10d log bytes"
+                % (
+                    ", ".join("%s=%s" % item for item in params_dic.items()),
+                    result["ticks_per_sec"],
+                    result["agent_steps_per_sec"],
+                    (result["peak_rss"] or 0) / 2 ** 20,
+                    result["log_bytes"],
+                )
+            )
+
+    return results
@@ -0,0 +1,185 @@
+# Micro benchmarks of the hot functions of prima vita environment and its RL model
+
+# Import required libraries
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+
+# Functions measured
+BENCHMARKS = (
+    "get_current_state",
+    "players_in_env",
+    "predict_action",
+    "update_all_agents",
+    "write_data",
+)
+
+
+def timed(function, repeats, setup=None, teardown=None):
+    """
+    Call a function repeatedly and measure it
+
+    Params
+    ======
+    function (callable)
+        : Function to call (returns the number of calls it made of the function measured)
+    repeats  (int)
+        : Number of times to call function
+    setup    (callable)
+        : Function called before every call of function, not measured (optional)
+    teardown (callable)
+        : Function called after every call of function, not measured (optional)
+
+    Returns
+    =======
+    result (dict)
+        : Total number of calls, total time (seconds) and mean time per call (microseconds)
+    """
+
+    calls = 0
+    seconds = 0.0
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        calls += function()
+        seconds += time.perf_counter() - start
+        if teardown is not None:
+            teardown()
+
+    return {
+        "calls": calls,
+        "seconds": seconds,
+        "us_per_call": 1e6 * seconds / calls if calls > 0 else 0.0,
+    }
+
+
+def run_micro(params_dic=None, warmup_ticks=10, repeats=5, seed=0, verbose=True):
+    """
+    Measure get_current_state, players_in_env, predict_action, update_all_agents and write_data on
+    an environment run headless for a few ticks
+
+    Params
+    ======
+    params_dic   (dict)
+        : Parameters of the environment (optional)
+    warmup_ticks (int)
+        : Number of ticks run before measuring (and between updates of the model) (optional)
+    repeats      (int)
+        : Number of repetitions of every benchmark (optional)
+    seed         (int)
+        : Seed of the random streams of the environment (optional)
+    verbose      (bool)
+        : Whether to print a line per benchmark (optional)
+
+    Returns
+    =======
+    results (dict)
+        : Mapping from function name to its measurements (see timed)
+    """
+
+    # Import here so that SDL is configured before pygame is loaded
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from pygeneses.envs.prima_vita import PrimaVita
+    from pygeneses.envs.prima_vita.life_log import LifeLogWriter
+
+    # The model is updated only by update_all_agents (so that its buffers fill up between updates)
+    params_dic = dict(
+        {"initial_population": 50, "initial_food": 150, "log_writer": "sync"},
+        **(params_dic or {})
+    )
+    params_dic["model_updates"] = 10 ** 9
+    params_dic["seed"] = seed
+
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="pygeneses_bench_")
+    os.chdir(work_dir)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            env = PrimaVita(params_dic=params_dic, log_dir_info="bench")
+            env.run(max_ticks=warmup_ticks)
+            results = measure(env, warmup_ticks, repeats, LifeLogWriter)
+            env.life_log.close()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if verbose:
+        for name, result in results.items():
+            print(
+                "%-20s %8d calls %12.2f us per call"
+                % (name, result["calls"], result["us_per_call"])
+            )
+
+    return results
+
+
+def measure(env, warmup_ticks, repeats, writer_class):
+    """
+    Run all micro benchmarks on an environment (see run_micro)
+    """
+
+    results = {}
+
+    # Full rebuild of the states of all agents
+    def get_current_state():
+        env.get_current_state()
+        return 1
+
+    results["get_current_state"] = timed(get_current_state, repeats)
+
+    # Neighbour search from every alive agent
+    def players_in_env():
+        agents = env.alive_agents()
+        for idx in agents:
+            env.players_in_env(env.players[idx])
+        return len(agents)
+
+    results["players_in_env"] = timed(players_in_env, repeats)
+
+    # Forward pass of every alive agent (log probabilities are dropped so the model isn't updated)
+    states, _ = env.get_current_state()
+
+    def predict_action():
+        agents = env.alive_agents()
+        for idx in agents:
+            env.model.predict_action(idx, states[idx])
+            env.model.saved_log_probs[idx].pop()
+        return len(agents)
+
+    results["predict_action"] = timed(predict_action, repeats)
+
+    # Update of all agents on the rewards of warmup_ticks ticks
+    def run_ticks():
+        env.run(max_ticks=env.time + warmup_ticks)
+
+    def update_all_agents():
+        env.model.update_all_agents(env.leading_zeros)
+        return 1
+
+    results["update_all_agents"] = timed(update_all_agents, repeats, setup=run_ticks)
+
+    # Lives of all alive agents written to a separate life log
+    log_dir = os.path.join(env.log_dir, "write_data")
+    life_log = None
+
+    def open_log():
+        nonlocal life_log
+        os.mkdir(log_dir)
+        life_log = writer_class(log_dir, env.log_segment_size)
+
+    def write_data():
+        agents = env.alive_agents()
+        for idx in agents:
+            env.players[idx].write_data(env.time, len(agents), life_log)
+        life_log.close()
+        return len(agents)
+
+    def remove_log():
+        shutil.rmtree(log_dir)
+
+    results["write_data"] = timed(write_data, repeats, setup=open_log, teardown=remove_log)
+
+    return results
@@ -0,0 +1,193 @@
+# Benchmark suite of pygeneses, runs the scaling grid and the micro benchmarks and saves results as
+# JSON, or compares two saved results
+#
+#   python main.py --output results.json
+#   python main.py --compare baseline.json results.json
+
+# Import required libraries
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import numpy as np
+import torch
+
+# Run headless and quietly (also in the processes of isolated scaling runs, which inherit it)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from bench_envs import GRID, run_scaling
+from bench_micro import BENCHMARKS, run_micro
+
+# Smaller grid for a quick check
+QUICK_GRID = {
+    "initial_population": [10, 50],
+    "initial_food": [75],
+    "sensory_radius": [100],
+    "max_allowed_population": [100],
+}
+
+
+def git_commit():
+    """
+    Return the commit the benchmarks are run on (None outside of a git repository)
+    """
+
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata(args):
+    """
+    Return the build and the machine the benchmarks are run on
+    """
+
+    import pygeneses
+
+    return {
+        "date": datetime.datetime.now().isoformat(),
+        "commit": git_commit(),
+        "pygeneses": pygeneses.__version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "torch": torch.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "args": vars(args),
+    }
+
+
+def compare(baseline, results, tolerance):
+    """
+    Print the change of every benchmark between two results
+
+    Params
+    ======
+    baseline  (dict)
+        : Results of the reference build
+    results   (dict)
+        : Results of the build to check
+    tolerance (float)
+        : Relative slowdown above which a benchmark is a regression
+
+    Returns
+    =======
+    regressions (list)
+        : Names of benchmarks slower than baseline by more than tolerance
+    """
+
+    regressions = []
+
+    def report(name, old, new, higher_is_better):
+        if not old or not new:
+            return
+        slowdown = old / new - 1 if higher_is_better else new / old - 1
+        regressed = slowdown > tolerance
+        if regressed:
+            regressions.append(name)
+        print(
+            "%-88s %14.2f %14.2f %+8.1f%%%s"
+            % (name, old, new, -100 * slowdown, "  REGRESSION" if regressed else "")
+        )
+
+    # Scaling runs are matched by their parameters
+    print("%-88s %14s %14s %9s" % ("scaling (agent steps per second)", "baseline", "new", "change"))
+    old_runs = {json.dumps(run["params"], sort_keys=True): run for run in baseline["scaling"]}
+    for run in results["scaling"]:
+        key = json.dumps(run["params"], sort_keys=True)
+        if key in old_runs:
+            name = ", ".join("%s=%s" % item for item in run["params"].items())
+            report(
+                name,
+                old_runs[key]["agent_steps_per_sec"],
+                run["agent_steps_per_sec"],
+                True,
+            )
+
+    print()
+    print("%-88s %14s %14s %9s" % ("micro (us per call)", "baseline", "new", "change"))
+    for name in BENCHMARKS:
+        if name in baseline["micro"] and name in results["micro"]:
+            report(
+                name,
+                baseline["micro"][name]["us_per_call"],
+                results["micro"][name]["us_per_call"],
+                False,
+            )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite of pygeneses")
+    parser.add_argument("--output", default="benchmark.json", help="File to save results to")
+    parser.add_argument("--ticks", type=int, default=50, help="Ticks of every scaling run")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of all runs")
+    parser.add_argument("--repeats", type=int, default=5, help="Repetitions of micro benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Run a small scaling grid")
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Run scaling configurations in this process (peak RSS is then cumulative)",
+    )
+    parser.add_argument("--skip-scaling", action="store_true", help="Skip the scaling grid")
+    parser.add_argument("--skip-micro", action="store_true", help="Skip the micro benchmarks")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "RESULTS"),
+        help="Compare two saved results instead of running benchmarks",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Relative slowdown reported as a regression by --compare",
+    )
+    args = parser.parse_args()
+
+    # Compare saved results (exit status is 1 if any benchmark regressed)
+    if args.compare:
+        with open(args.compare[0]) as file:
+            baseline = json.load(file)
+        with open(args.compare[1]) as file:
+            results = json.load(file)
+        regressions = compare(baseline, results, args.tolerance)
+        print()
+        print("%d regression(s)" % len(regressions))
+        sys.exit(1 if regressions else 0)
+
+    results = {"meta": metadata(args), "scaling": [], "micro": {}}
+
+    if not args.skip_scaling:
+        print("Scaling")
+        results["scaling"] = run_scaling(
+            QUICK_GRID if args.quick else GRID,
+            ticks=args.ticks,
+            seed=args.seed,
+            isolated=not args.in_process,
+        )
+
+    if not args.skip_micro:
+        print("Micro benchmarks")
+        results["micro"] = run_micro(repeats=args.repeats, seed=args.seed)
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print("Results saved to", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
-import glob
 import os
 import sys
-import numpy as np
+
+from pygeneses.envs.prima_vita.life_log import LifeLogReader
 
 folder = sys.argv[1]
 target = folder + "_english"
@@ -9,66 +9,50 @@ target = folder + "_english"
 if not os.path.exists(target):
     os.mkdir(target)
 
-files = glob.glob(os.path.join(folder, "*.npy"))
+reader = LifeLogReader(folder)
 
 id_to_action = {
-    "0": "left",
-    "1": "right",
-    "2": "up",
-    "3": "down",
-    "4": "up and left",
-    "5": "up and right",
-    "6": "down and left",
-    "7": "down and right",
-    "8": "stay",
-    "9": "ingestion",
-    "10": "asexual reproduction",
-    "11": "sexual reproduction",
-    "12": "fight",
+    0: "left",
+    1: "right",
+    2: "up",
+    3: "down",
+    4: "up and left",
+    5: "up and right",
+    6: "down and left",
+    7: "down and right",
+    8: "stay",
+    9: "ingestion",
+    10: "asexual reproduction",
+    11: "sexual reproduction",
+    12: "fight",
 }
 
-for filename in files:
-
-    contents = np.load(filename, allow_pickle=True)
-
-    f_target = open(os.path.join(target, os.path.basename(filename)), "w")
-
-    for line in contents:
-
-        if line[0] == "10":
-            f_target.write(
-                f"The player performed action {id_to_action[str(line[0])]} at time"
-                f" {line[1]} and earned the reward of {line[2]} and its energy is"
-                f" {line[3]}. The number of offspring produced is {line[4]}.\n"
-            )
-
-        if line[0] == "11":
-            f_target.write(
-                f"The player performed action {id_to_action[str(line[0])]} at time"
-                f" {line[1]} and earned the reward of {line[2]} and its energy is"
-                f" {line[3]}. The number of offspring produced is {line[4]} and the"
-                f" mate of player is {line[-1]}.\n"
-            )
-
-        if line[0] == "12":
-            f_target.write(
-                f"The player performed action {id_to_action[str(line[0])]} at time"
-                f" {line[1]} and earned the reward of {line[2]} and its energy is"
-                f" {line[3]}. The player fought with {line[4]}.\n"
-            )
-
-        if line[0] == "Failed":
-            f_target.write(
-                f"The player failed to perform the action {id_to_action[line[0][8:-1]]}"
-                f" at time {line[1]} and earned the reward of {line[2]} and its energy"
-                f" is {line[3]}.\n"
-            )
-
-        else:
-            f_target.write(
-                f"The player performed action {id_to_action[str(line[0])]} at time"
-                f" {line[1]} and earned the reward of {line[2]} and its energy is"
-                f" {line[3]}\n"
-            )
+for agent in reader.agents:
+
+    born_at, index = int(agent["born_at"]), int(agent["index"])
+
+    f_target = open(os.path.join(target, f"{born_at}-{index}.txt"), "w")
+
+    for line in reader.actions(born_at, index):
+
+        action = int(line["action"])
+        result = "performed" if line["reward"] >= 0 else "failed to perform"
+
+        f_target.write(
+            f"The player {result} action {id_to_action[action]} at time"
+            f" {line['time']} and earned the reward of {line['reward']:g} and its energy is"
+            f" {line['energy']}"
+        )
+
+        if action in (10, 11) and line["num_offspring"] >= 0:
+            f_target.write(f". The number of offspring produced is {line['num_offspring']}")
+
+        if action == 11 and line["mate"] != -1:
+            f_target.write(f" and the mate of player is {line['mate']}")
+
+        if action == 12 and line["enemy"] != -1:
+            f_target.write(f". The player fought with {line['enemy']}")
+
+        f_target.write(".\n")
 
     f_target.close()
@@ -1,2 +1,5 @@
 # Import PrimaVita class
 from pygeneses.envs.prima_vita.prima_vita import PrimaVita
+
+# Import SubprocVecPrimaVita class
+from pygeneses.envs.prima_vita.vec_env import SubprocVecPrimaVita
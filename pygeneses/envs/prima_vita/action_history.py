@@ -0,0 +1,205 @@
+# ActionHistory class for the compact action history of a player in prima vita environment
+
+# Import required libraries
+import numpy as np
+
+# Import growable arrays and the rows of the life log (the history is kept in the same rows)
+from .growable_array import GrowableArray
+from .life_log import ACTION_DTYPE
+
+# Levels of detail of the state captured with every action
+HISTORY_DETAILS = ("full", "summary", "none")
+
+
+class ActionHistory:
+    """
+    Action history of a player kept in typed growable arrays, one ACTION_DTYPE row per action (the
+    rows of the life log, offsets start at 0) plus ragged arrays of offspring ids and of the vectors
+    of food particles and players seen
+
+    How much of the state is captured with every action is set by detail, full - vectors of all food
+    particles and players seen (needed to replay the agent's life), summary - only their counts and
+    the distances to the nearest ones, none - nothing (counts and distances are -1)
+
+    Data members
+    ============
+    detail         (str)
+        : Level of detail of the captured state (full, summary or none)
+    x              (float)
+        : Initial x coordinate of the player
+    y              (float)
+        : Initial y coordinate of the player
+    parents        (numpy.ndarray)
+        : Rows (id, tob) of the parent(s) of the player (empty for the initial population)
+    actions        (pygeneses.envs.prima_vita.growable_array.GrowableArray)
+        : Rows of all actions (both successful and failed) of ACTION_DTYPE
+    offspring      (pygeneses.envs.prima_vita.growable_array.GrowableArray)
+        : Ids of offspring of all reproduction actions
+    food_vectors   (pygeneses.envs.prima_vita.growable_array.GrowableArray)
+        : Vectors (dx, dy) of food particles seen at all actions (full detail only)
+    player_vectors (pygeneses.envs.prima_vita.growable_array.GrowableArray)
+        : Vectors (dx, dy, sex) of players seen at all actions (full detail only)
+    """
+
+    def __init__(self, x, y, detail="full"):
+        """
+        Initializer for ActionHistory class
+
+        Params
+        ======
+        x      (float)
+            : Initial x coordinate of the player
+        y      (float)
+            : Initial y coordinate of the player
+        detail (str)
+            : Level of detail of the captured state (optional)
+        """
+
+        if detail not in HISTORY_DETAILS:
+            raise ValueError("history_detail must be one of full, summary or none")
+
+        self.detail = detail
+        self.x = x
+        self.y = y
+        self.parents = np.zeros((0, 2), dtype=np.int32)
+        self.actions = GrowableArray(dtype=ACTION_DTYPE)
+        self.offspring = GrowableArray(dtype=np.int32, capacity=8)
+        self.food_vectors = GrowableArray(dtype=np.float32, capacity=64)
+        self.player_vectors = GrowableArray(dtype=np.float32, capacity=64)
+
+    def __len__(self):
+        return len(self.actions)
+
+    def __getitem__(self, i):
+        return self.actions.view()[i]
+
+    def set_parents(self, parents):
+        """
+        Set the parent(s) of the player
+
+        Params
+        ======
+        parents (list)
+            : (id, tob) of every parent
+        """
+
+        self.parents = np.asarray(parents, dtype=np.int32).reshape(-1, 2)
+
+    def record(
+        self,
+        action,
+        time,
+        reward,
+        energy,
+        x,
+        y,
+        states,
+        num_offspring=-1,
+        offspring_ids=(),
+        mate_id=-1,
+        fight_with=-1,
+    ):
+        """
+        Add an action at the end of the history
+
+        Params
+        ======
+        action        (int)
+            : Action chosen by the player
+        time          (int)
+            : Time at which action is taken
+        reward        (float)
+            : Reward recieved for taking the action
+        energy        (int)
+            : Energy of the player after the action
+        x             (float)
+            : x coordinate of the player after the action
+        y             (float)
+            : y coordinate of the player after the action
+        states        (numpy.ndarray)
+            : Vectors of food particles and players seen ([0] before the first observation)
+        num_offspring (int)
+            : Number of offsprings generated (reproduction only, optional)
+        offspring_ids (list)
+            : Ids of offsprings (reproduction only, optional)
+        mate_id       (int)
+            : Id of player with which current player mated (sexual reproduction only, optional)
+        fight_with    (int)
+            : Id of player with which current agent fought (fight only, optional)
+        """
+
+        # Offspring of reproduction (none if it failed)
+        offspring_begin = -1
+        if action in (10, 11):
+            ids = np.asarray(offspring_ids, dtype=np.int32).ravel()[: max(num_offspring, 0)]
+            offspring_begin = len(self.offspring)
+            self.offspring.extend(ids)
+        else:
+            num_offspring = -1
+
+        # Capture the state at the level of detail of the history
+        food_begin = players_begin = -1
+        food_count = players_count = -1
+        food_nearest = player_nearest = -1.0
+        if self.detail != "none":
+            food, players = (
+                (np.asarray(states[0], np.float32), np.asarray(states[1], np.float32))
+                if len(states) == 2
+                else (np.zeros(0, np.float32), np.zeros(0, np.float32))
+            )
+            food_count, players_count = len(food) // 2, len(players) // 3
+            if food_count:
+                food_nearest = np.sqrt((food.reshape(-1, 2) ** 2).sum(axis=1).min())
+            if players_count:
+                player_nearest = np.sqrt(
+                    (players.reshape(-1, 3)[:, :2] ** 2).sum(axis=1).min()
+                )
+            if self.detail == "full":
+                food_begin, players_begin = len(self.food_vectors), len(self.player_vectors)
+                self.food_vectors.extend(food)
+                self.player_vectors.extend(players)
+
+        self.actions.append(
+            (
+                action,
+                time,
+                reward,
+                energy,
+                x,
+                y,
+                num_offspring,
+                offspring_begin,
+                mate_id if action == 11 else -1,
+                fight_with if action == 12 else -1,
+                food_begin,
+                food_count,
+                players_begin,
+                players_count,
+                food_nearest,
+                player_nearest,
+            )
+        )
+
+    def columns(self):
+        """
+        Return the rows of all actions and the ragged arrays they point into (views, invalidated
+        when actions are added)
+
+        Returns
+        =======
+        actions        (numpy.ndarray)
+            : Rows of all actions (ACTION_DTYPE)
+        offspring      (numpy.ndarray)
+            : Ids of offspring
+        food_vectors   (numpy.ndarray)
+            : Vectors of food particles seen (flat)
+        player_vectors (numpy.ndarray)
+            : Vectors of players seen (flat)
+        """
+
+        return (
+            self.actions.view(),
+            self.offspring.view(),
+            self.food_vectors.view(),
+            self.player_vectors.view(),
+        )
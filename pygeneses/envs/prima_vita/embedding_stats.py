@@ -0,0 +1,162 @@
+# EmbeddingStats class accumulating the embeddings of all agents of prima vita environment
+
+# Import required libraries
+import numpy as np
+
+
+class EmbeddingStats:
+    """
+    Running mean (and optionally variance) of the embeddings of every agent, updated in place in
+    (capacity, size) float32 matrices with Welford's algorithm, agent with slot i has its statistics
+    in row i (size is set by the first update, the embedding size of the model)
+
+    Data members
+    ============
+    capacity (int)
+        : Number of rows allocated
+    size     (int)
+        : Embedding size (0 before the first update)
+    count    (numpy.ndarray)
+        : Number of embeddings accumulated by every agent (int32)
+    mean     (numpy.ndarray)
+        : Mean embedding of every agent (float32, capacity x size)
+    m2       (numpy.ndarray/None)
+        : Sum of squared deviations from the mean of every agent (float32, capacity x size), None if
+          variance isn't tracked
+    """
+
+    def __init__(self, capacity=16, variance=False):
+        """
+        Initializer for EmbeddingStats class
+
+        Params
+        ======
+        capacity (int)
+            : Number of rows to allocate initially (optional)
+        variance (bool)
+            : Whether to track the variance of embeddings (optional)
+        """
+
+        self.capacity = max(int(capacity), 1)
+        self.size = 0
+        self.count = np.zeros(self.capacity, dtype=np.int32)
+        self.mean = np.zeros((self.capacity, 0), dtype=np.float32)
+        self.m2 = np.zeros((self.capacity, 0), dtype=np.float32) if variance else None
+
+    def grow(self, min_capacity):
+        """
+        Grow all matrices (doubling capacity) so that at least min_capacity rows fit
+
+        Params
+        ======
+        min_capacity (int)
+            : Minimum number of rows required
+        """
+
+        if min_capacity <= self.capacity:
+            return
+
+        capacity = self.capacity
+        while capacity < min_capacity:
+            capacity *= 2
+
+        self.resize(capacity, self.size)
+
+    def resize(self, capacity, size):
+        """
+        Reallocate matrices with a new shape (existing entries are kept, as far as they fit)
+        """
+
+        columns = min(size, self.size)
+
+        count = np.zeros(capacity, dtype=np.int32)
+        count[: self.capacity] = self.count
+        self.count = count
+
+        mean = np.zeros((capacity, size), dtype=np.float32)
+        mean[: self.capacity, :columns] = self.mean[:, :columns]
+        self.mean = mean
+
+        if self.m2 is not None:
+            m2 = np.zeros((capacity, size), dtype=np.float32)
+            m2[: self.capacity, :columns] = self.m2[:, :columns]
+            self.m2 = m2
+
+        self.capacity, self.size = capacity, size
+
+    def update(self, slots, embeddings):
+        """
+        Accumulate one embedding for each of many agents
+
+        Params
+        ======
+        slots      (numpy.ndarray)
+            : Slots of the agents (distinct)
+        embeddings (numpy.ndarray)
+            : Embedding of every agent (one row per slot)
+        """
+
+        slots = np.asarray(slots, dtype=np.int64)
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(slots), -1)
+        if embeddings.shape[1] != self.size:
+            self.resize(self.capacity, embeddings.shape[1])
+
+        self.count[slots] += 1
+        delta = embeddings - self.mean[slots]
+        self.mean[slots] += delta / self.count[slots, None]
+
+        if self.m2 is not None:
+            self.m2[slots] += delta * (embeddings - self.mean[slots])
+
+    def set(self, slot, embedding):
+        """
+        Replace the statistics of an agent with a single embedding
+
+        Params
+        ======
+        slot      (int)
+            : Slot of the agent
+        embedding (numpy.ndarray)
+            : Embedding of the agent
+        """
+
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        if len(embedding) != self.size:
+            self.resize(self.capacity, len(embedding))
+
+        self.count[slot] = 1
+        self.mean[slot] = embedding
+        if self.m2 is not None:
+            self.m2[slot] = 0
+
+    def copy_row(self, slot, other, other_slot):
+        """
+        Copy the statistics of an agent from another EmbeddingStats
+
+        Params
+        ======
+        slot       (int)
+            : Slot of the agent in this object
+        other      (pygeneses.envs.prima_vita.embedding_stats.EmbeddingStats)
+            : Statistics to copy from
+        other_slot (int)
+            : Slot of the agent in other
+        """
+
+        if other.count[other_slot] == 0:
+            return
+
+        self.set(slot, other.mean[other_slot])
+        self.count[slot] = other.count[other_slot]
+        if self.m2 is not None and other.m2 is not None:
+            self.m2[slot] = other.m2[other_slot]
+
+    def variance(self, slot):
+        """
+        Return the variance of the embeddings of an agent (None if variance isn't tracked)
+        """
+
+        if self.m2 is None:
+            return None
+
+        return self.m2[slot] / max(int(self.count[slot]), 1)
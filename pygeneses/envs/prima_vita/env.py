@@ -31,11 +31,6 @@ def save(model, filename="latest_run.vita"):
         for i in range(len(model.players)):
             if type(model.players[i]) != int:
                 model.players[i].playerImg = ""
-
-        # Food particle images cannot be serialized, hence killing these pygame.Surface objects    
-        for i in range(len(model.food_particles)):
-            if type(model.food_particles[i]) != int:
-                model.food_particles[i].particleImg = ""
     
     # Dump into pickle file
     with open(filename, "wb") as file:
@@ -82,13 +77,6 @@ def load(filename="latest_run.vita"):
                     os.path.join(os.path.dirname(__file__), "images/player.png")
                 )
         
-        # Set food particle images as they weren't saved       
-        for i in range(len(model.food_particles)):
-            if type(model.food_particles[i]) != int:
-                model.food_particles[i].particleImg = pygame.image.load(
-                    os.path.join(os.path.dirname(__file__), "images/food.png")
-                )
-
     print(f"Prima vita environment snapshot loaded successfully from {filename}!")
 
     # Return environment object
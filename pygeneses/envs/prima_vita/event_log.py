@@ -0,0 +1,186 @@
+# EventLog class writing the population-level events of prima vita environment
+
+# Import required libraries
+import os
+import numpy as np
+
+# Import growable arrays (events are buffered in them)
+from .growable_array import GrowableArray
+
+# Kinds of events (births are the offspring of reproduction events)
+ASEXUAL_REPRODUCTION = 0
+SEXUAL_REPRODUCTION = 1
+DEATH = 2
+FIGHT = 3
+INGESTION = 4
+
+# One row per event, agent is the agent the event happened to (the parent giving birth in
+# reproduction), other is the mate, the enemy or the food particle ingested (-1 if none), offspring
+# of reproduction have the consecutive ids [offspring_begin, offspring_begin + num_offspring) and
+# energy is the energy of agent after the event (ids of agents are their indices in the life log)
+EVENT_DTYPE = np.dtype(
+    [
+        ("tick", np.int32),
+        ("event", np.int8),
+        ("agent", np.int32),
+        ("other", np.int32),
+        ("offspring_begin", np.int32),
+        ("num_offspring", np.int16),
+        ("energy", np.int32),
+    ]
+)
+
+# One row per tick, counts of the population and food left at the end of the tick
+TICK_DTYPE = np.dtype(
+    [
+        ("tick", np.int32),
+        ("alive", np.int32),
+        ("births", np.int32),
+        ("deaths", np.int32),
+        ("food_left", np.int32),
+        ("mean_energy", np.float32),
+    ]
+)
+
+# Files of a log directory the tables are appended to (raw rows, no header)
+EVENTS_FILE = "events.bin"
+TICKS_FILE = "ticks.bin"
+
+
+def read_table(log_dir, name, dtype):
+    """
+    Read the complete rows of a table of a log directory (empty if it wasn't written)
+    """
+
+    path = os.path.join(log_dir, name)
+    if not os.path.exists(path):
+        return np.zeros(0, dtype=dtype)
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    return np.frombuffer(data[: len(data) - len(data) % dtype.itemsize], dtype=dtype)
+
+
+def read_events(log_dir):
+    """
+    Return all events written to a log directory in order (EVENT_DTYPE)
+    """
+
+    return read_table(log_dir, EVENTS_FILE, EVENT_DTYPE)
+
+
+def read_ticks(log_dir):
+    """
+    Return the counters of all ticks written to a log directory in order (TICK_DTYPE)
+    """
+
+    return read_table(log_dir, TICKS_FILE, TICK_DTYPE)
+
+
+class EventLog:
+    """
+    Append-only table of population-level events (reproductions, deaths, fights and ingestions)
+    and of per-tick counters, rows are buffered in memory and appended to the files of log_dir in
+    chunks of chunk_size rows
+
+    Data members
+    ============
+    log_dir    (str)
+        : Directory where the tables are written
+    chunk_size (int)
+        : Number of buffered rows (events and ticks) which triggers a flush
+    events     (pygeneses.envs.prima_vita.growable_array.GrowableArray)
+        : Events not written yet (EVENT_DTYPE)
+    ticks      (pygeneses.envs.prima_vita.growable_array.GrowableArray)
+        : Counters of ticks not written yet (TICK_DTYPE)
+    births     (int)
+        : Number of agents born since the end of the last tick
+    deaths     (int)
+        : Number of agents dead since the end of the last tick
+    """
+
+    def __init__(self, log_dir, chunk_size=4096):
+        """
+        Initializer for EventLog class
+
+        Params
+        ======
+        log_dir    (str)
+            : Directory where the tables are written
+        chunk_size (int)
+            : Number of buffered rows which triggers a flush (optional)
+        """
+
+        self.log_dir = log_dir
+        self.chunk_size = max(int(chunk_size), 1)
+        self.events = GrowableArray(dtype=EVENT_DTYPE, capacity=self.chunk_size)
+        self.ticks = GrowableArray(dtype=TICK_DTYPE, capacity=self.chunk_size)
+        self.births = 0
+        self.deaths = 0
+
+    def record(self, tick, event, agent, other=-1, offspring_begin=-1, num_offspring=0, energy=0):
+        """
+        Add an event
+
+        Params
+        ======
+        tick            (int)
+            : Time (in ticks) of the event
+        event           (int)
+            : Kind of the event (ASEXUAL_REPRODUCTION, SEXUAL_REPRODUCTION, DEATH, FIGHT or
+              INGESTION)
+        agent           (int)
+            : Id of the agent the event happened to
+        other           (int)
+            : Id of the mate, the enemy or the food particle (optional)
+        offspring_begin (int)
+            : Id of the first offspring (optional)
+        num_offspring   (int)
+            : Number of offspring (optional)
+        energy          (int)
+            : Energy of the agent after the event (optional)
+        """
+
+        self.events.append((tick, event, agent, other, offspring_begin, num_offspring, energy))
+
+        if event == DEATH:
+            self.deaths += 1
+        elif event in (ASEXUAL_REPRODUCTION, SEXUAL_REPRODUCTION):
+            self.births += num_offspring
+
+        if len(self.events) >= self.chunk_size:
+            self.flush()
+
+    def end_tick(self, tick, alive, food_left, mean_energy):
+        """
+        Add the counters of a tick (births and deaths are counted from its events)
+
+        Params
+        ======
+        tick        (int)
+            : Time (in ticks)
+        alive       (int)
+            : Number of agents alive at the end of the tick
+        food_left   (int)
+            : Number of food particles not eaten
+        mean_energy (float)
+            : Mean energy of alive agents
+        """
+
+        self.ticks.append((tick, alive, self.births, self.deaths, food_left, mean_energy))
+        self.births = self.deaths = 0
+
+        if len(self.ticks) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Append buffered rows to the files of log_dir
+        """
+
+        for name, rows in ((EVENTS_FILE, self.events), (TICKS_FILE, self.ticks)):
+            if len(rows):
+                with open(os.path.join(self.log_dir, name), "ab") as file:
+                    file.write(rows.view().tobytes())
+                rows.clear()
@@ -0,0 +1,79 @@
+# EventQueue class for scheduling timed events in prima vita environment
+
+# Import required libraries
+import heapq
+
+# Kinds of events
+INGESTION_DONE = 0
+MATING_DONE = 1
+AGE_OUT = 2
+
+
+class EventQueue:
+    """
+    Priority queue (binary heap) of events ordered by the time at which they are due, events with
+    the same due time come out in the order they were pushed
+
+    An event is a tuple (kind, slot, token), the token is the value the event was scheduled for (for
+    example the time at which ingestion began) so that the receiver can drop events that became
+    stale (agent died or restarted the action) without removing them from the heap
+
+    Data members
+    ============
+    heap  (list)
+        : Heap of entries (due, order, kind, slot, token)
+    count (int)
+        : Number of events pushed so far (used to keep the order of events due at the same time)
+    """
+
+    def __init__(self):
+        """
+        Initializer for EventQueue class
+        """
+
+        self.heap = []
+        self.count = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, due, kind, slot, token=0):
+        """
+        Schedule an event
+
+        Params
+        ======
+        due   (int)
+            : Time (in ticks) at which the event fires
+        kind  (int)
+            : Kind of the event (INGESTION_DONE, MATING_DONE or AGE_OUT)
+        slot  (int)
+            : Index of the agent the event belongs to
+        token (int)
+            : Value to check when the event fires (optional)
+        """
+
+        heapq.heappush(self.heap, (due, self.count, kind, slot, token))
+        self.count += 1
+
+    def pop_due(self, time):
+        """
+        Remove and return all events due at or before a time
+
+        Params
+        ======
+        time (int)
+            : Current time (in ticks)
+
+        Returns
+        =======
+        events (list)
+            : Events (kind, slot, token) in order of due time
+        """
+
+        events = []
+        while self.heap and self.heap[0][0] <= time:
+            _, _, kind, slot, token = heapq.heappop(self.heap)
+            events.append((kind, slot, token))
+
+        return events
@@ -0,0 +1,464 @@
+# FoodField class storing all food particles of prima vita environment column-wise
+
+# Import required libraries
+import numpy as np
+
+# Import other functions
+from .neighbours import minimal_image, radius_neighbours
+
+
+class FoodField:
+    """
+    Structure of arrays holding every food particle (eaten or not) in the environment, particle with
+    slot i has its coordinates at position i of x and y and eaten[i] tells whether it is consumed
+
+    Data members
+    ============
+    size          (int)
+        : Number of slots used (eaten and uneaten particles)
+    capacity      (int)
+        : Number of slots allocated in every column
+    num_uneaten   (int)
+        : Number of uneaten particles
+    spatial_index (pygeneses.envs.prima_vita.spatial_hash.SpatialHash/None)
+        : Optional grid of uneaten particles' positions, kept up to date on add, move and eat
+    period        (tuple/None)
+        : Size (width, height) of a toroidal world, distances are then measured across the seams
+    x             (numpy.ndarray)
+        : x coordinates of particles (float32)
+    y             (numpy.ndarray)
+        : y coordinates of particles (float32)
+    eaten         (numpy.ndarray)
+        : Consumed mask (bool)
+    """
+
+    def __init__(self, capacity=16, spatial_index=None, period=None):
+        """
+        Initializer for FoodField class
+
+        Params
+        ======
+        capacity      (int)
+            : Number of slots to allocate initially (optional)
+        spatial_index (pygeneses.envs.prima_vita.spatial_hash.SpatialHash)
+            : Empty grid to index uneaten particles' positions in (optional)
+        period        (tuple)
+            : Size (width, height) of a toroidal world (optional)
+        """
+
+        self.size = 0
+        self.capacity = max(int(capacity), 1)
+        self.num_uneaten = 0
+        self.spatial_index = spatial_index
+        self.period = period
+
+        self.x = np.zeros(self.capacity, dtype=np.float32)
+        self.y = np.zeros(self.capacity, dtype=np.float32)
+        self.eaten = np.zeros(self.capacity, dtype=np.bool_)
+
+    def __len__(self):
+        return self.size
+
+    def grow(self, min_capacity):
+        """
+        Grow all columns (doubling capacity) so that at least min_capacity slots fit
+
+        Params
+        ======
+        min_capacity (int)
+            : Minimum number of slots required
+        """
+
+        if min_capacity <= self.capacity:
+            return
+
+        new_capacity = self.capacity
+        while new_capacity < min_capacity:
+            new_capacity *= 2
+
+        for name in ("x", "y", "eaten"):
+            column = np.zeros(new_capacity, dtype=getattr(self, name).dtype)
+            column[: self.size] = getattr(self, name)[: self.size]
+            setattr(self, name, column)
+
+        self.capacity = new_capacity
+
+    def add(self, x, y):
+        """
+        Add an uneaten particle
+
+        Params
+        ======
+        x (float)
+            : x coordinate of the particle
+        y (float)
+            : y coordinate of the particle
+
+        Returns
+        =======
+        slot (int)
+            : Slot of the new particle
+        """
+
+        return int(self.extend([x], [y])[0])
+
+    def extend(self, x, y):
+        """
+        Add many uneaten particles at once
+
+        Params
+        ======
+        x (numpy.ndarray)
+            : x coordinates of the particles
+        y (numpy.ndarray)
+            : y coordinates of the particles
+
+        Returns
+        =======
+        slots (numpy.ndarray)
+            : Slots of the new particles
+        """
+
+        x, y = np.asarray(x).ravel(), np.asarray(y).ravel()
+        slots = np.arange(self.size, self.size + len(x))
+
+        self.grow(self.size + len(x))
+        self.x[slots] = x
+        self.y[slots] = y
+        self.eaten[slots] = False
+        self.size += len(x)
+        self.num_uneaten += len(x)
+
+        if self.spatial_index is not None:
+            for slot in slots:
+                self.spatial_index.insert(int(slot), self.x[slot], self.y[slot])
+
+        return slots
+
+    def adopt(self, particle):
+        """
+        Copy a particle (stored in some other food field) into this field and make the particle a
+        view of the new slot
+
+        Params
+        ======
+        particle (pygeneses.envs.prima_vita.particle_class.Particle)
+            : Particle to be moved into this field
+
+        Returns
+        =======
+        slot (int)
+            : Slot of the particle in this field
+        """
+
+        field, old_slot = particle.field, particle.slot
+        slot = self.add(field.x[old_slot], field.y[old_slot])
+
+        if field.eaten[old_slot]:
+            self.eat(slot)
+
+        particle.field = self
+        particle.slot = slot
+
+        return slot
+
+    def eat(self, slot):
+        """
+        Mark a particle as consumed
+
+        Params
+        ======
+        slot (int)
+            : Slot of the particle
+        """
+
+        if not self.eaten[slot]:
+            self.eaten[slot] = True
+            self.num_uneaten -= 1
+
+            if self.spatial_index is not None:
+                self.spatial_index.remove(slot)
+
+    def move(self, slot, x, y):
+        """
+        Set the position of a particle
+
+        Params
+        ======
+        slot (int)
+            : Slot of the particle
+        x    (float)
+            : New x coordinate
+        y    (float)
+            : New y coordinate
+        """
+
+        self.x[slot] = x
+        self.y[slot] = y
+
+        if self.spatial_index is not None and not self.eaten[slot]:
+            self.spatial_index.move(slot, self.x[slot], self.y[slot])
+
+    def uneaten_indices(self):
+        """
+        Return slots of all uneaten particles in increasing order
+        """
+
+        return np.flatnonzero(~self.eaten[: self.size])
+
+    def positions(self):
+        """
+        Return coordinates of all particles
+
+        Returns
+        =======
+        x (numpy.ndarray)
+            : x coordinates of particles (NaN for consumed ones)
+        y (numpy.ndarray)
+            : y coordinates of particles (NaN for consumed ones)
+        """
+
+        eaten = self.eaten[: self.size]
+        x = np.where(eaten, np.nan, self.x[: self.size].astype(np.float64))
+        y = np.where(eaten, np.nan, self.y[: self.size].astype(np.float64))
+
+        return x, y
+
+    def within(self, candidates, x, y, radius):
+        """
+        Return uneaten particles among candidates that are within radius of a point
+
+        Params
+        ======
+        candidates (iterable)
+            : Slots of particles to be checked
+        x          (float)
+            : x coordinate of the point
+        y          (float)
+            : y coordinate of the point
+        radius     (float)
+            : Radius around the point
+
+        Returns
+        =======
+        slots     (numpy.ndarray)
+            : Slots of particles inside the radius (in the order of candidates)
+        dx        (numpy.ndarray)
+            : x components of vectors from the point to those particles
+        dy        (numpy.ndarray)
+            : y components of vectors from the point to those particles
+        distances (numpy.ndarray)
+            : Distances of those particles from the point
+        """
+
+        candidates = np.asarray(candidates, dtype=np.int64)
+        candidates = candidates[~self.eaten[candidates]]
+
+        dx, dy = minimal_image(
+            self.x[candidates].astype(np.float64) - x,
+            self.y[candidates].astype(np.float64) - y,
+            self.period,
+        )
+        distances = np.sqrt(dx ** 2 + dy ** 2)
+
+        inside = distances <= radius
+
+        return candidates[inside], dx[inside], dy[inside], distances[inside]
+
+    def nearest(self, candidates, x, y, radius):
+        """
+        Return the uneaten particle among candidates closest to a point (ties go to the one that
+        comes first in candidates)
+
+        Params
+        ======
+        candidates (iterable)
+            : Slots of particles to be checked
+        x          (float)
+            : x coordinate of the point
+        y          (float)
+            : y coordinate of the point
+        radius     (float)
+            : Maximum distance of the particle from the point
+
+        Returns
+        =======
+        slot/-1 (int)
+            : Slot of the closest particle inside radius or -1
+        """
+
+        slots, _, _, distances = self.within(candidates, x, y, radius)
+
+        return int(slots[np.argmin(distances)]) if len(slots) > 0 else -1
+
+    def prune(self, min_distance, block_size=None):
+        """
+        Eat particles that are closer than min_distance to another particle, particles are visited
+        in order of slot and a particle survives iff no surviving particle with a smaller slot is
+        too close to it (so the result is the same as comparing every pair in a nested loop)
+
+        Particles are handled in blocks of consecutive slots, a particle of a block is removed if it
+        is too close to a survivor of an earlier block (one grid search against the survivors) and
+        the remaining particles of the block are decided with greedy_survivors, so the cost depends
+        on the number of survivors rather than on all pairs of a dense field (by default there are
+        at most 16 blocks, so that large worlds don't search the survivors once per 4096 particles)
+
+        Params
+        ======
+        min_distance (float)
+            : Minimum allowed distance between two uneaten particles
+        block_size   (int/None)
+            : Number of particles handled at once, None for max(4096, 1/16 of the particles)
+              (optional)
+
+        Returns
+        =======
+        removed (numpy.ndarray)
+            : Slots of particles that were eaten
+        """
+
+        slots = self.uneaten_indices()
+        survivors = np.zeros(0, dtype=np.int64)
+
+        if block_size is None:
+            block_size = max(4096, -(-len(slots) // 16))
+
+        for begin in range(0, len(slots), block_size):
+            block = slots[begin : begin + block_size]
+
+            # Particles too close to a survivor of an earlier block are removed
+            block = block[
+                ~too_close(
+                    self.x[block],
+                    self.y[block],
+                    self.x[survivors],
+                    self.y[survivors],
+                    min_distance,
+                    self.period,
+                )
+            ]
+
+            # Greedy choice among the rest of the block
+            survivors = np.concatenate(
+                (survivors, block[
+                    greedy_survivors(self.x[block], self.y[block], min_distance, self.period)
+                ])
+            )
+
+        removed = np.setdiff1d(slots, survivors, assume_unique=True)
+        for slot in removed:
+            self.eat(slot)
+
+        return removed
+
+    def spawn(self, x, y, min_distance):
+        """
+        Add a batch of new particles, rejecting (in one vectorized pass) those closer than
+        min_distance to an uneaten particle or to an earlier particle of the batch, so that the
+        field stays as pruned as it was
+
+        Params
+        ======
+        x            (numpy.ndarray)
+            : x coordinates of the new particles
+        y            (numpy.ndarray)
+            : y coordinates of the new particles
+        min_distance (float)
+            : Minimum allowed distance between two uneaten particles
+
+        Returns
+        =======
+        slots (numpy.ndarray)
+            : Slots of the particles that were added
+        """
+
+        x, y = np.asarray(x).ravel(), np.asarray(y).ravel()
+        uneaten = self.uneaten_indices()
+
+        # Particles too close to an uneaten particle are rejected
+        free = ~too_close(x, y, self.x[uneaten], self.y[uneaten], min_distance, self.period)
+        x, y = x[free], y[free]
+
+        # Greedy choice among the rest of the batch
+        survives = greedy_survivors(x, y, min_distance, self.period)
+
+        return self.extend(x[survives], y[survives])
+
+
+def too_close(x, y, target_x, target_y, min_distance, period=None):
+    """
+    Return whether each point is closer than min_distance to any target point
+
+    Params
+    ======
+    x            (numpy.ndarray)
+        : x coordinates of points
+    y            (numpy.ndarray)
+        : y coordinates of points
+    target_x     (numpy.ndarray)
+        : x coordinates of target points
+    target_y     (numpy.ndarray)
+        : y coordinates of target points
+    min_distance (float)
+        : Minimum allowed distance
+    period       (tuple/None)
+        : Size (width, height) of a toroidal world (optional)
+
+    Returns
+    =======
+    close (numpy.ndarray)
+        : Whether each point has a target point closer than min_distance (bool)
+    """
+
+    near = radius_neighbours(x, y, target_x, target_y, min_distance, period=period)
+
+    return np.bincount(near.rows()[near.distances < min_distance], minlength=len(x)) > 0
+
+
+def greedy_survivors(x, y, min_distance, period=None):
+    """
+    Decide which of some points survive when they are visited in order and a point survives iff no
+    earlier surviving point is closer than min_distance, close pairs are found with one grid search
+    and all points are decided at once in rounds (a point is removed as soon as an earlier close point
+    survives and survives as soon as no earlier close point is undecided, as particles are in random
+    spatial order this takes a few rounds only)
+
+    Params
+    ======
+    x            (numpy.ndarray)
+        : x coordinates of points (in order of visit)
+    y            (numpy.ndarray)
+        : y coordinates of points (in order of visit)
+    min_distance (float)
+        : Minimum allowed distance between two surviving points
+    period       (tuple/None)
+        : Size (width, height) of a toroidal world (optional)
+
+    Returns
+    =======
+    survives (numpy.ndarray)
+        : Whether each point survives (bool)
+    """
+
+    # Close pairs (point, earlier close point)
+    pairs = radius_neighbours(x, y, x, y, min_distance, exclude_self=True, period=period)
+    points, earlier = pairs.rows(), pairs.indices
+    close = (pairs.distances < min_distance) & (earlier < points)
+    points, earlier = points[close], earlier[close]
+
+    # 0 is undecided, 1 is kept and 2 is removed
+    decision = np.zeros(len(x), dtype=np.int8)
+    while (decision == 0).any():
+        # Points with an earlier close point that is kept are removed
+        beaten = points[decision[earlier] == 1]
+        decision[beaten[decision[beaten] == 0]] = 2
+
+        # Points without any earlier close point that is undecided are kept
+        waiting = np.bincount(points[decision[earlier] == 0], minlength=len(x))
+        decision[(decision == 0) & (waiting == 0)] = 1
+
+        # Only pairs of undecided points matter in the next round
+        undecided = decision[points] == 0
+        points, earlier = points[undecided], earlier[undecided]
+
+    return decision == 1
@@ -0,0 +1,109 @@
+# GrowableArray class for arrays that are appended to one element at a time
+
+# Import required libraries
+import numpy as np
+
+
+class GrowableArray:
+    """
+    One dimensional numpy array with amortized constant time append, elements live in a larger
+    preallocated array whose capacity is doubled when it is full (instead of copying the whole array
+    on every np.append)
+
+    Data members
+    ============
+    size (int)
+        : Number of elements
+    data (numpy.ndarray)
+        : Preallocated array, first size entries are the elements
+    """
+
+    def __init__(self, values=(), dtype=object, capacity=16):
+        """
+        Initializer for GrowableArray class
+
+        Params
+        ======
+        values   (iterable)
+            : Initial elements (optional)
+        dtype    (numpy.dtype)
+            : Data type of elements (optional)
+        capacity (int)
+            : Number of elements to allocate initially (optional)
+        """
+
+        self.size = 0
+        self.data = np.zeros(max(int(capacity), 1), dtype=dtype)
+
+        self.extend(values)
+
+    def __len__(self):
+        return self.size
+
+    def view(self):
+        """
+        Return the elements (a view over data, invalidated when the array grows)
+        """
+
+        return self.data[: self.size]
+
+    def grow(self, min_capacity):
+        """
+        Grow data (doubling capacity) so that at least min_capacity elements fit
+
+        Params
+        ======
+        min_capacity (int)
+            : Minimum number of elements required
+        """
+
+        if min_capacity <= len(self.data):
+            return
+
+        capacity = len(self.data)
+        while capacity < min_capacity:
+            capacity *= 2
+
+        data = np.zeros(capacity, dtype=self.data.dtype)
+        data[: self.size] = self.data[: self.size]
+        self.data = data
+
+    def append(self, value):
+        """
+        Add an element at the end
+
+        Params
+        ======
+        value (object)
+            : Element to be added
+        """
+
+        self.grow(self.size + 1)
+        self.data[self.size] = value
+        self.size += 1
+
+    def clear(self):
+        """
+        Remove all elements (capacity is kept)
+        """
+
+        self.size = 0
+
+    def extend(self, values):
+        """
+        Add many elements at the end
+
+        Params
+        ======
+        values (iterable)
+            : Elements to be added (numpy arrays are copied at once)
+        """
+
+        if isinstance(values, np.ndarray) and values.dtype != object:
+            self.grow(self.size + len(values))
+            self.data[self.size : self.size + len(values)] = values
+            self.size += len(values)
+            return
+
+        for value in values:
+            self.append(value)
@@ -0,0 +1,1006 @@
+# Columnar life logs of prima vita agents (writer and reader)
+
+# Import required libraries
+import os
+import glob
+import queue
+import atexit
+import threading
+import numpy as np
+
+# One row per action of an agent (fields which don't apply to an action kind are -1), vectors of
+# the food particles and players seen when acting are stored in the ragged columns food_vectors
+# (dx, dy per particle) and player_vectors (dx, dy, sex per player), food_nearest and player_nearest
+# are the distances to the nearest ones (begins are -1 if vectors weren't captured and counts and
+# distances are -1 if the state wasn't captured at all, see ActionHistory)
+ACTION_DTYPE = np.dtype(
+    [
+        ("action", np.int8),
+        ("time", np.int32),
+        ("reward", np.float32),
+        ("energy", np.int32),
+        ("x", np.float32),
+        ("y", np.float32),
+        ("num_offspring", np.int16),
+        ("offspring_begin", np.int64),
+        ("mate", np.int32),
+        ("enemy", np.int32),
+        ("food_begin", np.int64),
+        ("food_count", np.int32),
+        ("players_begin", np.int64),
+        ("players_count", np.int32),
+        ("food_nearest", np.float32),
+        ("player_nearest", np.float32),
+    ]
+)
+
+# One row per agent (parent fields are -1 for the initial population, mate fields are -1 for agents
+# born by asexual reproduction), actions of an agent are consecutive rows of the actions column
+AGENT_DTYPE = np.dtype(
+    [
+        ("born_at", np.int32),
+        ("index", np.int32),
+        ("died_at", np.int32),
+        ("x", np.float32),
+        ("y", np.float32),
+        ("parent", np.int32),
+        ("parent_born_at", np.int32),
+        ("mate", np.int32),
+        ("mate_born_at", np.int32),
+        ("actions_begin", np.int64),
+        ("num_actions", np.int32),
+        ("embedding_begin", np.int64),
+        ("embedding_size", np.int32),
+    ]
+)
+
+# Columns of a segment (in the order they are written)
+SEGMENT_COLUMNS = (
+    ("agents", AGENT_DTYPE),
+    ("actions", ACTION_DTYPE),
+    ("offspring", np.int32),
+    ("food_vectors", np.float32),
+    ("player_vectors", np.float32),
+    ("embeddings", np.float32),
+)
+
+# Offsets inside every table that point into another column
+COLUMN_OFFSETS = {
+    "agents": (("actions_begin", "actions"), ("embedding_begin", "embeddings")),
+    "actions": (
+        ("offspring_begin", "offspring"),
+        ("food_begin", "food_vectors"),
+        ("players_begin", "player_vectors"),
+    ),
+}
+
+# Segment file names
+SEGMENT_PATTERN = "life-%06d.seg"
+
+# Index of a log directory, one record per agent is appended to INDEX_FILE whenever a segment is
+# written, agent_offset is the position (in bytes) of the agent's row in the segment file, offset the
+# position of its first action and length the number of its actions, so that any single life is read
+# with one seek and read per column instead of reading the whole segment
+INDEX_DTYPE = np.dtype(
+    [
+        ("born_at", np.int32),
+        ("index", np.int32),
+        ("segment", np.int32),
+        ("agent_offset", np.int64),
+        ("offset", np.int64),
+        ("length", np.int32),
+    ]
+)
+INDEX_FILE = "life.idx"
+
+
+def segment_files(log_dir):
+    """
+    Return paths of all segments of a log directory in the order they were written
+    """
+
+    return sorted(glob.glob(os.path.join(log_dir, "life-*.seg")))
+
+
+def segment_number(path):
+    """
+    Return the number of a segment from its path
+    """
+
+    return int(os.path.basename(path)[len("life-") : -len(".seg")])
+
+
+def agent_path(log_dir, born_at, index):
+    """
+    Return the path naming an agent's life in a log directory (log_dir/born_at-index), used to refer
+    to agents in VitaBoard
+
+    Params
+    ======
+    log_dir (str)
+        : Log directory
+    born_at (int)
+        : Time of birth of the agent
+    index   (int)
+        : Index of the agent
+    """
+
+    return os.path.join(log_dir, str(born_at) + "-" + str(index))
+
+
+def parse_agent_path(path):
+    """
+    Split the path of an agent's life (log_dir/born_at-index, a trailing .npy is ignored)
+
+    Returns
+    =======
+    log_dir (str)
+        : Log directory
+    born_at (int)
+        : Time of birth of the agent
+    index   (int)
+        : Index of the agent
+    """
+
+    name = os.path.basename(path)
+    if name.endswith(".npy"):
+        name = name[:-4]
+
+    born_at, index = name.split("-")
+
+    return os.path.dirname(path), int(born_at), int(index)
+
+
+def life_record(player, died_at):
+    """
+    Return everything about a dead player that goes into the life log, the player's views over the
+    population are read now so that the record can be packed later (e.g. by another thread)
+
+    Params
+    ======
+    player  (pygeneses.envs.prima_vita.player_class.Player)
+        : Player whose life is to be logged
+    died_at (int)
+        : Time (in ticks) of death of the player
+
+    Returns
+    =======
+    record (tuple)
+        : Arguments of pack_life
+    """
+
+    return (
+        player.index,
+        player.born_at,
+        died_at,
+        player.action_history,
+        np.array(player.embeddings, dtype=np.float32),
+    )
+
+
+def pack_life(index, born_at, died_at, history, embeddings):
+    """
+    Convert the action history of a dead player into columns of one agent (offsets start at 0)
+
+    Params
+    ======
+    index      (int)
+        : Index of the player
+    born_at    (int)
+        : Time of birth of the player
+    died_at    (int)
+        : Time (in ticks) of death of the player
+    history    (pygeneses.envs.prima_vita.action_history.ActionHistory)
+        : Action history of the player
+    embeddings (numpy.ndarray)
+        : Embeddings of the player averaged over its life
+
+    Returns
+    =======
+    columns (dict)
+        : Mapping from column name to array (see SEGMENT_COLUMNS)
+    """
+
+    actions, offspring, food_vectors, player_vectors = history.columns()
+    embedding = np.asarray(embeddings, dtype=np.float32).ravel()
+
+    agent = np.full(1, -1, dtype=AGENT_DTYPE)
+    agent["born_at"] = born_at
+    agent["index"] = index
+    agent["died_at"] = died_at
+    agent["x"], agent["y"] = history.x, history.y
+
+    # Parent of asexual reproduction, mate of sexual reproduction
+    if len(history.parents):
+        agent["parent"], agent["parent_born_at"] = history.parents[0]
+    if len(history.parents) > 1:
+        agent["mate"], agent["mate_born_at"] = history.parents[1]
+
+    agent["actions_begin"], agent["num_actions"] = 0, len(actions)
+    agent["embedding_begin"], agent["embedding_size"] = 0, len(embedding)
+
+    return {
+        "agents": agent,
+        "actions": actions,
+        "offspring": offspring,
+        "food_vectors": food_vectors,
+        "player_vectors": player_vectors,
+        "embeddings": embedding,
+    }
+
+
+def concatenate(arrays, dtype):
+    """
+    Concatenate arrays (an empty array of dtype if there are none)
+    """
+
+    return np.concatenate(arrays).astype(dtype) if arrays else np.zeros(0, dtype=dtype)
+
+
+def merge_columns(lives):
+    """
+    Concatenate columns of many lives, offsets are shifted to point into the merged columns
+
+    Params
+    ======
+    lives (list)
+        : Columns (dict) of every life
+
+    Returns
+    =======
+    columns (dict)
+        : Merged columns
+    """
+
+    columns = {}
+    for name, dtype in SEGMENT_COLUMNS:
+        columns[name] = concatenate([life[name] for life in lives], dtype)
+
+    # Shift offsets of every life by the lengths of the columns of the lives before it (offsets of
+    # -1 point nowhere and are kept)
+    for table, offsets in COLUMN_OFFSETS.items():
+        lengths = np.array([len(life[table]) for life in lives], dtype=np.int64)
+        for field, column in offsets:
+            shift = np.cumsum([0] + [len(life[column]) for life in lives[:-1]])
+            shift = np.repeat(shift, lengths).astype(np.int64)
+            columns[table][field] += np.where(columns[table][field] >= 0, shift, 0)
+
+    return columns
+
+
+class LifeLogWriter:
+    """
+    Append-only writer of agents' lives, lives are buffered and written in segments (files holding
+    the columns of up to segment_size agents one after another as plain .npy arrays, so they are
+    read without pickle)
+
+    Data members
+    ============
+    log_dir      (str)
+        : Directory where segments are written
+    segment_size (int)
+        : Number of lives per segment
+    segment      (int)
+        : Number of the next segment to be written
+    pending      (list)
+        : Columns of lives not written yet
+    """
+
+    def __init__(self, log_dir, segment_size=256):
+        """
+        Initializer for LifeLogWriter class
+
+        Params
+        ======
+        log_dir      (str)
+            : Directory where segments are written (segments already in it are kept)
+        segment_size (int)
+            : Number of lives per segment (optional)
+        """
+
+        self.log_dir = log_dir
+        self.segment_size = max(int(segment_size), 1)
+        self.segment = len(segment_files(log_dir))
+        self.pending = []
+
+    def __len__(self):
+        return len(self.pending)
+
+    def append(self, player, died_at):
+        """
+        Add the life of a dead player, a segment is written once segment_size lives are pending
+
+        Params
+        ======
+        player  (pygeneses.envs.prima_vita.player_class.Player)
+            : Player whose life is to be logged
+        died_at (int)
+            : Time (in ticks) of death of the player
+        """
+
+        self.add(life_record(player, died_at))
+
+    def add(self, record):
+        """
+        Pack a life record (see life_record) and write a segment if segment_size lives are pending
+        """
+
+        self.pending.append(pack_life(*record))
+
+        if len(self.pending) >= self.segment_size:
+            self.write()
+
+    def queue_depth(self):
+        """
+        Return the number of lives waiting to be packed (always 0, lives are packed when appended)
+        """
+
+        return 0
+
+    def flush(self):
+        """
+        Write all pending lives as a new segment
+        """
+
+        self.write()
+
+    def close(self):
+        """
+        Write all pending lives (the writer may still be used afterwards)
+        """
+
+        self.write()
+
+    def write(self):
+        """
+        Write pending lives (if any) as a new segment
+        """
+
+        if not self.pending:
+            return
+
+        columns = merge_columns(self.pending)
+        layout = write_segment(
+            os.path.join(self.log_dir, SEGMENT_PATTERN % self.segment), columns
+        )
+
+        # Index the segment (after it's complete, readers index segments missing from the index
+        # themselves)
+        with open(os.path.join(self.log_dir, INDEX_FILE), "ab") as file:
+            file.write(segment_index(columns["agents"], self.segment, layout).tobytes())
+
+        self.segment += 1
+        self.pending = []
+
+
+class BackgroundLifeLogWriter(LifeLogWriter):
+    """
+    LifeLogWriter whose lives are packed and written by a background thread, append only puts the
+    life record into a bounded queue, so deaths don't wait for disk, and blocks while the queue is
+    full (back-pressure, a slow disk slows the simulation down instead of growing memory without
+    bound), pending lives are written when the writer is flushed or closed and at interpreter exit,
+    a pickled writer is flushed first and its copy starts a thread of its own on first use
+
+    Data members
+    ============
+    max_queued    (int)
+        : Number of lives that can wait in queue before append blocks
+    queue         (queue.Queue/None)
+        : Bounded queue of (command, record) handed to the background thread (None until started)
+    thread        (threading.Thread/None)
+        : Background thread draining queue (None until started)
+    max_depth     (int)
+        : Largest number of lives that were waiting in queue at once
+    error         (Exception/None)
+        : Error raised by the background thread (raised again by the next append or flush)
+    closed        (bool)
+        : Whether the background thread has stopped (append and flush raise RuntimeError then)
+    """
+
+    def __init__(self, log_dir, segment_size=256, max_queued=4096):
+        """
+        Initializer for BackgroundLifeLogWriter class
+
+        Params
+        ======
+        log_dir      (str)
+            : Directory where segments are written (segments already in it are kept)
+        segment_size (int)
+            : Number of lives per segment (optional)
+        max_queued   (int)
+            : Number of lives that can wait in the queue before append blocks (optional)
+        """
+
+        super().__init__(log_dir, segment_size)
+
+        self.max_queued = max(int(max_queued), 1)
+        self.queue = None
+        self.thread = None
+        self.max_depth = 0
+        self.error = None
+        self.closed = False
+
+        self.start()
+
+    def __getstate__(self):
+        # Queued lives are written before pickling, the thread and queue can't be pickled
+        if not self.closed and self.thread is not None:
+            self.flush()
+
+        state = self.__dict__.copy()
+        state["queue"] = None
+        state["thread"] = None
+
+        return state
+
+    def __setstate__(self, state):
+        # The thread is started by the first append or flush (see start)
+        self.__dict__.update(state)
+
+    def start(self):
+        """
+        Start the background thread (if it isn't running yet)
+        """
+
+        if self.thread is not None:
+            return
+
+        self.queue = queue.Queue(self.max_queued)
+        self.thread = threading.Thread(target=self.drain, daemon=True)
+        self.thread.start()
+
+        # Write pending lives even if the writer is never closed
+        atexit.register(self.exit)
+
+    def append(self, player, died_at):
+        """
+        Queue the life of a dead player (blocks while the queue is full)
+
+        Params
+        ======
+        player  (pygeneses.envs.prima_vita.player_class.Player)
+            : Player whose life is to be logged
+        died_at (int)
+            : Time (in ticks) of death of the player
+        """
+
+        self.check_open()
+        self.check()
+        self.start()
+        self.queue.put(("life", life_record(player, died_at)))
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def queue_depth(self):
+        """
+        Return the number of lives (and commands) waiting in the queue
+        """
+
+        return self.queue.qsize() if self.queue is not None else 0
+
+    def flush(self):
+        """
+        Wait until every queued life is packed and written as a segment
+        """
+
+        self.check_open()
+        self.check()
+        self.start()
+        self.queue.put(("flush", None))
+        self.queue.join()
+        self.check()
+
+    def close(self):
+        """
+        Write every queued life and stop the background thread
+        """
+
+        if self.closed:
+            return
+
+        self.start()
+        self.queue.put(("close", None))
+        self.thread.join()
+        self.closed = True
+        atexit.unregister(self.exit)
+        self.check()
+
+    def exit(self):
+        """
+        Close the writer at interpreter exit, lives of a log whose directory was deleted are dropped
+        """
+
+        try:
+            self.close()
+        except RuntimeError:
+            if os.path.isdir(self.log_dir):
+                raise
+
+    def check_open(self):
+        """
+        Raise RuntimeError if the writer is closed (nothing would drain the queue)
+        """
+
+        if self.closed:
+            raise RuntimeError("life log writer is closed")
+
+    def check(self):
+        """
+        Raise the error of the background thread (if any) in the calling thread
+        """
+
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError("Writing life log failed") from error
+
+    def drain(self):
+        """
+        Body of the background thread, lives are packed as they arrive and written in segments of
+        segment_size lives (or earlier on flush and close)
+        """
+
+        while True:
+            command, record = self.queue.get()
+
+            try:
+                if command == "life":
+                    self.add(record)
+                else:
+                    self.write()
+            except Exception as error:
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+            if command == "close":
+                return
+
+
+def write_segment(path, columns):
+    """
+    Write columns as a segment file (written under a temporary name and renamed, so that readers
+    never see a partial segment)
+
+    Params
+    ======
+    path    (str)
+        : Path of the segment
+    columns (dict)
+        : Columns of the segment
+
+    Returns
+    =======
+    layout  (dict)
+        : Mapping from column name to position (in bytes) of its data in the file
+    """
+
+    layout = {}
+    with open(path + ".tmp", "wb") as file:
+        for name, _ in SEGMENT_COLUMNS:
+            np.lib.format.write_array(file, columns[name], allow_pickle=False)
+            layout[name] = file.tell() - columns[name].nbytes
+
+    os.replace(path + ".tmp", path)
+
+    return layout
+
+
+def segment_layout(path):
+    """
+    Return the position (in bytes) of the data of every column of a segment file, only the .npy
+    headers are read
+
+    Params
+    ======
+    path   (str)
+        : Path of the segment
+
+    Returns
+    =======
+    layout (dict)
+        : Mapping from column name to position of its data in the file
+    """
+
+    layout = {}
+    with open(path, "rb") as file:
+        for name, _ in SEGMENT_COLUMNS:
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, _, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, _, dtype = np.lib.format.read_array_header_2_0(file)
+            layout[name] = file.tell()
+            file.seek(int(np.prod(shape)) * dtype.itemsize, os.SEEK_CUR)
+
+    return layout
+
+
+def segment_index(agents, segment, layout):
+    """
+    Return the index records of the agents of a segment
+
+    Params
+    ======
+    agents  (numpy.ndarray)
+        : Agents column of the segment (AGENT_DTYPE)
+    segment (int)
+        : Number of the segment
+    layout  (dict)
+        : Positions of the columns of the segment (see segment_layout)
+
+    Returns
+    =======
+    index   (numpy.ndarray)
+        : Index records (INDEX_DTYPE)
+    """
+
+    index = np.zeros(len(agents), dtype=INDEX_DTYPE)
+    index["born_at"] = agents["born_at"]
+    index["index"] = agents["index"]
+    index["segment"] = segment
+    index["agent_offset"] = layout["agents"] + np.arange(len(agents)) * AGENT_DTYPE.itemsize
+    index["offset"] = layout["actions"] + agents["actions_begin"] * ACTION_DTYPE.itemsize
+    index["length"] = agents["num_actions"]
+
+    return index
+
+
+def read_segment(path, columns=len(SEGMENT_COLUMNS)):
+    """
+    Read the first columns of a segment file
+
+    Params
+    ======
+    path    (str)
+        : Path of the segment
+    columns (int)
+        : Number of columns to read (optional)
+
+    Returns
+    =======
+    columns (dict)
+        : Mapping from column name to array
+    """
+
+    with open(path, "rb") as file:
+        return {
+            name: np.lib.format.read_array(file, allow_pickle=False)
+            for name, _ in SEGMENT_COLUMNS[:columns]
+        }
+
+
+class LifeLogReader:
+    """
+    Reader of a log directory, lookups go through the index (INDEX_FILE) and read only the rows of
+    the requested agent (one seek and read per column from segment files kept open), scans over all
+    lives read the agents column of every segment sequentially
+
+    Data members
+    ============
+    log_dir  (str)
+        : Log directory
+    index    (numpy.ndarray)
+        : Index records (INDEX_DTYPE) of all agents read so far
+    rows     (dict)
+        : Mapping from (born_at, index) to position in index
+    segments (list)
+        : Numbers of the indexed segments (in increasing order)
+    position (int)
+        : Number of bytes of INDEX_FILE read so far
+    layouts  (dict)
+        : Positions of the columns of segments (see segment_layout) read so far
+    files    (dict)
+        : Open segment files
+    tables   (dict)
+        : Agents columns of segments read so far by scans
+    """
+
+    def __init__(self, log_dir):
+        """
+        Initializer for LifeLogReader class
+
+        Params
+        ======
+        log_dir (str)
+            : Log directory
+        """
+
+        self.log_dir = log_dir
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self.rows = {}
+        self.segments = []
+        self.position = 0
+        self.layouts = {}
+        self.files = {}
+        self.tables = {}
+
+        self.refresh()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return tuple(key) in self.rows
+
+    def refresh(self):
+        """
+        Read index records written since the last refresh (and index segments missing from the
+        index, e.g. when the writer was interrupted between writing a segment and its records)
+        """
+
+        # Read complete records appended to the index file
+        data = b""
+        path = os.path.join(self.log_dir, INDEX_FILE)
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                file.seek(self.position)
+                data = file.read()
+            data = data[: len(data) - len(data) % INDEX_DTYPE.itemsize]
+            self.position += len(data)
+        records = [np.frombuffer(data, dtype=INDEX_DTYPE)]
+
+        # Index segments with no records from their files
+        indexed = set(self.segments) | set(records[0]["segment"].tolist())
+        for file_path in segment_files(self.log_dir):
+            segment = segment_number(file_path)
+            if segment not in indexed:
+                agents = read_segment(file_path, 1)["agents"]
+                records.append(segment_index(agents, segment, self.layout(segment)))
+                indexed.add(segment)
+
+        # Drop records of segments indexed before (from their files)
+        records = concatenate(records, INDEX_DTYPE)
+        records = records[~np.isin(records["segment"], self.segments)]
+        if not len(records):
+            return
+
+        keys = zip(records["born_at"].tolist(), records["index"].tolist())
+        self.rows.update(zip(keys, range(len(self.index), len(self.index) + len(records))))
+        self.index = np.concatenate((self.index, records))
+        self.segments = sorted(indexed)
+
+    def close(self):
+        """
+        Close segment files opened by lookups
+        """
+
+        for file in self.files.values():
+            file.close()
+
+        self.files = {}
+
+    def path(self, segment):
+        """
+        Return the path of a segment
+        """
+
+        return os.path.join(self.log_dir, SEGMENT_PATTERN % segment)
+
+    def layout(self, segment):
+        """
+        Return the positions of the columns of a segment (headers are read once)
+        """
+
+        if segment not in self.layouts:
+            self.layouts[segment] = segment_layout(self.path(segment))
+
+        return self.layouts[segment]
+
+    def read(self, segment, offset, dtype, count):
+        """
+        Read count consecutive rows of dtype starting at a position (in bytes) of a segment file
+
+        Params
+        ======
+        segment (int)
+            : Number of the segment
+        offset  (int)
+            : Position of the first row in the file
+        dtype   (numpy.dtype)
+            : Type of the rows
+        count   (int)
+            : Number of rows
+
+        Returns
+        =======
+        rows    (numpy.ndarray)
+            : Rows read (read-only)
+        """
+
+        if segment not in self.files:
+            self.files[segment] = open(self.path(segment), "rb")
+
+        dtype = np.dtype(dtype)
+        file = self.files[segment]
+        file.seek(offset)
+
+        return np.frombuffer(file.read(max(int(count), 0) * dtype.itemsize), dtype=dtype)
+
+    def span(self, segment, column, begins, counts):
+        """
+        Read the rows of a column of a segment covering the slices [begin, begin + count) of one
+        agent (slices of an agent are contiguous), return the rows and the position of the first
+        """
+
+        dtype = dict(SEGMENT_COLUMNS)[column]
+        valid = begins >= 0
+        if not valid.any():
+            return np.zeros(0, dtype=dtype), 0
+
+        first = int(begins[valid].min())
+        last = int((begins[valid] + np.maximum(counts[valid], 0)).max())
+        offset = self.layout(segment)[column] + first * np.dtype(dtype).itemsize
+
+        return self.read(segment, offset, dtype, last - first), first
+
+    @property
+    def agents(self):
+        """
+        Agents of all indexed segments in order of segments (AGENT_DTYPE), for scans over all lives
+        """
+
+        for segment in self.segments:
+            if segment not in self.tables:
+                self.tables[segment] = read_segment(self.path(segment), 1)["agents"]
+
+        return concatenate([self.tables[segment] for segment in self.segments], AGENT_DTYPE)
+
+    def columns(self, segment):
+        """
+        Return all columns of a segment (one sequential read of the file)
+        """
+
+        return read_segment(self.path(segment))
+
+    def record(self, born_at, index):
+        """
+        Return the index record of an agent (INDEX_DTYPE), KeyError if the agent isn't logged
+        """
+
+        return self.index[self.rows[(born_at, index)]]
+
+    def agent(self, born_at, index):
+        """
+        Return the row of an agent (AGENT_DTYPE), KeyError if the agent isn't logged
+        """
+
+        record = self.record(born_at, index)
+
+        return self.read(int(record["segment"]), int(record["agent_offset"]), AGENT_DTYPE, 1)[0]
+
+    def actions(self, born_at, index):
+        """
+        Return the actions of an agent in order of time
+
+        Params
+        ======
+        born_at (int)
+            : Time of birth of the agent
+        index   (int)
+            : Index of the agent
+
+        Returns
+        =======
+        actions (numpy.ndarray)
+            : Actions of the agent (ACTION_DTYPE)
+        """
+
+        record = self.record(born_at, index)
+
+        return self.read(
+            int(record["segment"]), int(record["offset"]), ACTION_DTYPE, record["length"]
+        )
+
+    def vectors(self, born_at, index):
+        """
+        Return the vectors of food particles and players seen by an agent at every action
+
+        Returns
+        =======
+        vectors (list)
+            : (food_vectors, player_vectors) of every action, arrays of shapes (n, 2) for (dx, dy)
+              of food particles and (m, 3) for (dx, dy, sex) of players
+        """
+
+        segment = int(self.record(born_at, index)["segment"])
+        actions = self.actions(born_at, index)
+        food, food_first = self.span(
+            segment, "food_vectors", actions["food_begin"], 2 * actions["food_count"]
+        )
+        players, players_first = self.span(
+            segment, "player_vectors", actions["players_begin"], 3 * actions["players_count"]
+        )
+
+        # Actions whose vectors weren't captured (history_detail summary or none) have none
+        vectors = []
+        for row in actions:
+            food_begin = row["food_begin"] - food_first
+            food_count = 2 * row["food_count"] if row["food_begin"] >= 0 else 0
+            players_begin = row["players_begin"] - players_first
+            players_count = 3 * row["players_count"] if row["players_begin"] >= 0 else 0
+            vectors.append(
+                (
+                    food[food_begin : food_begin + food_count].reshape(-1, 2),
+                    players[players_begin : players_begin + players_count].reshape(-1, 3),
+                )
+            )
+
+        return vectors
+
+    def embedding(self, born_at, index):
+        """
+        Return the embedding of an agent averaged over its life
+        """
+
+        segment = int(self.record(born_at, index)["segment"])
+        agent = self.agent(born_at, index)
+        offset = (
+            self.layout(segment)["embeddings"]
+            + int(agent["embedding_begin"]) * np.dtype(np.float32).itemsize
+        )
+
+        return self.read(segment, offset, np.float32, agent["embedding_size"])
+
+    def embedding_matrix(self):
+        """
+        Return the embeddings of all agents which acted at least once as one matrix (the embeddings
+        column of every segment is read at once)
+
+        Returns
+        =======
+        agents     (numpy.ndarray)
+            : Agents with embeddings (AGENT_DTYPE)
+        embeddings (numpy.ndarray)
+            : Embedding of every agent (float32, one row per agent)
+        """
+
+        tables, matrices = [], []
+        self.agents
+        for segment in self.segments:
+            table = self.tables[segment]
+            table = table[table["embedding_size"] > 1]
+            if not len(table):
+                continue
+
+            size = int(table["embedding_size"][0])
+            end = int((table["embedding_begin"] + table["embedding_size"]).max())
+            column = self.read(segment, self.layout(segment)["embeddings"], np.float32, end)
+            tables.append(table)
+            matrices.append(column[table["embedding_begin"][:, None] + np.arange(size)])
+
+        if not matrices:
+            return np.zeros(0, dtype=AGENT_DTYPE), np.zeros((0, 0), dtype=np.float32)
+
+        return concatenate(tables, AGENT_DTYPE), np.concatenate(matrices)
+
+    def parents(self, born_at, index):
+        """
+        Return (born_at, index) of the parent(s) of an agent (empty for the initial population)
+        """
+
+        agent = self.agent(born_at, index)
+
+        return [
+            (int(agent[tob]), int(agent[id]))
+            for id, tob in (("parent", "parent_born_at"), ("mate", "mate_born_at"))
+            if agent[id] != -1
+        ]
+
+    def children(self, born_at, index):
+        """
+        Return (born_at, index) of the offspring of an agent (in order of birth)
+        """
+
+        segment = int(self.record(born_at, index)["segment"])
+        actions = self.actions(born_at, index)
+        actions = actions[np.isin(actions["action"], (10, 11)) & (actions["reward"] > 0)]
+        offspring, first = self.span(
+            segment, "offspring", actions["offspring_begin"], actions["num_offspring"]
+        )
+
+        children = []
+        for row in actions:
+            begin = row["offspring_begin"] - first
+            ids = offspring[begin : begin + row["num_offspring"]]
+            children.extend((int(row["time"]), int(id)) for id in ids)
+
+        return children
@@ -0,0 +1,497 @@
+# Batched neighbour search for prima vita environment
+
+# Import required libraries
+import numpy as np
+
+# Offsets of a cell and its 8 neighbouring cells
+NEIGHBOUR_CELLS = [(ox, oy) for ox in (-1, 0, 1) for oy in (-1, 0, 1)]
+
+
+class NeighbourLists:
+    """
+    Neighbour lists of many query points stored in CSR format, the neighbours of query i are
+    indices[offsets[i]:offsets[i + 1]] (in increasing order) at distances
+    distances[offsets[i]:offsets[i + 1]]
+
+    Data members
+    ============
+    offsets   (numpy.ndarray)
+        : Start of every query's neighbours (length is number of queries + 1)
+    indices   (numpy.ndarray)
+        : Indices of neighbours (into the target arrays)
+    distances (numpy.ndarray)
+        : Euclidean distances of neighbours from the query point
+    """
+
+    def __init__(self, offsets, indices, distances):
+        """
+        Initializer for NeighbourLists class
+
+        Params
+        ======
+        offsets   (numpy.ndarray)
+            : Start of every query's neighbours
+        indices   (numpy.ndarray)
+            : Indices of neighbours
+        distances (numpy.ndarray)
+            : Euclidean distances of neighbours
+        """
+
+        self.offsets = offsets
+        self.indices = indices
+        self.distances = distances
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def row(self, i):
+        """
+        Return neighbours of query i
+
+        Params
+        ======
+        i (int)
+            : Index of the query point
+
+        Returns
+        =======
+        indices   (numpy.ndarray)
+            : Indices of neighbours
+        distances (numpy.ndarray)
+            : Distances of neighbours
+        """
+
+        begin, end = self.offsets[i], self.offsets[i + 1]
+        return self.indices[begin:end], self.distances[begin:end]
+
+    def counts(self):
+        """
+        Return number of neighbours of every query point
+        """
+
+        return np.diff(self.offsets)
+
+    def rows(self):
+        """
+        Return the query index of every neighbour (i.e. row of every entry in indices)
+        """
+
+        return np.repeat(np.arange(len(self)), self.counts())
+
+    def ranks(self):
+        """
+        Return the position of every neighbour inside its query's list (0 for the first neighbour)
+        """
+
+        return np.arange(len(self.indices)) - np.repeat(self.offsets[:-1], self.counts())
+
+    def within(self, radius):
+        """
+        Return neighbour lists restricted to neighbours within a smaller radius
+
+        Params
+        ======
+        radius (float)
+            : Maximum distance of neighbours to keep
+
+        Returns
+        =======
+        neighbours (pygeneses.envs.prima_vita.neighbours.NeighbourLists)
+            : Filtered neighbour lists
+        """
+
+        keep = self.distances <= radius
+        offsets = np.zeros(len(self.offsets), dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(self.rows()[keep], minlength=len(self)))
+
+        return NeighbourLists(offsets, self.indices[keep], self.distances[keep])
+
+    def nearest(self, k):
+        """
+        Return neighbour lists restricted to the k nearest neighbours of every query point (in
+        increasing order of distance, ties in increasing order of index), the k smallest distances
+        of all queries are selected at once with argpartition over a matrix of distances padded
+        with infinity
+
+        Params
+        ======
+        k (int)
+            : Maximum number of neighbours to keep per query point
+
+        Returns
+        =======
+        neighbours (pygeneses.envs.prima_vita.neighbours.NeighbourLists)
+            : Filtered neighbour lists
+        positions  (numpy.ndarray)
+            : Position of every kept neighbour in the original lists (to select data stored
+              alongside, e.g. vectors)
+        """
+
+        counts = self.counts()
+        width = counts.max() if len(counts) > 0 else 0
+        k = min(k, width)
+
+        if k <= 0:
+            return empty_neighbour_lists(len(self)), np.zeros(0, dtype=np.int64)
+
+        # Distances of every query's neighbours as rows of a matrix
+        distances = np.full((len(self), width), np.inf)
+        distances[self.rows(), self.ranks()] = self.distances
+
+        # Columns of the k smallest distances of every row (in no particular order)
+        columns = (
+            np.argpartition(distances, k - 1, axis=1)[:, :k]
+            if k < width
+            else np.tile(np.arange(width), (len(self), 1))
+        )
+
+        # Sort them by distance (neighbours are in increasing order of index inside a row)
+        selected = np.take_along_axis(distances, columns, axis=1)
+        order = np.lexsort((columns, selected), axis=1)
+        columns = np.take_along_axis(columns, order, axis=1)
+        found = np.isfinite(np.take_along_axis(selected, order, axis=1))
+
+        positions = (self.offsets[:-1, None] + columns)[found]
+        offsets = np.zeros(len(self.offsets), dtype=np.int64)
+        offsets[1:] = np.cumsum(found.sum(axis=1))
+
+        return (
+            NeighbourLists(offsets, self.indices[positions], self.distances[positions]),
+            positions,
+        )
+
+
+def empty_neighbour_lists(num_queries):
+    """
+    Return neighbour lists where no query point has any neighbour
+
+    Params
+    ======
+    num_queries (int)
+        : Number of query points
+    """
+
+    return NeighbourLists(
+        np.zeros(num_queries + 1, dtype=np.int64),
+        np.zeros(0, dtype=np.int64),
+        np.zeros(0, dtype=np.float64),
+    )
+
+
+def minimal_image(dx, dy, period=None):
+    """
+    Return the shortest vectors equivalent to (dx, dy) in a toroidal world (where moving width along
+    x or height along y brings a point back to itself)
+
+    Params
+    ======
+    dx     (numpy.ndarray/float)
+        : x components of vectors
+    dy     (numpy.ndarray/float)
+        : y components of vectors
+    period (tuple/None)
+        : Size (width, height) of a toroidal world or None for a bounded world (vectors are returned
+          unchanged)
+
+    Returns
+    =======
+    dx (numpy.ndarray/float)
+        : x components of shortest vectors
+    dy (numpy.ndarray/float)
+        : y components of shortest vectors
+    """
+
+    if period is None:
+        return dx, dy
+
+    width, height = period
+
+    return dx - width * np.round(dx / width), dy - height * np.round(dy / height)
+
+
+def periodic_copies(x, y, radius, period):
+    """
+    Return copies of points shifted by the size of a toroidal world, a copy is made for every shift
+    (including no shift) after which the circle of given radius around the point overlaps the world,
+    so that searching around all copies finds every point across the seams
+
+    Params
+    ======
+    x      (numpy.ndarray)
+        : x coordinates of points
+    y      (numpy.ndarray)
+        : y coordinates of points
+    radius (float)
+        : Radius of the circles around points
+    period (tuple)
+        : Size (width, height) of the world
+
+    Returns
+    =======
+    copies_x  (numpy.ndarray)
+        : x coordinates of copies
+    copies_y  (numpy.ndarray)
+        : y coordinates of copies
+    copies_of (numpy.ndarray)
+        : Index of the point every copy was made from
+    """
+
+    width, height = period
+    points = np.arange(len(x))
+
+    copies_x, copies_y, copies_of = [], [], []
+    for ox, oy in NEIGHBOUR_CELLS:
+        shifted_x, shifted_y = x + ox * width, y + oy * height
+        overlaps = (
+            (shifted_x + radius >= 0)
+            & (shifted_x - radius < width)
+            & (shifted_y + radius >= 0)
+            & (shifted_y - radius < height)
+        )
+        copies_x.append(shifted_x[overlaps])
+        copies_y.append(shifted_y[overlaps])
+        copies_of.append(points[overlaps])
+
+    return np.concatenate(copies_x), np.concatenate(copies_y), np.concatenate(copies_of)
+
+
+def radius_neighbours(
+    query_x, query_y, target_x, target_y, radius, exclude_self=False, period=None
+):
+    """
+    Find, for every query point, all target points within radius in one vectorized pass, targets
+    are sorted by grid cell (cells of side radius) so that only the 3x3 block of cells around each
+    query point is searched
+
+    Only occupied cells take memory (targets are sorted by cell key rather than bucketed into a
+    dense grid), so a huge world with a sparse population costs as much as a small dense one
+
+    Params
+    ======
+    query_x      (numpy.ndarray)
+        : x coordinates of query points
+    query_y      (numpy.ndarray)
+        : y coordinates of query points
+    target_x     (numpy.ndarray)
+        : x coordinates of target points
+    target_y     (numpy.ndarray)
+        : y coordinates of target points
+    radius       (float)
+        : Search radius
+    exclude_self (bool)
+        : Whether query i should not be reported as neighbour of itself (when queries and targets
+          are the same points)
+    period       (tuple/None)
+        : Size (width, height) of a toroidal world (targets must lie inside it), distances are then
+          measured across the seams (optional)
+
+    Returns
+    =======
+    neighbours (pygeneses.envs.prima_vita.neighbours.NeighbourLists)
+        : Neighbour lists of all query points
+    """
+
+    query_x = np.asarray(query_x, dtype=np.float64)
+    query_y = np.asarray(query_y, dtype=np.float64)
+    target_x = np.asarray(target_x, dtype=np.float64)
+    target_y = np.asarray(target_y, dtype=np.float64)
+    num_queries = len(query_x)
+
+    if num_queries == 0 or len(target_x) == 0:
+        return empty_neighbour_lists(num_queries)
+
+    # In a toroidal world search around shifted copies of the query points
+    if period is not None:
+        copies_x, copies_y, copies_of = periodic_copies(query_x, query_y, radius, period)
+        copies = radius_neighbours(copies_x, copies_y, target_x, target_y, radius)
+        query_ids = copies_of[copies.rows()]
+        target_ids, distances = copies.indices, copies.distances
+
+        # A target may be found from several copies when the world is smaller than the search
+        # diameter, keep the closest one
+        order = np.lexsort((distances, target_ids, query_ids))
+        query_ids, target_ids, distances = (
+            query_ids[order],
+            target_ids[order],
+            distances[order],
+        )
+        first = np.ones(len(query_ids), dtype=np.bool_)
+        first[1:] = (query_ids[1:] != query_ids[:-1]) | (target_ids[1:] != target_ids[:-1])
+        if exclude_self:
+            first &= query_ids != target_ids
+
+        offsets = np.zeros(num_queries + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(query_ids[first], minlength=num_queries))
+
+        return NeighbourLists(offsets, target_ids[first], distances[first])
+
+    # Cell of every point
+    query_cx = np.floor(query_x / radius).astype(np.int64)
+    query_cy = np.floor(query_y / radius).astype(np.int64)
+    target_cx = np.floor(target_x / radius).astype(np.int64)
+    target_cy = np.floor(target_y / radius).astype(np.int64)
+
+    # Flatten cells into keys, rows are padded by one cell on both sides for the neighbouring cells
+    min_cy = min(query_cy.min(), target_cy.min()) - 1
+    span = max(query_cy.max(), target_cy.max()) - min_cy + 2
+    target_keys = target_cx * span + (target_cy - min_cy)
+
+    # Sort targets by cell (stable, so targets stay in increasing order inside a cell)
+    order = np.argsort(target_keys, kind="stable")
+    sorted_keys = target_keys[order]
+
+    query_ids = []
+    target_ids = []
+    for ox, oy in NEIGHBOUR_CELLS:
+        # Range of sorted targets inside the neighbouring cell of every query
+        keys = (query_cx + ox) * span + (query_cy + oy - min_cy)
+        begin = np.searchsorted(sorted_keys, keys, side="left")
+        count = np.searchsorted(sorted_keys, keys, side="right") - begin
+
+        # Expand ranges into (query, target) candidate pairs
+        total = count.sum()
+        if total == 0:
+            continue
+        row_start = np.cumsum(count) - count
+        query_ids.append(np.repeat(np.arange(num_queries), count))
+        target_ids.append(
+            order[np.repeat(begin - row_start, count) + np.arange(total)]
+        )
+
+    if not query_ids:
+        return empty_neighbour_lists(num_queries)
+
+    query_ids = np.concatenate(query_ids)
+    target_ids = np.concatenate(target_ids)
+
+    # Keep pairs inside the radius
+    distances = np.sqrt(
+        (target_x[target_ids] - query_x[query_ids]) ** 2
+        + (target_y[target_ids] - query_y[query_ids]) ** 2
+    )
+    inside = distances <= radius
+    if exclude_self:
+        inside &= query_ids != target_ids
+    query_ids, target_ids, distances = (
+        query_ids[inside],
+        target_ids[inside],
+        distances[inside],
+    )
+
+    # Sort pairs by query and then by target and build CSR offsets
+    order = np.lexsort((target_ids, query_ids))
+    offsets = np.zeros(num_queries + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(query_ids, minlength=num_queries))
+
+    return NeighbourLists(offsets, target_ids[order], distances[order])
+
+
+class NeighbourIndex:
+    """
+    Neighbour lists of every alive agent (agents and food particles around it) computed at once,
+    answers reflect the positions at the time the index was built
+
+    Data members
+    ============
+    time    (int)
+        : Time (in ticks) at which the index was built
+    radius  (float)
+        : Radius within which neighbours are listed
+    agents  (numpy.ndarray)
+        : Indices of the alive agents (one row per alive agent)
+    row_of  (numpy.ndarray)
+        : Row of every agent index (-1 for dead agents)
+    players (pygeneses.envs.prima_vita.neighbours.NeighbourLists)
+        : Agents around every alive agent (indices are agent indices)
+    food    (pygeneses.envs.prima_vita.neighbours.NeighbourLists)
+        : Food particles around every alive agent (indices are food particle indices)
+    food_x  (numpy.ndarray)
+        : x coordinates of all food particles (NaN for consumed ones)
+    food_y  (numpy.ndarray)
+        : y coordinates of all food particles (NaN for consumed ones)
+    """
+
+    def __init__(
+        self, time, radius, agents, num_players, players, food, food_x, food_y
+    ):
+        """
+        Initializer for NeighbourIndex class
+
+        Params
+        ======
+        time        (int)
+            : Time (in ticks) at which the index is built
+        radius      (float)
+            : Radius within which neighbours are listed
+        agents      (numpy.ndarray)
+            : Indices of the alive agents
+        num_players (int)
+            : Total number of agents (alive or dead)
+        players     (pygeneses.envs.prima_vita.neighbours.NeighbourLists)
+            : Agents around every alive agent
+        food        (pygeneses.envs.prima_vita.neighbours.NeighbourLists)
+            : Food particles around every alive agent
+        food_x      (numpy.ndarray)
+            : x coordinates of all food particles
+        food_y      (numpy.ndarray)
+            : y coordinates of all food particles
+        """
+
+        self.time = time
+        self.radius = radius
+        self.agents = agents
+        self.row_of = np.full(num_players, -1, dtype=np.int64)
+        self.row_of[agents] = np.arange(len(agents))
+        self.players = players
+        self.food = food
+        self.food_x = food_x
+        self.food_y = food_y
+
+    def players_of(self, idx):
+        """
+        Return agents around agent idx
+
+        Params
+        ======
+        idx (int)
+            : Index of the agent
+
+        Returns
+        =======
+        indices   (numpy.ndarray)
+            : Indices of agents (in increasing order)
+        distances (numpy.ndarray)
+            : Distances of those agents
+        """
+
+        return self.row(self.players, idx)
+
+    def food_of(self, idx):
+        """
+        Return food particles around agent idx
+
+        Params
+        ======
+        idx (int)
+            : Index of the agent
+
+        Returns
+        =======
+        indices   (numpy.ndarray)
+            : Indices of food particles (in increasing order)
+        distances (numpy.ndarray)
+            : Distances of those food particles
+        """
+
+        return self.row(self.food, idx)
+
+    def row(self, lists, idx):
+        """
+        Return the row of agent idx in some neighbour lists (empty if agent isn't indexed)
+        """
+
+        row = self.row_of[idx] if idx < len(self.row_of) else -1
+        if row == -1:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        return lists.row(row)
@@ -2,20 +2,54 @@
 
 # Import required libraries
 import pygame
-import random
 import math
 import os
 
 # Import global constants
 from .global_constants import *
+from .food_field import FoodField
+from .random_streams import default_rng
+
+# Images loaded so far (shared by all particles)
+images = {}
+
+
+def load_image(name):
+    """
+    Load an image from the images directory once and reuse it afterwards
+
+    Params
+    ======
+    name (str)
+        : File name of the image
+
+    Returns
+    =======
+    image (pygame.Surface)
+        : Loaded image
+    """
+
+    if name not in images:
+        images[name] = pygame.image.load(
+            os.path.join(os.path.dirname(__file__), "images", name)
+        )
+
+    return images[name]
 
 
 class Particle:
     """
     Food particle class for the species - Prima vita (First life)
 
+    A Particle is a thin view over one slot of a FoodField (structure of arrays), its coordinates are
+    read from and written to the columns of that field
+
     Data members
     ============
+    field       (pygeneses.envs.prima_vita.food_field.FoodField)
+        : Food field storing the coordinates of this particle
+    slot        (int)
+        : Slot of this particle in field
     particleImg (pygame.image)
         : Image representing particle in pygame environment
     particleX   (int)
@@ -24,26 +58,57 @@ class Particle:
         : y coordinate of food particle in 2D environment
     """
 
-    def __init__(self, x=None, y=None, mode="bot"):
+    @property
+    def particleX(self):
+        return float(self.field.x[self.slot])
+
+    @particleX.setter
+    def particleX(self, value):
+        self.field.move(self.slot, value, self.field.y[self.slot])
+
+    @property
+    def particleY(self):
+        return float(self.field.y[self.slot])
+
+    @particleY.setter
+    def particleY(self, value):
+        self.field.move(self.slot, self.field.x[self.slot], value)
+
+    def __init__(self, x=None, y=None, mode="bot", field=None, slot=None, rng=None):
         """
         Initializer for Particle class
 
         Params
         ======
-        x    (int)
+        x     (int)
             : Initial x coordinate of the agent (optional)
-        y    (int)
+        y     (int)
             : Initial y coordinate of the agent (optional)
-        mode (str)
+        mode  (str)
            : Mode in which to run environment (human/bot)
+        field (pygeneses.envs.prima_vita.food_field.FoodField)
+            : Food field to store the particle in, a new field of one particle is created if not
+              given (optional)
+        slot  (int)
+            : Slot of an existing particle in field to view, a new particle is added to field if
+              not given (optional)
+        rng   (numpy.random.Generator)
+            : Generator of the position if none is given, an unseeded one is used if not given
+              (optional)
         """
 
         if mode == "human":
-            self.particleImg = pygame.image.load(
-                os.path.join(os.path.dirname(__file__), "images/food.png")
-            )
-        self.particleX = x if x is not None else random.randint(10, SCREEN_WIDTH - 10)
-        self.particleY = y if y is not None else random.randint(10, SCREEN_HEIGHT - 10)
+            self.particleImg = load_image("food.png")
+
+        self.field = field if field is not None else FoodField(1)
+        if slot is None:
+            rng = rng if rng is not None else default_rng()
+            if x is None:
+                x = int(rng.integers(10, SCREEN_WIDTH - 10, endpoint=True))
+            if y is None:
+                y = int(rng.integers(10, SCREEN_HEIGHT - 10, endpoint=True))
+            slot = self.field.add(x, y)
+        self.slot = slot
 
     def show_particle(self, screen):
         """
@@ -67,9 +132,4 @@ class Particle:
             : Pygame display
         """
 
-        screen.blit(
-            pygame.image.load(
-                os.path.join(os.path.dirname(__file__), "images/food_near.png")
-            ),
-            (self.particleX, self.particleY),
-        )
+        screen.blit(load_image("food_near.png"), (self.particleX, self.particleY))
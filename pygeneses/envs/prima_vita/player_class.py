@@ -2,7 +2,6 @@
 
 # Import required libraries
 import pygame
-import random
 import time
 import numpy as np
 import os
@@ -10,21 +9,58 @@ import glob
 
 # Import global constants
 from .global_constants import *
+from .population import Population, GENDER_TO_NUMBER, NUMBER_TO_GENDER
+from .life_log import LifeLogWriter
+from .action_history import ActionHistory
+
+
+def column_view(name, cast):
+    """
+    Create a property that reads and writes the player's entry in a column of its population
+
+    Params
+    ======
+    name (str)
+        : Name of the column in pygeneses.envs.prima_vita.population.Population
+    cast (type)
+        : Python type the value is returned as
+
+    Returns
+    =======
+    view (property)
+        : Property reading/writing population.<name>[slot]
+    """
+
+    def getter(self):
+        return cast(getattr(self.population, name)[self.slot])
+
+    def setter(self, value):
+        getattr(self.population, name)[self.slot] = value
+
+    return property(getter, setter)
 
 
 class Player:
     """
     Player class for the species - Prima vita (First life)
 
+    A Player is a thin view over one slot of a Population (structure of arrays), all per-agent
+    numeric attributes (coordinates, energy, timers, ...) are read from and written to the columns
+    of that population
+
     Data members
     ============
     index                    (int)
         : Index of current player among all players
+    population               (pygeneses.envs.prima_vita.population.Population)
+        : Population storing the attributes of this player
+    slot                     (int)
+        : Slot of this player in population
     log_dir                     (str)
        : The path to log directory where agent's life history to be logged
-    action_history           (list)
-        : List storing logs of all actions (both successful and failed), initial (x, y) coordinates
-          and parent id(s)
+    action_history           (pygeneses.envs.prima_vita.action_history.ActionHistory)
+        : Compact logs of all actions (both successful and failed), initial (x, y) coordinates and
+          parent id(s)
     playerImg                (pygame.image)
         : Image representing a player in pygame environment
     playerX                  (int)
@@ -60,14 +96,71 @@ class Player:
     energy                   (int)
         : Energy of the player (when energy is consumed player dies)
     embeddings               (numpy.ndarray)
-        : Embeddings of the player (fetched from NN)
+        : Mean of the embeddings of the player (fetched from NN) over its actions, [0] before the
+          first action (a view of population.embeddings)
     states                   (list)
         : States that the player experiences at each time step
     mode                     (str)
        : Mode in which to run environment (human/bot)
     """
 
-    def __init__(self, i, log_dir, tob, energy, x=None, y=None, mode="bot"):
+    energy = column_view("energy", int)
+    born_at = column_view("born_at", int)
+    is_impotent = column_view("is_impotent", bool)
+    cannot_move = column_view("cannot_move", bool)
+    ingesting_begin_time = column_view("ingesting_begin_time", int)
+    ingesting_particle_index = column_view("ingesting_particle_index", int)
+    mating_begin_time = column_view("mating_begin_time", int)
+    fighting_with = column_view("fighting_with", int)
+    food_ate = column_view("food_ate", int)
+
+    @property
+    def playerX(self):
+        return float(self.population.x[self.slot])
+
+    @playerX.setter
+    def playerX(self, value):
+        self.population.move(self.slot, value, self.population.y[self.slot])
+
+    @property
+    def playerY(self):
+        return float(self.population.y[self.slot])
+
+    @playerY.setter
+    def playerY(self, value):
+        self.population.move(self.slot, self.population.x[self.slot], value)
+
+    @property
+    def embeddings(self):
+        stats = self.population.embeddings
+        if stats.count[self.slot] == 0:
+            return np.array([0])
+        return stats.mean[self.slot].copy()
+
+    @embeddings.setter
+    def embeddings(self, value):
+        self.population.embeddings.set(self.slot, value)
+
+    @property
+    def gender(self):
+        return NUMBER_TO_GENDER[int(self.population.gender[self.slot])]
+
+    @gender.setter
+    def gender(self, value):
+        self.population.gender[self.slot] = GENDER_TO_NUMBER[value]
+
+    def __init__(
+        self,
+        i,
+        log_dir,
+        tob,
+        energy,
+        x=None,
+        y=None,
+        mode="bot",
+        population=None,
+        history_detail="full",
+    ):
         """
         Initializer for Player class
 
@@ -87,53 +180,56 @@ class Player:
             : Initial y coordinate of the agent (optional)
         mode    (str)
            : Mode in which to run environment (human/bot)
+        population (pygeneses.envs.prima_vita.population.Population)
+           : Population to add the player to, a private one is created if not given (optional)
+        history_detail (str)
+           : State captured with every action, full/summary/none (see ActionHistory, optional)
         """
 
         self.index = i
         self.log_dir = log_dir
-        self.action_history = (
-            []
-        )  # [Action, Time, Reward, Energy, num_offspring, [offspring ids]]
 
-        self.playerX = x if x is not None else random.randint(32, SCREEN_WIDTH - 32)
-        self.playerY = y if y is not None else random.randint(32, SCREEN_HEIGHT - 32)
         self.PLAYER_WIDTH = 32
         self.PLAYER_HEIGHT = 32
-        self.born_at = tob
-        self.food_ate = 0
-        self.gender = np.random.choice(["Male", "Female"], p=[0.5, 0.5])
+        self.population = population if population is not None else Population(1)
+        rng = self.population.rng
+        gender = rng.choice(["Male", "Female"], p=[0.5, 0.5])
         if mode == "human":
             self.playerImg = pygame.image.load(
                 os.path.join(os.path.dirname(__file__), "images/player.png")
             )
-        self.cannot_move = False
-        self.ingesting_begin_time = 0
-        self.ingesting_particle_index = 0
         self.food_near = []
         self.players_near = []
-        self.is_impotent = np.random.choice([True, False], p=[0.3, 0.7])
-        self.mating_begin_time = 0
-        self.fighting_with = -1
-        self.energy = energy
-        self.embeddings = np.array([0])
+        is_impotent = rng.choice([True, False], p=[0.3, 0.7])
+
+        # Store numeric attributes in the population's columns (at a random position inside the
+        # population's world if no position is given), random attributes are drawn from the
+        # population's generator
+        if x is None:
+            x = int(rng.integers(32, self.population.width - 32, endpoint=True))
+        if y is None:
+            y = int(rng.integers(32, self.population.height - 32, endpoint=True))
+        self.slot = self.population.add(x, y, energy, tob, gender, is_impotent)
+
         self.states = np.array([0])
         self.mode = mode
 
-        # Add the initial x, y coordinates as first entry in logs
-        self.action_history.append([self.playerX, self.playerY])
+        # Start logs at the initial x, y coordinates
+        self.action_history = ActionHistory(self.playerX, self.playerY, history_detail)
 
     def add_parent(self, id, tob, mate_id=-1, mate_tob=-1):
         """
         Add parent information to logs
         """
         if mate_id == -1:
-            self.action_history.append(np.array([id, tob]))
+            self.action_history.set_parents([[id, tob]])
         else:
-            self.action_history.append(np.array([[id, tob], [mate_id, mate_tob]]))
+            self.action_history.set_parents([[id, tob], [mate_id, mate_tob]])
 
-    def write_data(self, time, alive_count):
+    def write_data(self, time, alive_count, life_log=None):
         """
-        Write logs to npy file when player dies
+        Add the player's life (action history and mean embeddings) to the life log when player
+        dies
 
         Params
         ======
@@ -141,32 +237,18 @@ class Player:
             : Time (in ticks) of death of the player
         alive_count (int)
             : Number of agents alive
+        life_log    (pygeneses.envs.prima_vita.life_log.LifeLogWriter)
+            : Life log to append to, a segment holding only this player is written to log_dir if
+              not given (optional)
         """
 
         # Show in front end API
         print(f"RIP {self.born_at}-{self.index}, alive count = {alive_count}")
 
-        # Form filename to save logs into
-        file_name = str(self.born_at) + "-" + str(self.index)
-
-        # Open file at location to dump logs
-        file = open(self.log_dir + "/" + file_name + ".npy", "wb")
-        np.save(file, np.array(self.action_history, dtype=object))
-        file.close()
-
-        # Average embeddings over entire life
-        self.embeddings = (
-            self.embeddings / (time - self.born_at)
-            if time != self.born_at
-            else self.embeddings
-        )
-
-        # Open file at location to dump embeddings
-        file = open(
-            os.path.join(self.log_dir, "Embeddings/") + file_name + ".npy", "wb"
-        )
-        np.save(file, self.embeddings)
-        file.close()
+        # Append to the life log (written in segments)
+        if life_log is None:
+            life_log = LifeLogWriter(self.log_dir, segment_size=1)
+        life_log.append(self, time)
 
     def update_history(
         self,
@@ -198,76 +280,19 @@ class Player:
         fight_with    (int)
             : Id of player with which current agent fought (optional)
         """
-        # If action number is less than or equal to 9 (i.e. movement in 8 directions, stay or ingestion) then
-        if action <= 9:
-            self.action_history.append(
-                np.array(
-                    [
-                        action,
-                        time,
-                        reward,
-                        self.energy,
-                        self.playerX,
-                        self.playerY,
-                        self.states,
-                    ],
-                    dtype=object,
-                )
-            )
-        # If action number is 10 (i.e. asexual reproduction)
-        elif action == 10:
-            self.action_history.append(
-                np.array(
-                    [
-                        action,
-                        time,
-                        reward,
-                        self.energy,
-                        num_offspring,
-                        np.array(offspring_ids),
-                        self.playerX,
-                        self.playerY,
-                        self.states,
-                    ],
-                    dtype=object,
-                )
-            )
-        # If action number is 11 (i.e. sexual reproduction)
-        elif action == 11:
-            self.action_history.append(
-                np.array(
-                    [
-                        action,
-                        time,
-                        reward,
-                        self.energy,
-                        num_offspring,
-                        np.array(offspring_ids),
-                        mate_id,
-                        self.playerX,
-                        self.playerY,
-                        self.states,
-                    ],
-                    dtype=object,
-                )
-            )
-        # If action number is 12 (i.e. fight)
-        elif action == 12:
-            self.action_history.append(
-                np.array(
-                    [
-                        action,
-                        time,
-                        reward,
-                        self.energy,
-                        fight_with,
-                        self.playerX,
-                        self.playerY,
-                        self.states,
-                    ],
-                    dtype=object,
-                )
-            )
+        self.action_history.record(
+            action,
+            time,
+            reward,
+            self.energy,
+            self.playerX,
+            self.playerY,
+            self.states,
+            num_offspring,
+            offspring_ids,
+            mate_id,
+            fight_with,
+        )
 
     def change_player_xposition(self, x):
         """
@@ -279,19 +304,19 @@ class Player:
             : Add to player's current x coordinate the value x (either positive or negative)
         """
 
-        # If agent can move
-        if not self.cannot_move:
-            # Update current x coordinate by adding new x
-            self.playerX += x
+        population, slot = self.population, self.slot
 
-            # If x coordinate goes out of bounds of the pygame screen then adjust it
-            if self.playerX <= 0:
-                self.playerX = 0
-            elif self.playerX >= (SCREEN_WIDTH - self.PLAYER_WIDTH):
-                self.playerX = SCREEN_WIDTH - self.PLAYER_WIDTH
+        # If agent can move
+        if not population.cannot_move[slot]:
+            # Update current x coordinate by adding new x, if x coordinate goes out of bounds of
+            # the world then clamp or wrap it
+            new_x, _ = population.bound(
+                population.x[slot] + x, population.y[slot], self.PLAYER_WIDTH, self.PLAYER_HEIGHT
+            )
+            population.move(slot, new_x, population.y[slot])
 
             # Reduce energy by 2 for movement
-            self.energy -= 2
+            population.energy[slot] -= 2
 
     def change_player_yposition(self, y, no_energy_change=False):
         """
@@ -305,20 +330,20 @@ class Player:
             : Whether to change energy or not
         """
 
-        # If agent can move
-        if not self.cannot_move:
-            # Update current y coordinate by adding new y
-            self.playerY += y
+        population, slot = self.population, self.slot
 
-            # If y coordinate goes out of bounds of the pygame screen then adjust it
-            if self.playerY <= 0:
-                self.playerY = 0
-            elif self.playerY >= (SCREEN_HEIGHT - self.PLAYER_HEIGHT):
-                self.playerY = SCREEN_HEIGHT - self.PLAYER_HEIGHT
+        # If agent can move
+        if not population.cannot_move[slot]:
+            # Update current y coordinate by adding new y, if y coordinate goes out of bounds of
+            # the world then clamp or wrap it
+            _, new_y = population.bound(
+                population.x[slot], population.y[slot] + y, self.PLAYER_WIDTH, self.PLAYER_HEIGHT
+            )
+            population.move(slot, population.x[slot], new_y)
 
             # Reduce energy by 2 for movement
             if not no_energy_change:
-                self.energy -= 2
+                population.energy[slot] -= 2
 
     def asexual_reproduction(self, len_players, time_given, initial_energy):
         """
@@ -345,7 +370,7 @@ class Player:
         offspring_ids = []
 
         # Select random number of offsprings in range [2, 8]
-        num_offspring = random.randint(2, 8)
+        num_offspring = int(self.population.rng.integers(2, 8, endpoint=True))
 
         # Loop through offspring count
         for i in range(num_offspring):
@@ -363,6 +388,8 @@ class Player:
                     time_given,
                     initial_energy,
                     mode=self.mode,
+                    population=self.population,
+                    history_detail=self.action_history.detail,
                 )
             )
 
@@ -422,7 +449,7 @@ class Player:
         # If gen_offspring is true then parent will give birth (only one parent gives birth)
         if gen_offspring:
             # Select randomly number of offsprings in range [2, 8]
-            INITIAL_POPULATION = random.randint(2, 8)
+            INITIAL_POPULATION = int(self.population.rng.integers(2, 8, endpoint=True))
 
             # Loop through offspring count
             for i in range(INITIAL_POPULATION):
@@ -439,6 +466,8 @@ class Player:
                         mating_begin_time,
                         initial_energy,
                         mode=self.mode,
+                        population=self.population,
+                        history_detail=self.action_history.detail,
                     )
                 )
 
@@ -0,0 +1,393 @@
+# Population class storing all agents of prima vita environment column-wise
+
+# Import required libraries
+import numpy as np
+
+# Import global constants
+from .global_constants import *
+from .embedding_stats import EmbeddingStats
+from .random_streams import default_rng
+
+# Columns (name, dtype) stored for every agent
+POPULATION_COLUMNS = (
+    ("x", np.float32),
+    ("y", np.float32),
+    ("energy", np.int32),
+    ("born_at", np.int32),
+    ("gender", np.int8),
+    ("is_impotent", np.bool_),
+    ("cannot_move", np.bool_),
+    ("ingesting_begin_time", np.int32),
+    ("ingesting_particle_index", np.int32),
+    ("mating_begin_time", np.int32),
+    ("fighting_with", np.int32),
+    ("food_ate", np.int32),
+    ("alive", np.bool_),
+)
+
+# Mapping gender to number (and back)
+GENDER_TO_NUMBER = {"Female": 1, "Male": 2}
+NUMBER_TO_GENDER = {1: "Female", 2: "Male"}
+
+
+class Population:
+    """
+    Structure of arrays holding the state of every agent (alive or dead) in the environment, agent
+    with slot i has its attributes at position i of every column
+
+    Data members
+    ============
+    size                     (int)
+        : Number of slots used (alive and dead agents)
+    capacity                 (int)
+        : Number of slots allocated in every column
+    num_alive                (int)
+        : Number of alive agents
+    leading_dead             (int)
+        : Number of dead agents before the first alive agent (slot of the first alive agent)
+    alive_slots              (numpy.ndarray)
+        : Dense list of alive slots (first num_alive entries, in no particular order), dead agents
+          are swap-removed so that add and kill take constant time
+    alive_position           (numpy.ndarray)
+        : Position of every slot in alive_slots (-1 for dead agents)
+    spatial_index            (pygeneses.envs.prima_vita.spatial_hash.SpatialHash/None)
+        : Optional grid of alive agents' positions, kept up to date on add, move and kill
+    width                    (int)
+        : Width of the world
+    height                   (int)
+        : Height of the world
+    boundary                 (str)
+        : What happens at the edges of the world, clamp - agents stop at the edges, wrap - agents
+          leaving on one side come back on the opposite side (toroidal world)
+    period                   (tuple/None)
+        : Size (width, height) of the world if it is toroidal else None
+    x                        (numpy.ndarray)
+        : x coordinates of agents (float32)
+    y                        (numpy.ndarray)
+        : y coordinates of agents (float32)
+    energy                   (numpy.ndarray)
+        : Energy of agents (int32)
+    born_at                  (numpy.ndarray)
+        : Time of birth of agents (int32)
+    gender                   (numpy.ndarray)
+        : Gender of agents, 1 for Female and 2 for Male (int8)
+    is_impotent              (numpy.ndarray)
+        : Impotency of agents (bool)
+    cannot_move              (numpy.ndarray)
+        : Whether agents are blocked by ingestion or mating (bool)
+    ingesting_begin_time     (numpy.ndarray)
+        : Time at which agents began ingesting, 0 if not ingesting (int32)
+    ingesting_particle_index (numpy.ndarray)
+        : Index of food particle being ingested (int32)
+    mating_begin_time        (numpy.ndarray)
+        : Time at which agents began mating, 0 if not mating (int32)
+    fighting_with            (numpy.ndarray)
+        : Slot of the agent currently being fought, -1 if none (int32)
+    food_ate                 (numpy.ndarray)
+        : Number of food particles consumed (int32)
+    alive                    (numpy.ndarray)
+        : Alive mask (bool)
+    embeddings               (pygeneses.envs.prima_vita.embedding_stats.EmbeddingStats)
+        : Running mean (and optionally variance) of the embeddings of agents
+    rng                      (numpy.random.Generator)
+        : Generator of the attributes of new players and of numbers of offspring
+    """
+
+    def __init__(
+        self,
+        capacity=16,
+        spatial_index=None,
+        width=SCREEN_WIDTH,
+        height=SCREEN_HEIGHT,
+        boundary="clamp",
+        embedding_variance=False,
+        rng=None,
+    ):
+        """
+        Initializer for Population class
+
+        Params
+        ======
+        capacity      (int)
+            : Number of slots to allocate initially (optional)
+        spatial_index (pygeneses.envs.prima_vita.spatial_hash.SpatialHash)
+            : Empty grid to index alive agents' positions in (optional)
+        width         (int)
+            : Width of the world (optional)
+        height        (int)
+            : Height of the world (optional)
+        boundary      (str)
+            : Behaviour at the edges of the world, clamp or wrap (optional)
+        embedding_variance (bool)
+            : Whether to track the variance of agents' embeddings (optional)
+        rng           (numpy.random.Generator)
+            : Generator of the attributes of new players, an unseeded one is used if not given
+              (optional)
+        """
+
+        self.size = 0
+        self.capacity = max(int(capacity), 1)
+        self.num_alive = 0
+        self.leading_dead = 0
+        self.spatial_index = spatial_index
+        self.width = width
+        self.height = height
+        self.boundary = boundary
+        self.period = (width, height) if boundary == "wrap" else None
+        self.rng = rng if rng is not None else default_rng()
+
+        # Allocate every column
+        for name, dtype in POPULATION_COLUMNS:
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+
+        # Allocate dense list of alive slots
+        self.alive_slots = np.zeros(self.capacity, dtype=np.int64)
+        self.alive_position = np.full(self.capacity, -1, dtype=np.int64)
+
+        # Allocate embedding statistics (columns are added by the first embedding)
+        self.embeddings = EmbeddingStats(self.capacity, embedding_variance)
+
+    def __len__(self):
+        return self.size
+
+    def grow(self, min_capacity):
+        """
+        Grow all columns (doubling capacity) so that at least min_capacity slots fit
+
+        Params
+        ======
+        min_capacity (int)
+            : Minimum number of slots required
+        """
+
+        if min_capacity <= self.capacity:
+            return
+
+        new_capacity = self.capacity
+        while new_capacity < min_capacity:
+            new_capacity *= 2
+
+        for name, dtype in POPULATION_COLUMNS:
+            column = np.zeros(new_capacity, dtype=dtype)
+            column[: self.size] = getattr(self, name)[: self.size]
+            setattr(self, name, column)
+
+        alive_slots = np.zeros(new_capacity, dtype=np.int64)
+        alive_slots[: self.num_alive] = self.alive_slots[: self.num_alive]
+        self.alive_slots = alive_slots
+
+        alive_position = np.full(new_capacity, -1, dtype=np.int64)
+        alive_position[: self.size] = self.alive_position[: self.size]
+        self.alive_position = alive_position
+
+        self.embeddings.grow(new_capacity)
+
+        self.capacity = new_capacity
+
+    def alive_indices(self):
+        """
+        Return slots of all alive agents (a view over alive_slots, in no particular order)
+        """
+
+        return self.alive_slots[: self.num_alive]
+
+    def mark_alive(self, slot):
+        """
+        Append a slot to the dense list of alive slots
+
+        Params
+        ======
+        slot (int)
+            : Slot of the agent
+        """
+
+        self.alive_slots[self.num_alive] = slot
+        self.alive_position[slot] = self.num_alive
+        self.num_alive += 1
+
+    def mark_dead(self, slot):
+        """
+        Swap-remove a slot from the dense list of alive slots and skip leading dead slots
+
+        Params
+        ======
+        slot (int)
+            : Slot of the agent
+        """
+
+        # Move the last alive slot into the position of the removed one
+        position = self.alive_position[slot]
+        last = self.alive_slots[self.num_alive - 1]
+        self.alive_slots[position] = last
+        self.alive_position[last] = position
+        self.alive_position[slot] = -1
+        self.num_alive -= 1
+
+        while self.leading_dead < self.size and not self.alive[self.leading_dead]:
+            self.leading_dead += 1
+
+    def add(
+        self, x=0, y=0, energy=0, born_at=0, gender="Female", is_impotent=False
+    ):
+        """
+        Add an alive agent to the population
+
+        Params
+        ======
+        x           (float)
+            : Initial x coordinate of the agent
+        y           (float)
+            : Initial y coordinate of the agent
+        energy      (int)
+            : Initial energy of the agent
+        born_at     (int)
+            : Time of birth of the agent
+        gender      (str)
+            : Gender of the agent (Male/Female)
+        is_impotent (bool)
+            : Is the agent impotent or not
+
+        Returns
+        =======
+        slot (int)
+            : Slot of the new agent in every column
+        """
+
+        self.grow(self.size + 1)
+
+        slot = self.size
+        self.size += 1
+        self.mark_alive(slot)
+
+        self.x[slot] = x
+        self.y[slot] = y
+        self.energy[slot] = energy
+        self.born_at[slot] = born_at
+        self.gender[slot] = GENDER_TO_NUMBER[gender]
+        self.is_impotent[slot] = is_impotent
+        self.cannot_move[slot] = False
+        self.ingesting_begin_time[slot] = 0
+        self.ingesting_particle_index[slot] = 0
+        self.mating_begin_time[slot] = 0
+        self.fighting_with[slot] = -1
+        self.food_ate[slot] = 0
+        self.alive[slot] = True
+
+        if self.spatial_index is not None:
+            self.spatial_index.insert(slot, self.x[slot], self.y[slot])
+
+        return slot
+
+    def adopt(self, player):
+        """
+        Copy the row of a player (stored in some other population) into this population and make
+        the player a view of the new row
+
+        Params
+        ======
+        player (pygeneses.envs.prima_vita.player_class.Player)
+            : Player to be moved into this population
+
+        Returns
+        =======
+        slot (int)
+            : Slot of the player in this population
+        """
+
+        self.grow(self.size + 1)
+
+        slot = self.size
+        self.size += 1
+
+        for name, _ in POPULATION_COLUMNS:
+            getattr(self, name)[slot] = getattr(player.population, name)[player.slot]
+        self.embeddings.copy_row(slot, player.population.embeddings, player.slot)
+
+        if self.alive[slot]:
+            self.mark_alive(slot)
+
+            if self.spatial_index is not None:
+                self.spatial_index.insert(slot, self.x[slot], self.y[slot])
+
+        # Dead agents at the beginning are skipped
+        if slot == self.leading_dead and not self.alive[slot]:
+            self.leading_dead += 1
+
+        player.population = self
+        player.slot = slot
+
+        return slot
+
+    def kill(self, slot):
+        """
+        Mark an agent as dead
+
+        Params
+        ======
+        slot (int)
+            : Slot of the agent to be killed
+        """
+
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.mark_dead(slot)
+
+            if self.spatial_index is not None:
+                self.spatial_index.remove(slot)
+
+    def move(self, slot, x, y):
+        """
+        Set the position of an agent
+
+        Params
+        ======
+        slot (int)
+            : Slot of the agent to be moved
+        x    (float)
+            : New x coordinate
+        y    (float)
+            : New y coordinate
+        """
+
+        self.x[slot] = x
+        self.y[slot] = y
+
+        if self.spatial_index is not None and self.alive[slot]:
+            self.spatial_index.move(slot, self.x[slot], self.y[slot])
+
+    def bound(self, x, y, margin_x=0, margin_y=0):
+        """
+        Bring a position back inside the world, in a toroidal world it is wrapped around the edges
+        else it is clamped to [0, width - margin_x] x [0, height - margin_y]
+
+        Params
+        ======
+        x        (float)
+            : x coordinate
+        y        (float)
+            : y coordinate
+        margin_x (float)
+            : Width of the agent (kept inside a bounded world) (optional)
+        margin_y (float)
+            : Height of the agent (kept inside a bounded world) (optional)
+
+        Returns
+        =======
+        x (float)
+            : x coordinate inside the world
+        y (float)
+            : y coordinate inside the world
+        """
+
+        if self.boundary == "wrap":
+            # Coordinates are stored as float32, which may round x % width up to width
+            x, y = np.float32(x % self.width), np.float32(y % self.height)
+            return (
+                float(x) if x < self.width else 0.0,
+                float(y) if y < self.height else 0.0,
+            )
+
+        return (
+            min(max(x, 0), self.width - margin_x),
+            min(max(y, 0), self.height - margin_y),
+        )
@@ -3,10 +3,8 @@
 # Import required libraries
 import os
 import sys
-import glob
 import shutil
 import pygame
-import random
 import numpy as np
 import time
 import importlib
@@ -15,6 +13,23 @@ from itertools import cycle
 # Import other classes
 from .player_class import Player
 from .particle_class import Particle
+from .food_field import FoodField
+from .event_queue import EventQueue, INGESTION_DONE, MATING_DONE, AGE_OUT
+from .life_log import LifeLogWriter, BackgroundLifeLogWriter
+from .event_log import (
+    EventLog,
+    ASEXUAL_REPRODUCTION,
+    SEXUAL_REPRODUCTION,
+    DEATH,
+    FIGHT,
+    INGESTION,
+)
+from .population import Population
+from .profiler import TickProfiler
+from .random_streams import RandomStreams
+from .growable_array import GrowableArray
+from .spatial_hash import SpatialHash
+from .neighbours import NeighbourIndex, NeighbourLists, minimal_image, radius_neighbours
 from .global_constants import *
 
 # Dictionary to map from string to name of model
@@ -35,6 +50,8 @@ class PrimaVita:
        : The path to log directory where agent's life history to be logged
     initial_population          (int)
        : Size of initial population when agent starts
+    start_population            (int)
+       : Size of initial population at every reset (initial_population grows with every birth)
     state_size                  (int)
        : Number of variables in state that the agent experiences during his/her/its lifetime
     action_size                 (int)
@@ -49,22 +66,109 @@ class PrimaVita:
     allow_regenerate            (bool)
        : Population can be regenerated after perishing or not
     food_regen_condition_is_met (bool)
-       : Should food be regenerated now or not based on certain minimum threshold
+       : Should food be regenerated now or not (see check_food_regen)
     players                     (numpy.ndarray)
-       : NumPy array of Player objects (representing the agents in the world)
-    killed                      (numpy.ndarray)
-       : NumPy array containing ids of killed players
+       : NumPy array of Player objects (representing the agents in the world), these are views over
+         the rows of population, the array itself is a view over a GrowableArray (so that births
+         don't copy it)
+    population                  (pygeneses.envs.prima_vita.population.Population)
+       : Columnar store (structure of arrays) with the numeric attributes and alive mask of all agents
+    killed                      (list)
+       : Ids of killed players (in order of death)
+    logs_written                (int)
+       : Number of life logs written to log_dir
+    life_log                    (pygeneses.envs.prima_vita.life_log.LifeLogWriter)
+       : Columnar log of dead agents' lives, written to log_dir in segments of log_segment_size lives
+         (pending lives are written when a run ends or the population perishes)
+    log_segment_size            (int)
+       : Number of lives per segment of the life log
+    log_writer                  (str)
+       : How the life log is written, background - a background thread packs and writes lives (deaths
+         only queue them, see BackgroundLifeLogWriter), sync - lives are written by the simulation
+    log_queue_size              (int)
+       : Number of lives that can wait for the background writer before deaths block
+    event_log                   (pygeneses.envs.prima_vita.event_log.EventLog)
+       : Table of population-level events (reproductions, deaths, fights and ingestions) and of
+         per-tick counters (alive, births, deaths, food left, mean energy) written to log_dir
+    event_chunk_size            (int)
+       : Number of buffered rows of the event log which triggers a write
+    embedding_variance          (bool)
+       : Whether to track the variance of agents' embeddings along with their mean (see
+         EmbeddingStats)
+    profile                     (bool)
+       : Whether to time the phases of every tick (see TickProfiler)
+    profiler                    (pygeneses.envs.prima_vita.profiler.TickProfiler)
+       : Wall time and number of calls of every phase of every tick (does nothing unless profile)
+    history_detail              (str)
+       : State captured in agents' action histories, full - vectors of all food particles and
+         players seen (needed to replay lives in VitaBoard), summary - their counts and distances to
+         the nearest ones, none - nothing
+    births                      (int)
+       : Number of agents born (not counting initial population)
+    next_id                     (int)
+       : Index (id in the life log and event log) of the next agent born, equal to the number of
+         players unless compact was called (indices are never reused, even after compaction)
+    stop_reason                 (str/None)
+       : Why the last run stopped (extinction, stop_at, max_ticks, time_budget or max_births)
+    leading_zeros               (int)
+       : Number of dead players before the first alive player
+    food                        (pygeneses.envs.prima_vita.food_field.FoodField)
+       : Columnar store of all food particles (coordinates and consumed mask), uneaten particles
+         are indexed in a grid if spatial_hash is True
     food_particles              (numpy.ndarray)
-       : NumPy array containing Particle objects (representing food particles in the world)
+       : NumPy array containing Particle objects (representing food particles in the world), built
+         from food on every access
+    seed                        (int)
+       : Seed of all random streams (drawn from OS entropy if not given), same seed and same
+         params give the same run
+    random_streams              (pygeneses.envs.prima_vita.random_streams.RandomStreams)
+       : Independent random number generators of food, players, interactions and the RL model
+    initial_food                (int/None)
+       : Number of food particles at the beginning of time, None to choose it at random (see
+         initial_number_of_particles)
     number_of_particles         (int)
-       : Total number of food particles in the environment at the beginning of time (TICK = 0)
-    particles_to_regrow         (int)
-       : Number of particles to be regrown
+       : Total number of food particles in the environment at the beginning of time (TICK = 0),
+         initial_food if given, otherwise about 75 for a world of the size of the screen and
+         proportional to the area of the world
+    particles_to_regrow         (tuple)
+       : Range (min, max) of the number of particles to be regrown at once (threshold and periodic
+         regrowth)
+    food_regen_mode             (str/None)
+       : How food regrows, threshold - when fewer than food_regen_threshold particles are left,
+         periodic - every food_regen_period ticks, density - every food_regen_period ticks in every
+         grid cell holding fewer than food_regen_density particles, None - food never regrows
+    food_regen_threshold        (int/None)
+       : Number of uneaten particles below which food regrows (threshold regrowth), None for half
+         of number_of_particles
+    food_regen_period           (int)
+       : Number of ticks between regrowths (periodic and density regrowth)
+    food_regen_cell_size        (float)
+       : Side of the grid cells in which density is measured (density regrowth)
+    food_regen_density          (float/None)
+       : Target number of particles in a grid cell (density regrowth), None for the average density
+         of number_of_particles particles
     initial_energy              (int)
        : Initial energy of agents
     state_size                  (int)
        : Size to which state is to be padded
-    model                       (pygeneses.models)
+    state_buffer                (numpy.ndarray)
+       : Preallocated float32 matrix holding the state of every agent (one row per agent)
+    state_rows                  (int)
+       : Number of rows of state_buffer computed by the last call to get_current_state
+    state_deaths                (int)
+       : Number of killed players whose rows of state_buffer have been cleared
+    events                      (pygeneses.envs.prima_vita.event_queue.EventQueue)
+       : Scheduled ends of ingestion and mating and age-out deaths, fired by update_lifecycle when
+         they are due
+    scheduled_rows              (int)
+       : Number of players whose age-out death has been scheduled
+    energy_changed              (list)
+       : Indices of players whose energy changed since the last call to update_lifecycle (only
+         these are checked for death by energy)
+    model_name                  (str/None)
+       : Name of the RL algorithm used to train agents (None to drive the environment from outside
+         through reset and step)
+    model                       (pygeneses.models/None)
        : Instance of pygeneses.models (RL algorithms)
     model_updates               (int)
        : Number of ticks after which model for all the population will be updated
@@ -82,6 +186,25 @@ class PrimaVita:
        : Killing method to use when population reaches a max cap
     decay_rate                  (int)
        : Age after which reward decays
+    spatial_hash                (bool)
+       : Whether to index agents and food particles in a uniform grid (cells of side sensory_radius)
+         so that neighbour search only visits nearby cells
+    tick_mode                   (str)
+       : How agents act in a tick, sequential - one after another, each observing the actions of the
+         previous ones, synchronous - all at once on the same observation (see take_actions)
+    observation                 (str)
+       : Which neighbours make up a state, index - neighbours in increasing order of index, nearest
+         - nearest neighbours in increasing order of distance (see write_states)
+    world_width                 (int)
+       : Width of the world (in pixels)
+    world_height                (int)
+       : Height of the world (in pixels)
+    boundary                    (str)
+       : What happens at the edges of the world, clamp - agents stop at the edges, wrap - agents
+         leaving on one side come back on the opposite side and neighbours are seen across the
+         seams (toroidal world)
+    period                      (tuple/None)
+       : Size (world_width, world_height) of the world if it is toroidal else None
     mode                        (str)
        : Mode in which to run environment (human/bot)
     screen                      (pygame.display/None)
@@ -127,13 +250,19 @@ class PrimaVita:
             else False
         )
         self.food_regen_condition_is_met = False
-        self.players = np.array([])
-        self.killed = np.array([])
-        self.food_particles = np.array([])
+        self._players = GrowableArray()
+        self.killed = []
+        self.logs_written = 0
+        self.births = 0
+        self.next_id = 0
+        self.stop_reason = None
+        self.state_rows = 0
+        self.state_deaths = 0
+        self.events = EventQueue()
+        self.scheduled_rows = 0
+        self.energy_changed = []
         self.current_population = 0
         self.screen = None
-        self.number_of_particles = random.randint(70, 80)
-        self.leading_zeros = 0
         # Can take values from user
         self.initial_population = (
             params_dic["initial_population"]
@@ -147,13 +276,17 @@ class PrimaVita:
             params_dic["action_size"] if "action_size" in params_dic.keys() else 13
         )
         # self.max_regenerations = params_dic['max_regenerations'] if 'max_regenerations' in params_dic.keys() else 0
-        # self.particles_to_regrow = (20, 40)
+        self.particles_to_regrow = (
+            params_dic["particles_to_regrow"]
+            if "particles_to_regrow" in params_dic.keys()
+            else (20, 40)
+        )
         self.initial_energy = (
             params_dic["initial_energy"]
             if "initial_energy" in params_dic.keys()
             else 200
         )
-        self.model = (
+        self.model_name = (
             params_dic["model"] if "model" in params_dic.keys() else "reinforce"
         )
         self.model_updates = (
@@ -178,9 +311,106 @@ class PrimaVita:
             if "sensory_radius" in params_dic.keys()
             else 100
         )
+        self.start_population = self.initial_population
         self.decay_rate = (
             params_dic["decay_rate"] if "decay_rate" in params_dic.keys() else 23
         )
+        self.spatial_hash = (
+            params_dic["spatial_hash"] if "spatial_hash" in params_dic.keys() else True
+        )
+        self.tick_mode = (
+            params_dic["tick_mode"] if "tick_mode" in params_dic.keys() else "sequential"
+        )
+        self.observation = (
+            params_dic["observation"] if "observation" in params_dic.keys() else "index"
+        )
+        self.food_regen_mode = (
+            params_dic["food_regen_mode"]
+            if "food_regen_mode" in params_dic.keys()
+            else None
+        )
+        self.food_regen_threshold = (
+            params_dic["food_regen_threshold"]
+            if "food_regen_threshold" in params_dic.keys()
+            else None
+        )
+        self.food_regen_period = (
+            params_dic["food_regen_period"]
+            if "food_regen_period" in params_dic.keys()
+            else 20
+        )
+        self.food_regen_cell_size = (
+            params_dic["food_regen_cell_size"]
+            if "food_regen_cell_size" in params_dic.keys()
+            else self.sensory_radius
+        )
+        self.food_regen_density = (
+            params_dic["food_regen_density"]
+            if "food_regen_density" in params_dic.keys()
+            else None
+        )
+        self.log_segment_size = (
+            params_dic["log_segment_size"]
+            if "log_segment_size" in params_dic.keys()
+            else 256
+        )
+        self.log_writer = (
+            params_dic["log_writer"] if "log_writer" in params_dic.keys() else "background"
+        )
+        self.log_queue_size = (
+            params_dic["log_queue_size"]
+            if "log_queue_size" in params_dic.keys()
+            else 4096
+        )
+        self.event_chunk_size = (
+            params_dic["event_chunk_size"]
+            if "event_chunk_size" in params_dic.keys()
+            else 4096
+        )
+        self.embedding_variance = (
+            params_dic["embedding_variance"]
+            if "embedding_variance" in params_dic.keys()
+            else False
+        )
+        self.history_detail = (
+            params_dic["history_detail"]
+            if "history_detail" in params_dic.keys()
+            else "full"
+        )
+        self.profile = params_dic["profile"] if "profile" in params_dic.keys() else False
+        self.profiler = TickProfiler(self.profile)
+        self.world_width = (
+            params_dic["world_width"] if "world_width" in params_dic.keys() else SCREEN_WIDTH
+        )
+        self.world_height = (
+            params_dic["world_height"]
+            if "world_height" in params_dic.keys()
+            else SCREEN_HEIGHT
+        )
+        self.boundary = (
+            params_dic["boundary"] if "boundary" in params_dic.keys() else "clamp"
+        )
+        self.period = (
+            (self.world_width, self.world_height) if self.boundary == "wrap" else None
+        )
+        self.seed = params_dic["seed"] if "seed" in params_dic.keys() else None
+        self.random_streams = RandomStreams(self.seed)
+        self.seed = self.random_streams.seed
+        self.initial_food = (
+            params_dic["initial_food"] if "initial_food" in params_dic.keys() else None
+        )
+        if self.initial_food is not None and self.initial_food < 1:
+            raise ValueError("initial_food must be at least 1")
+        self.number_of_particles = self.initial_number_of_particles()
+
+        # Columnar stores of all agents and all food particles
+        self.population = self.new_population()
+        self.food = self.new_food_field()
+
+        # Preallocated states of all agents (one row per agent)
+        self.state_buffer = np.zeros(
+            (self.population.capacity, self.state_size), dtype=np.float32
+        )
 
         # If mode is human then pygame environment is shown
         self.mode = mode
@@ -191,15 +421,287 @@ class PrimaVita:
         )
         self.current_feedbacked_player = -1
 
+        # Check tick mode (human feedback is asked for one action at a time)
+        if self.tick_mode not in ("sequential", "synchronous"):
+            raise ValueError("tick_mode must be either sequential or synchronous")
+        if self.tick_mode == "synchronous" and self.human_feedback:
+            raise ValueError("human_feedback is not supported in synchronous tick_mode")
+
+        # Check observation mode
+        if self.observation not in ("index", "nearest"):
+            raise ValueError("observation must be either index or nearest")
+
+        # Check food regrowth mode
+        if self.food_regen_mode not in (None, "threshold", "periodic", "density"):
+            raise ValueError(
+                "food_regen_mode must be one of threshold, periodic, density or None"
+            )
+
+        # Check world (agents are 32 pixels wide and food is kept 10 pixels away from the edges)
+        if self.world_width < 64 or self.world_height < 64:
+            raise ValueError("world_width and world_height must be at least 64")
+        if self.boundary not in ("clamp", "wrap"):
+            raise ValueError("boundary must be either clamp or wrap")
+
+        # Check life log writer
+        if self.log_writer not in ("background", "sync"):
+            raise ValueError("log_writer must be either background or sync")
+        if self.history_detail not in ("full", "summary", "none"):
+            raise ValueError("history_detail must be one of full, summary or none")
+
+        self.life_log = None
+        self.make_log_dir()
+
+        # Initialize environment
+        self.init()
+
+    def make_log_dir(self):
+        """
+        Create an empty log directory and a life log writing into it
+        """
+
+        # Stop the writer of the previous episode before its directory is deleted
+        if self.life_log is not None:
+            self.life_log.close()
+
         # Delete log_dir by same name if it exists already
         if os.path.exists(self.log_dir):
             shutil.rmtree(self.log_dir)
 
         os.mkdir(self.log_dir)
-        os.mkdir(os.path.join(self.log_dir, "Embeddings"))
+        if self.log_writer == "background":
+            self.life_log = BackgroundLifeLogWriter(
+                self.log_dir, self.log_segment_size, self.log_queue_size
+            )
+        else:
+            self.life_log = LifeLogWriter(self.log_dir, self.log_segment_size)
+        self.event_log = EventLog(self.log_dir, self.event_chunk_size)
 
-        # Initialize environment
-        self.init()
+    def new_spatial_index(self):
+        """
+        Create an empty grid for neighbour search (if spatial hashing is enabled)
+
+        Returns
+        =======
+        spatial_index (pygeneses.envs.prima_vita.spatial_hash.SpatialHash/None)
+            : Empty grid with cells of side sensory_radius or None
+        """
+
+        return SpatialHash(self.sensory_radius, self.period) if self.spatial_hash else None
+
+    def new_population(self, capacity=16):
+        """
+        Create an empty population living in this environment's world
+
+        Params
+        ======
+        capacity (int)
+            : Number of slots to allocate initially (optional)
+
+        Returns
+        =======
+        population (pygeneses.envs.prima_vita.population.Population)
+            : Empty population
+        """
+
+        return Population(
+            capacity,
+            self.new_spatial_index(),
+            self.world_width,
+            self.world_height,
+            self.boundary,
+            self.embedding_variance,
+            self.random_streams.players,
+        )
+
+    def new_food_field(self, capacity=16):
+        """
+        Create an empty food field lying in this environment's world
+
+        Params
+        ======
+        capacity (int)
+            : Number of slots to allocate initially (optional)
+
+        Returns
+        =======
+        food (pygeneses.envs.prima_vita.food_field.FoodField)
+            : Empty food field
+        """
+
+        return FoodField(capacity, self.new_spatial_index(), self.period)
+
+    def initial_number_of_particles(self):
+        """
+        Choose the number of food particles at the beginning of time, initial_food if given,
+        otherwise between 70 and 80 for a world of the size of the screen and scaled by the area of
+        the world (so that food density doesn't depend on world size)
+
+        Returns
+        =======
+        number_of_particles (int)
+            : Number of food particles
+        """
+
+        if self.initial_food is not None:
+            return int(self.initial_food)
+
+        area_ratio = self.world_width * self.world_height / (SCREEN_WIDTH * SCREEN_HEIGHT)
+
+        count = int(self.random_streams.food.integers(70, 80, endpoint=True))
+
+        return max(int(round(count * area_ratio)), 1)
+
+    @property
+    def players(self):
+        return self._players.view()
+
+    @players.setter
+    def players(self, players):
+        """
+        Replace all players, the population is rebuilt so that every Player object becomes a view
+        over the new population and any non Player entry (0) is treated as a dead agent
+
+        Params
+        ======
+        players (list/numpy.ndarray)
+            : Player objects (or 0 for dead agents)
+        """
+
+        self.population = self.new_population(len(players))
+        self.state_rows = 0
+        self.state_deaths = len(self.killed)
+
+        for player in players:
+            if isinstance(player, Player):
+                self.population.adopt(player)
+            else:
+                self.population.kill(self.population.add())
+
+        self._players = GrowableArray(players)
+        self.reschedule()
+
+    def reschedule(self):
+        """
+        Rebuild the event queue from the population (after players are replaced), ingestion and
+        mating in progress are scheduled to end, age-out deaths are scheduled by the next call to
+        update_lifecycle and every alive player is checked for death by energy
+        """
+
+        population = self.population
+        agents = self.alive_agents()
+
+        self.events = EventQueue()
+        self.scheduled_rows = 0
+        self.energy_changed = agents.tolist()
+
+        for idx in agents[population.ingesting_begin_time[agents] != 0]:
+            begin = int(population.ingesting_begin_time[idx])
+            self.events.push(begin + 1, INGESTION_DONE, idx, begin)
+        for idx in agents[population.mating_begin_time[agents] != 0]:
+            begin = int(population.mating_begin_time[idx])
+            self.events.push(begin + 2, MATING_DONE, idx, begin)
+
+    def compact(self):
+        """
+        Drop dead agents (never done unless asked, agent ids are stable otherwise), rows of dead
+        agents are removed from the population, its embeddings, the state buffer, players and the
+        RL model, so that memory grows with the number of alive agents instead of the number of
+        agents ever born
+
+        Alive agents keep their order, attributes, states and networks but get new ids (their rows
+        after compaction), the life log, action histories and event log are not affected as they
+        identify agents by the index they were born with (see next_id)
+
+        Returns
+        =======
+        mapping (numpy.ndarray)
+            : New id of every old id (-1 for dead agents)
+        """
+
+        agents = self.alive_agents()
+        mapping = np.full(len(self.players), -1, dtype=np.int64)
+        mapping[agents] = np.arange(len(agents))
+
+        # Computed states of alive agents (alive agents born after the last call to
+        # get_current_state come last, their rows are computed by the next call)
+        state_rows = int(np.count_nonzero(agents < self.state_rows))
+        states = self.state_buffer[agents[:state_rows]]
+
+        # Neighbours of alive agents are renumbered (dead ones are forgotten)
+        players = self.players[agents]
+        for player in players:
+            near = mapping[np.array(player.players_near, dtype=np.int64)]
+            player.players_near = near[near >= 0].tolist()
+
+        # Rebuild population (only alive rows are copied) and the event queue
+        self.killed = []
+        self.players = players
+        fighting = self.population.fighting_with
+        fighting[fighting >= 0] = mapping[fighting[fighting >= 0]]
+
+        # Shrink the state buffer to the new population
+        self.state_buffer = np.zeros(
+            (self.population.capacity, self.state_size), dtype=np.float32
+        )
+        self.state_buffer[:state_rows] = states
+        self.state_rows = state_rows
+        self.state_deaths = 0
+
+        # Drop dead agents from the RL model
+        if self.model is not None:
+            self.model.compact(agents)
+
+        self.initial_population = len(agents)
+        if self.current_feedbacked_player != -1:
+            self.current_feedbacked_player = int(mapping[self.current_feedbacked_player])
+
+        return mapping
+
+    @property
+    def leading_zeros(self):
+        return self.population.leading_dead
+
+    def alive_agents(self):
+        """
+        Return indices of all alive players in increasing order (computed from the dense list of
+        alive slots, so the cost doesn't grow with the number of dead players)
+        """
+
+        return np.sort(self.population.alive_indices())
+
+    @property
+    def food_particles(self):
+        """
+        Return all food particles as Particle objects (0 for consumed particles), the objects are
+        views over food created on every access so environment code reads food directly
+        """
+
+        food_particles = np.zeros(len(self.food), dtype=object)
+        for i in self.food.uneaten_indices():
+            food_particles[i] = Particle(mode=self.mode, field=self.food, slot=int(i))
+
+        return food_particles
+
+    @food_particles.setter
+    def food_particles(self, food_particles):
+        """
+        Replace all food particles, the food field is rebuilt so that every Particle object becomes
+        a view over the new field and any non Particle entry (0) is treated as a consumed particle
+
+        Params
+        ======
+        food_particles (list/numpy.ndarray)
+            : Particle objects (or 0 for consumed particles)
+        """
+
+        self.food = self.new_food_field(len(food_particles))
+
+        for food_particle in food_particles:
+            if isinstance(food_particle, Particle):
+                self.food.adopt(food_particle)
+            else:
+                self.food.eat(self.food.add(0, 0))
 
     def init(self):
         """
@@ -217,17 +719,26 @@ class PrimaVita:
         self.time -= 1
 
         # Put food particles in the environment
-        for j in range(self.number_of_particles):
-            self.food_particles = np.append(
-                self.food_particles, Particle(mode=self.mode)
-            )
+        rng = self.random_streams.food
+        self.food.extend(
+            rng.integers(10, self.world_width - 9, size=self.number_of_particles),
+            rng.integers(10, self.world_height - 9, size=self.number_of_particles),
+        )
 
         # Remove food particles which either overlap or are very close to another food particle
         self.check_particles()
 
         # Initialize the model, convert string to name of model and evaluate that to convert to class name
-        self.model = model_to_class[self.model](
-            self.initial_population, self.state_size, self.action_size
+        # (no model if the environment is driven through reset and step)
+        self.model = (
+            model_to_class[self.model_name](
+                self.initial_population,
+                self.state_size,
+                self.action_size,
+                seed=self.random_streams.model_seed(),
+            )
+            if self.model_name is not None
+            else None
         )
 
         if self.mode == "human":
@@ -289,146 +800,389 @@ class PrimaVita:
         initial_state (numpy.ndarray)
             : The state of all the agents in the environment, it contains vector (x, y) to
               all the food particles around a fixed radius of an agent, vector (x, y, sex) to
-              all the agents in the same radius - these vectors are padded to match state_size - 1
-              and the final entry in the state vector is the current energy of the agent
+              all the agents in the same radius - these vectors are padded to match state_size - 2
+              and the final entries in the state vector are the current energy and age of the agent,
+              this is a view over state_buffer (overwritten by the next call)
+        running       (bool)
+            : Whether any agent is still alive
         """
 
         # If everyone is killed then return -1
-        running = True
-        if len(self.killed) == len(self.players):
-            running = False
-
-        # List containing states of all the agents
-        initial_state = []
-
-        # Loop through all of the players
-        for i in range(len(self.players)):
-            # If a player is not dead then
-            if type(self.players[i]) != int:
-                # Update only current actor and surrounding player's state
-                if (idx == None) or (i in self.players[idx].players_near or i == idx):
-                    # Get the food particles in environment
-                    (
-                        env_food_vector,
-                        env_particle_distance,
-                        env_particle_index,
-                    ) = self.food_in_env(self.players[i], get_idx=True)
-
-                    # Get the agents in environment
-                    (
-                        env_player_vector,
-                        env_player_distance,
-                        env_player_index,
-                    ) = self.players_in_env(self.players[i], get_idx=True)
-
-                    # Find count of particles and players
-                    num_food_particles = len(env_food_vector) // 2
-                    num_players = len(env_player_vector) // 3
-
-                    # Compute the max out of two,  this will be the max value for loop counter
-                    max_count = max(num_food_particles, num_players)
-
-                    # Iterate and stack food and player in alternate positions
-                    temp_state = []
-                    j = 0
-
-                    while(j < max_count):
-                        if j < num_food_particles:
-                            temp_state.append(env_food_vector[(j*2):(j*2+2)])
-                        else:
-                            temp_state.append([0, 0])
-
-                        if j < num_players:
-                            temp_state.append(env_player_vector[(j*3):(j*3+3)])
-                        else:
-                            temp_state.append([0, 0, 0])
-                        j += 1
-
-                    # Update food_near and players_near for current player
-                    self.players[i].food_near = env_particle_index
-                    self.players[i].players_near = env_player_index
-
-                    # Flatten the list
-                    temp_state = sum(temp_state, [])
-
-                    # Save this as state in current agent's object
-                    self.players[i].states = np.array(
-                            [
-                                np.array(env_food_vector, dtype=object),
-                                np.array(env_player_vector, dtype=object),
-                            ],
-                            dtype=object,
-                        )
-
-                    # Pad to state_size - 1
-                    temp_state = self.pad_state(
-                        np.array(temp_state), self.state_size - 2
-                    )
-
-                    # Append energy to state
-                    temp_state = np.append(temp_state, [self.players[i].energy, (self.time - self.players[i].born_at)])
-
-                    # Append to initial_state
-                    initial_state.append(temp_state)
-                # Otherwise copy old state
-                else:
-                    env_food_vector = self.players[i].states[0]
-                    env_player_vector = self.players[i].states[1]
+        running = self.population.num_alive > 0
+
+        population = self.population
+        n = len(self.players)
+        alive = population.alive
+
+        # Grow the state buffer along with the population
+        if self.state_buffer.shape[0] < population.capacity:
+            state_buffer = np.zeros(
+                (population.capacity, self.state_size), dtype=np.float32
+            )
+            state_buffer[: self.state_rows] = self.state_buffer[: self.state_rows]
+            self.state_buffer = state_buffer
+
+        # Rebuild everyone's state from the neighbour index
+        if idx == None:
+            self.write_all_states()
+        # Update only current actor, surrounding players and players born after last update
+        else:
+            near = np.array(self.players[idx].players_near, dtype=np.int64)
+            agents = np.concatenate(
+                ([idx], near, np.arange(self.state_rows, n, dtype=np.int64))
+            )
+            agents = np.unique(agents[alive[agents]])
+            self.write_some_states(agents)
+
+        # Append energy and age to all the alive agents' states
+        agents = self.alive_agents()
+        self.state_buffer[agents, -2] = population.energy[agents]
+        self.state_buffer[agents, -1] = self.time - population.born_at[agents]
+
+        # If agent is dead the state is all zeros with -100 as age (only players killed since last
+        # update and new rows need to be cleared)
+        dead = np.concatenate(
+            (
+                np.array(self.killed[self.state_deaths :], dtype=np.int64),
+                np.arange(self.state_rows, n, dtype=np.int64),
+            )
+        )
+        dead = dead[~alive[dead]]
+        self.state_buffer[dead] = 0
+        self.state_buffer[dead, -1] = -100
+        self.state_deaths = len(self.killed)
+
+        self.state_rows = n
+
+        # Return the state as numpy array
+        return self.state_buffer[:n], running
+
+    def write_all_states(self):
+        """
+        Compute states of all alive agents from the neighbour index in one pass
+        """
 
-                    # Find count of particles and players
-                    num_food_particles = len(env_food_vector) // 2
-                    num_players = len(env_player_vector) // 3
+        population = self.population
+        with self.profiler.phase("neighbours"):
+            neighbour_index = self.build_neighbour_index()
+        agents = neighbour_index.agents
+
+        # Keep only neighbours inside the sensory radius
+        food = neighbour_index.food.within(self.sensory_radius)
+        players = neighbour_index.players.within(self.sensory_radius)
+
+        # Vectors from players to food particles (shortest ones in a toroidal world)
+        hosts = agents[food.rows()]
+        food_vectors = np.column_stack(
+            minimal_image(
+                neighbour_index.food_x[food.indices] - population.x[hosts],
+                neighbour_index.food_y[food.indices] - population.y[hosts],
+                self.period,
+            )
+        )
+
+        # Vectors from other players to players (and other players' sex)
+        hosts = agents[players.rows()]
+        player_vectors = np.column_stack(
+            minimal_image(
+                population.x[hosts].astype(np.float64) - population.x[players.indices],
+                population.y[hosts].astype(np.float64) - population.y[players.indices],
+                self.period,
+            )
+            + (population.gender[players.indices],)
+        )
+
+        # Update food_near, players_near and states for every player
+        for row, i in enumerate(agents):
+            food_begin, food_end = food.offsets[row], food.offsets[row + 1]
+            player_begin, player_end = players.offsets[row], players.offsets[row + 1]
+            self.set_player_surroundings(
+                i,
+                food.indices[food_begin:food_end],
+                food_vectors[food_begin:food_end],
+                players.indices[player_begin:player_end],
+                player_vectors[player_begin:player_end],
+            )
 
-                    # Compute the max out of two,  this will be the max value for loop counter
-                    max_count = max(num_food_particles, num_players)
+        self.write_states(agents, food, food_vectors, players, player_vectors)
 
-                    # Iterate and stack food and player in alternate positions
-                    temp_state = []
-                    j = 0
+    def write_some_states(self, agents):
+        """
+        Compute states of a few alive agents using per agent neighbour search
 
-                    while(j < max_count):
-                        if j < num_food_particles:
-                            temp_state.append(list(env_food_vector[(j*2):(j*2+2)]))
-                        else:
-                            temp_state.append([0, 0])
+        Params
+        ======
+        agents (numpy.ndarray)
+            : Indices of the agents whose state is to be computed
+        """
 
-                        if j < num_players:
-                            temp_state.append(list(env_player_vector[(j*3):(j*3+3)]))
-                        else:
-                            temp_state.append([0, 0, 0])
-                        j += 1
+        food_counts, food_indices, food_vectors = [], [], []
+        player_counts, player_indices, player_vectors = [], [], []
 
-                    # Flatten the list
-                    temp_state = sum(temp_state, [])
+        food_distances, player_distances = [], []
 
-                    # Pad to state_size - 1
-                    temp_state = self.pad_state(
-                        np.array(temp_state), self.state_size - 2
-                    )
+        for i in agents:
+            # Get the food particles in environment
+            env_food_vector, env_food_distance, env_particle_index = self.food_in_env(
+                self.players[i], get_idx=True
+            )
 
-                    # Append energy to state
-                    temp_state = np.append(temp_state, [self.players[i].energy, (self.time - self.players[i].born_at)])
+            # Get the agents in environment
+            env_player_vector, env_player_distance, env_player_index = self.players_in_env(
+                self.players[i], get_idx=True
+            )
 
-                    # Append to initial_state
-                    initial_state.append(temp_state)
-            else:
-                # If agent is dead append an array with a single value - zero
-                temp_state = np.append(np.zeros(20), [-100])
-                initial_state.append(temp_state)
+            food_counts.append(len(env_particle_index))
+            food_indices.append(np.array(env_particle_index, dtype=np.int64))
+            food_vectors.append(np.array(env_food_vector).reshape(-1, 2))
+            food_distances.append(np.array(env_food_distance, dtype=np.float64))
+            player_counts.append(len(env_player_index))
+            player_indices.append(np.array(env_player_index, dtype=np.int64))
+            player_vectors.append(np.array(env_player_vector).reshape(-1, 3))
+            player_distances.append(np.array(env_player_distance, dtype=np.float64))
+
+            self.set_player_surroundings(
+                i, food_indices[-1], food_vectors[-1], player_indices[-1], player_vectors[-1]
+            )
 
-        # Return the state as numpy array
-        return np.array(initial_state), running
+        food = NeighbourLists(
+            np.concatenate(([0], np.cumsum(food_counts))).astype(np.int64),
+            np.concatenate(food_indices),
+            np.concatenate(food_distances),
+        )
+        players = NeighbourLists(
+            np.concatenate(([0], np.cumsum(player_counts))).astype(np.int64),
+            np.concatenate(player_indices),
+            np.concatenate(player_distances),
+        )
+
+        self.write_states(
+            agents, food, np.concatenate(food_vectors), players, np.concatenate(player_vectors)
+        )
+
+    def set_player_surroundings(
+        self, idx, food_indices, food_vectors, player_indices, player_vectors
+    ):
+        """
+        Save the surroundings of a player in its object (used for logging)
+
+        Params
+        ======
+        idx            (int)
+            : Index of the player
+        food_indices   (numpy.ndarray)
+            : Indices of food particles in sensory radius
+        food_vectors   (numpy.ndarray)
+            : Vectors (x, y) to those food particles
+        player_indices (numpy.ndarray)
+            : Indices of players in sensory radius
+        player_vectors (numpy.ndarray)
+            : Vectors (x, y, sex) of those players
+        """
+
+        player = self.players[idx]
+
+        # Update food_near and players_near for current player
+        player.food_near = food_indices.tolist()
+        player.players_near = player_indices.tolist()
+
+        # Save this as state in current agent's object
+        player.states = np.empty(2, dtype=object)
+        player.states[0] = food_vectors.ravel()
+        player.states[1] = player_vectors.ravel()
+
+    def write_states(self, agents, food, food_vectors, players, player_vectors):
+        """
+        Write states of agents into state_buffer, food and player vectors are stacked in alternate
+        positions (food vector of 2 values followed by player vector of 3 values) and cut at
+        state_size - 2, the rest is padded with zeros
+
+        In nearest observation mode only the food particles and players that fit in the state are
+        written, the nearest ones in increasing order of distance (selected for all agents at once,
+        see NeighbourLists.nearest), otherwise neighbours are written in increasing order of index
+
+        Params
+        ======
+        agents         (numpy.ndarray)
+            : Indices of the agents (rows of state_buffer)
+        food           (pygeneses.envs.prima_vita.neighbours.NeighbourLists)
+            : Food particles around every agent
+        food_vectors   (numpy.ndarray)
+            : Vectors (x, y) of every entry in food
+        players        (pygeneses.envs.prima_vita.neighbours.NeighbourLists)
+            : Players around every agent
+        player_vectors (numpy.ndarray)
+            : Vectors (x, y, sex) of every entry in players
+        """
+
+        maxlen = self.state_size - 2
+        self.state_buffer[agents, :maxlen] = 0
+
+        # Keep the nearest food particles and players which fit in the state
+        if self.observation == "nearest":
+            food, selected = food.nearest(-(-maxlen // 5))
+            food_vectors = food_vectors[selected]
+            players, selected = players.nearest(-(-(maxlen - 2) // 5))
+            player_vectors = player_vectors[selected]
+
+        # j-th food vector goes at 5 * j and j-th player vector goes at 5 * j + 2
+        for lists, vectors, shift in ((food, food_vectors, 0), (players, player_vectors, 2)):
+            rows = agents[lists.rows()]
+            begin = 5 * lists.ranks() + shift
+            for k in range(vectors.shape[1]):
+                fits = begin + k < maxlen
+                self.state_buffer[rows[fits], begin[fits] + k] = vectors[fits, k]
+
+    def reset(self, seed=None):
+        """
+        Start a new episode (gym style API), a new initial population and new food particles are
+        generated and logs of the previous episode are deleted
+
+        Params
+        ======
+        seed (int)
+            : Seed to restart all random streams from, streams carry on from the previous episode
+              if not given (optional)
+
+        Returns
+        =======
+        observations (numpy.ndarray)
+            : States of all agents (row i is the state of agent with id i)
+        agent_ids    (numpy.ndarray)
+            : Ids of alive agents (agents which act in the next call to step)
+        """
+
+        # Restart random streams if asked to
+        if seed is not None:
+            self.random_streams = RandomStreams(seed)
+            self.seed = self.random_streams.seed
+
+        # Forget everything from the previous episode
+        self.time = -1
+        self.initial_population = self.start_population
+        self.food_regen_condition_is_met = False
+        self._players = GrowableArray()
+        self.killed = []
+        self.logs_written = 0
+        self.births = 0
+        self.next_id = 0
+        self.stop_reason = None
+        self.state_rows = 0
+        self.state_deaths = 0
+        self.events = EventQueue()
+        self.scheduled_rows = 0
+        self.energy_changed = []
+        self.current_population = 0
+        self.current_feedbacked_player = -1
+        self.profiler = TickProfiler(self.profile)
+        self.number_of_particles = self.initial_number_of_particles()
+        self.population = self.new_population()
+        self.food = self.new_food_field()
+
+        self.make_log_dir()
+        self.init()
+
+        # Observe initial states at time 0 (time is set back so that the first step is at time 0)
+        self.update_time()
+        observations, _ = self.get_current_state()
+        self.time -= 1
+
+        return (
+            observations.copy(),
+            self.alive_agents(),
+        )
+
+    def step(self, actions):
+        """
+        Advance the environment by one tick in which every alive agent takes the given action (gym
+        style API), actions are resolved together as in synchronous tick mode (see resolve_actions)
+        and the RL model (if any) is neither asked for actions nor given rewards
+
+        Agent ids are stable, agent with id i is always row i of the returned arrays, offsprings get
+        new ids (rows appended at the end) and ids of dead agents are never reused (unless compact
+        is called)
+
+        Params
+        ======
+        actions (numpy.ndarray)
+            : Action of every agent in agent_ids returned by the previous call to reset or step (in
+              the same order)
+
+        Returns
+        =======
+        observations (numpy.ndarray)
+            : States of all agents after the tick (rows of dead agents are all zeros with -100 as age)
+        rewards      (numpy.ndarray)
+            : Reward of every agent in this tick (0 for agents which didn't act)
+        dones        (numpy.ndarray)
+            : Boolean mask of dead agents
+        agent_ids    (numpy.ndarray)
+            : Ids of alive agents (agents which act in the next call to step)
+        """
+
+        population = self.population
+        agents = self.alive_agents()
+        actions = np.asarray(actions, dtype=np.int64).ravel()
+
+        if len(actions) != len(agents):
+            raise ValueError(
+                "Expected %d actions (one per alive agent), got %d"
+                % (len(agents), len(actions))
+            )
+        if np.any((actions < 0) | (actions >= self.action_size)):
+            raise ValueError("Actions must be in range [0, %d)" % self.action_size)
+
+        # Update time tick and regrow food if needed
+        self.update_time()
+        self.profiler.begin_tick()
+        with self.profiler.phase("food"):
+            self.update_food()
+
+        with self.profiler.phase("resolve"):
+            agent_rewards = self.resolve_actions(agents, actions) if len(agents) > 0 else []
+
+        # Kill random agents if population exceeds its maximum
+        with self.profiler.phase("lifecycle"):
+            self.cull_population()
+
+        # Get updated states
+        with self.profiler.phase("states"):
+            observations, _ = self.get_current_state()
+        self.end_tick()
+
+        # Write lives and events that are still pending once the population has perished
+        if self.population.num_alive == 0:
+            self.life_log.flush()
+            self.event_log.flush()
+
+        n = len(self.players)
+        rewards = np.zeros(n)
+        rewards[agents] = agent_rewards
+
+        return observations.copy(), rewards, ~population.alive[:n], self.alive_agents()
 
-    def run(self, stop_at=None):
+    def run(self, stop_at=None, max_ticks=None, time_budget=None, max_births=None):
         """
         Take an action, make changes to environment, return rewards
 
+        The run stops when every agent is dead or when any of the given stop conditions is met (they
+        are checked at the beginning of every tick), the reason is saved in stop_reason
+
         Params
         ======
-        stop_at (int)
-            : Stop after generating approximately these many logs
+        stop_at     (int)
+            : Stop after generating approximately these many logs (optional)
+        max_ticks   (int)
+            : Stop after these many ticks (optional)
+        time_budget (float)
+            : Stop after these many seconds of wall-clock time (optional)
+        max_births  (int)
+            : Stop after these many agents are born (optional)
         """
 
+        if self.model is None:
+            raise ValueError("run needs an RL model, use reset and step to drive the environment")
+
         # Initial time update for setting age to 0 for initial population
         self.update_time()
 
@@ -438,46 +1192,107 @@ class PrimaVita:
         # Reset time to 0 since it will be updated in the while loop
         self.time -= 1
 
+        start_time = time.time()
+        self.stop_reason = "extinction"
+
         # While agents are alive
         while running:
             # Update time tick
             self.update_time()
 
-            # Check if max logs reached
-            if (
-                stop_at != None
-                and len(glob.glob(os.path.join(self.log_dir, "*.npy"))) >= stop_at
-            ):
+            # Check if max logs, ticks, time or births reached
+            self.stop_reason = self.check_stop(
+                stop_at, max_ticks, time_budget, max_births, start_time
+            )
+            if self.stop_reason is not None:
                 break
 
-            # Loop through all the players
-            i = 0
-            j = self.leading_zeros
-            while True:
-                j += 1
-                if type(self.players[j]) == int:
-                    self.leading_zeros += 1
-                else:
-                    break
+            self.profiler.begin_tick()
+
+            # Regrow food if needed
+            with self.profiler.phase("food"):
+                self.update_food()
 
             # Update NN for each agent every self.model_updates time steps
             if self.time % self.model_updates == 0:
-                self.model.update_all_agents(self.leading_zeros)
+                with self.profiler.phase("update"):
+                    self.model.update_all_agents(self.leading_zeros)
 
             # Set an agent's index which will recieve human feedback
             if self.human_feedback and self.current_feedbacked_player == -1:
-                all_players_idx = np.array([i for i in range(len(self.players)) if type(self.players[i]) != int])
-                self.current_feedbacked_player = np.random.choice(all_players_idx)
+                all_players_idx = self.alive_agents()
+                self.current_feedbacked_player = self.random_streams.interactions.choice(
+                    all_players_idx
+                )
+
+            # Training loop (all agents act at once on the same states)
+            if self.tick_mode == "synchronous":
+                self.take_actions(states)
+
+                # Kill random agents if population exceeds its maximum and get updated states
+                with self.profiler.phase("lifecycle"):
+                    self.cull_population()
+                with self.profiler.phase("states"):
+                    states, running = self.get_current_state()
+            # Training loop (agents act one after another)
+            else:
+                for i in range(self.leading_zeros, len(self.players)):
+                    if self.population.alive[i]:
+                        # Take an action for current index
+                        with self.profiler.phase("resolve"):
+                            self.take_action(i, states[i])
+                        idx = i if self.population.alive[i] else None
+
+                        # Get updated state
+                        with self.profiler.phase("states"):
+                            states, running = self.get_current_state(idx)
+
+                # Kill random agents if population exceeds its maximum (others no longer see them)
+                with self.profiler.phase("lifecycle"):
+                    culled = self.cull_population()
+                if culled > 0:
+                    with self.profiler.phase("states"):
+                        states, running = self.get_current_state()
+
+            self.end_tick()
+
+        # Write lives and events that are still pending
+        self.life_log.flush()
+        self.event_log.flush()
+
+    def check_stop(self, stop_at, max_ticks, time_budget, max_births, start_time):
+        """
+        Check stop conditions of run (using counters, so it takes constant time)
+
+        Params
+        ======
+        stop_at     (int/None)
+            : Maximum number of logs
+        max_ticks   (int/None)
+            : Maximum number of ticks
+        time_budget (float/None)
+            : Maximum number of seconds
+        max_births  (int/None)
+            : Maximum number of births
+        start_time  (float)
+            : Time (in seconds since epoch) at which the run started
+
+        Returns
+        =======
+        stop_reason (str/None)
+            : Name of the condition that is met or None
+        """
 
-            # Training loop
-            for i in range(self.leading_zeros, len(self.players)):
-                if type(self.players[i]) != int:
-                    # Take an action for current index
-                    self.take_action(i, states[i])
-                    idx = i if type(self.players[i]) != int else None
+        if stop_at != None and self.logs_written >= stop_at:
+            return "stop_at"
+        if max_ticks != None and self.time >= max_ticks:
+            return "max_ticks"
+        if time_budget != None and time.time() - start_time >= time_budget:
+            return "time_budget"
+        if max_births != None and self.births >= max_births:
+            return "max_births"
 
-                    # Get updated state
-                    states, running = self.get_current_state(idx)
+        return None
 
     def take_action(self, idx, state):
         """
@@ -492,20 +1307,20 @@ class PrimaVita:
         """
 
         # If player is killed then he/she cannot take any action
-        if type(self.players[idx]) == int:
+        if not self.population.alive[idx]:
             return
 
-        # Predict action and return embedding using RL model used
-        action, embed = self.model.predict_action(idx, state)
+        population = self.population
+        self.energy_changed.append(idx)
 
-        # Convert embedding from tensor to numpy
-        temp = embed.cpu().numpy()
+        # Predict action and return embedding using RL model used
+        with self.profiler.phase("predict"):
+            action, embed = self.model.predict_action(idx, state)
 
-        # Set embeddings to current player
-        self.players[idx].embeddings = np.add(self.players[idx].embeddings, temp)
+        # Accumulate embedding of current player (in place)
+        population.embeddings.update([idx], embed.cpu().numpy())
 
         reward = 0
-        mate_idx = -1
 
         if self.mode == "human":
             # Fill the screen with green
@@ -515,53 +1330,12 @@ class PrimaVita:
             for event in pygame.event.get():
                 pass
 
-        # Action left
-        if action == 0:
-            self.players[idx].change_player_xposition(-self.speed)
-            reward = 1
-        # Action right
-        elif action == 1:
-            self.players[idx].change_player_xposition(self.speed)
-            reward = 1
-        # Action: up
-        elif action == 2:
-            self.players[idx].change_player_yposition(-self.speed)
-            reward = 1
-        # Action: down
-        elif action == 3:
-            self.players[idx].change_player_yposition(self.speed)
-            reward = 1
-        # Action: up left (move north-west)
-        elif action == 4:
-            self.players[idx].change_player_yposition(
-                -self.root_speed, no_energy_change=True
-            )
-            self.players[idx].change_player_xposition(-self.root_speed)
-            reward = 1
-        # Action: up right (move north-east)
-        elif action == 5:
-            self.players[idx].change_player_yposition(
-                -self.root_speed, no_energy_change=True
-            )
-            self.players[idx].change_player_xposition(self.root_speed)
-            reward = 1
-        # Action: down left (move south-west)
-        elif action == 6:
-            self.players[idx].change_player_yposition(
-                self.root_speed, no_energy_change=True
-            )
-            self.players[idx].change_player_xposition(-self.root_speed)
-            reward = 1
-        # Action: down right (move south-east)
-        elif action == 7:
-            self.players[idx].change_player_yposition(
-                self.root_speed, no_energy_change=True
-            )
-            self.players[idx].change_player_xposition(self.root_speed)
-            reward = 1
+        # Action: movement in one of 8 directions
+        if action <= 7:
+            reward = self.move_player(idx, action)
         # Action: stay
         elif action == 8:
-            self.players[idx].energy -= 2
+            population.energy[idx] -= 2
             # Initially -4, then after age of decay_rate -3 and so on until -1
             reward = 0.1
             self.players[idx].update_history(action, self.time, reward)
@@ -570,420 +1344,885 @@ class PrimaVita:
             # Find food particles nearby
             food_particle = self.food_nearby(self.players[idx])
 
-            # If food is in radius of current agent then
+            # If food is in radius of current agent then begin food ingestion otherwise punish the
+            # agent
             if food_particle != -1:
-                # Begin food ingestion
-                self.players[idx].ingesting_food(food_particle, self.time)
-                self.food_particles[food_particle] = 0
-
-                # Reward proportional to initial energy
-                reward = 10
-
-                # Log the ingestion action
-                self.players[idx].update_history(action, self.time, reward)
-            # Otherwise punish the agent
+                reward = self.ingest_food(idx, food_particle)
             else:
-                reward = -0.1
-                self.players[idx].energy -= 1
-
-                # Log the failed ingestion action
-                self.players[idx].update_history(action, self.time, reward)
+                reward = self.fail_action(idx, action)
         # Action: asexual reproduction
         elif action == 10:
             # If agent is not dead and potent and is of age to reproduce [10, 60]
-            if (
-                type(self.players[idx]) != int
-                and not self.players[idx].is_impotent
-                and (self.time - self.players[idx].born_at) in range(10, 61)
-            ):
-                # Reward proportional to initial energy
-                reward = 10
-
-                # Perform asexual reproduction and get offsprings
-                offspring_players, offspring_ids = self.players[
-                    idx
-                ].asexual_reproduction(
-                    len(self.players), self.time, self.initial_energy
-                )
-
-                # Put the offsprings to player array
-                for offspring_player in offspring_players:
-                    self.players = np.append(self.players, offspring_player)
-
-                # Add the number of agents in initial_population
-                self.initial_population += len(offspring_players)
-
-                # Add to logs the action asexual reproduction
-                self.players[idx].update_history(
-                    action,
-                    self.time,
-                    reward,
-                    num_offspring=len(offspring_ids),
-                    offspring_ids=offspring_ids,
-                )
-
-                # Kill the agent after asexual reproduction :)
-                self.players[idx].write_data(self.time, self.current_population)
-                self.players[idx] = 0
-                self.killed = np.append(self.killed, idx)
-
-                # Add agents to RL model
-                self.model.add_agents(idx, len(offspring_players))
-                self.model.kill_agent(idx)
-                if self.current_feedbacked_player == idx:
-                    self.current_feedbacked_player = -1
+            if self.can_reproduce_asexually(idx):
+                reward = self.reproduce_asexually(idx)
             # If the above conditions don't meet then asexul reproduction fails
             else:
-                reward = -0.1
-                self.players[idx].energy -= 1
-
-                # Add to logs the failed action asexual reproduction
-                self.players[idx].update_history(action, self.time, reward)
+                reward = self.fail_action(idx, action)
         # Action: sexual reproduction
         elif action == 11:
             # If agent is not mating right now
-            if self.players[idx].mating_begin_time == 0:
+            if population.mating_begin_time[idx] == 0:
 
                 # Find appropriate mate
                 mate_idx = self.search_mate(self.players[idx])
 
-                # If mate is found then perform sexual reproduction
+                # If mate is found then perform sexual reproduction otherwise punish the agent
+                # trying to perform sexual reproduction
                 if mate_idx != -1:
-
-                    # Time at which mating begins
-                    mating_begin_time = self.time
-
-                    # Reward proportional to initial energy
-                    reward = 10
-
-                    # Get offsprings after sexual reproduction
-                    offspring_players, offspring_ids = self.players[
-                        idx
-                    ].sexual_reproduction(
-                        mating_begin_time,
-                        len(self.players),
-                        self.initial_energy,
-                        True,
-                        mate_id=mate_idx,
-                        mate_tob=self.players[mate_idx].born_at,
-                    )
-
-                    # Perform mating for other parent too but don't generate offsprings
-                    self.players[mate_idx].sexual_reproduction(
-                        mating_begin_time, len(self.players)
-                    )
-
-                    # Add the offsprings to player array
-                    for offspring_player in offspring_players:
-                        np.append(self.players, offspring_player)
-
-                    # Increase the total population
-                    self.initial_population += len(offspring_players)
-
-                    # Update logs for sexual reproduction action
-                    self.players[idx].update_history(
-                        action,
-                        mating_begin_time,
-                        reward,
-                        num_offspring=len(offspring_ids),
-                        offspring_ids=offspring_ids,
-                        mate_id=mate_idx,
-                    )
-
-                    # Update logs for sexual reproduction action
-                    self.players[mate_idx].update_history(
-                        action,
-                        mating_begin_time,
-                        reward,
-                        num_offspring=len(offspring_ids),
-                        offspring_ids=offspring_ids,
-                        mate_id=idx,
-                    )
-
-                    # Find out percentage of offsprings that will inherit dominant and recessive genes
-                    dominant_percent = random.randint(0, 10) * 10
-                    recessive_percent = 100 - dominant_percent
-                    offsprings = len(self.players) - len(self.model.agents)
-                    num_dominant = round(offsprings * (dominant_percent / 100))
-                    num_recessive = offsprings - num_dominant
-
-                    # Find dominant and recessive parent
-                    dominant_idx = (
-                        idx
-                        if self.players[idx].energy > self.players[mate_idx].energy
-                        else mate_idx
-                    )
-                    recessive_idx = idx if dominant_idx == mate_idx else mate_idx
-
-                    # Add offsprings to RL model
-                    self.model.add_agents(dominant_idx, num_dominant)
-                    self.model.add_agents(recessive_idx, num_recessive)
-                # Otherwise punish the agent trying to perform sexual reproduction
+                    reward = self.reproduce_sexually(idx, mate_idx)
                 else:
-                    reward = -0.1
-                    self.players[idx].energy -= 1
-
-                    # Update logs for failed sexual reproduction action
-                    self.players[idx].update_history(action, self.time, reward)
+                    reward = self.fail_action(idx, action)
             # If agent is already mating then also punish the agent (bad manners)
             else:
-                reward = -0.1
-                self.players[idx].energy -= 1
-
-                # Update logs for failed sexual reproduction action
-                self.players[idx].update_history(action, self.time, reward)
+                reward = self.fail_action(idx, action)
         # Action: fight
         elif action == 12:
 
             # If current agent is not fighting with anyone else
-            if self.players[idx].fighting_with == -1:
+            if population.fighting_with[idx] == -1:
 
                 # Search enemy (closest agent, no personal grudges :) )
                 enemy = self.search_enemy(self.players[idx])
 
-                # If an agent is found in some fixed radius then
+                # If an agent is found in some fixed radius then fight otherwise punish the agent
                 if enemy != -1:
-
-                    # Fighting isn't promoted, so a negative reward is given
-                    reward = 10
-
-                    # Fighting action
-                    self.players[idx].fighting_with = enemy
-                    self.players[enemy].fighting_with = idx
-                    self.players[idx].energy -= 10
-                    self.players[enemy].energy -= 10
-                    self.players[idx].fighting_with = -1
-                    self.players[enemy].fighting_with = -1
-
-                    # Log fight action
-                    self.players[idx].update_history(
-                        action, self.time, reward, fight_with=enemy
-                    )
-
-                    # Log fight action
-                    self.players[enemy].update_history(
-                        action, self.time, reward, fight_with=idx
-                    )
-                # If there is no agent in agent
+                    reward = self.fight(idx, enemy)
                 else:
-                    reward = -0.1
-                    self.players[idx].energy -= 1
-
-                    # Log failed fight action
-                    self.players[idx].update_history(action, self.time, reward)
+                    reward = self.fail_action(idx, action)
             # If the agent is already fighting with another agent (we do not promote mob fighting)
             else:
-                reward = -0.1
-                self.players[idx].energy -= 1
-
-                # Log failed fight action
-                self.players[idx].update_history(action, self.time, reward)
+                reward = self.fail_action(idx, action)
 
         # Take human feedback if it applies
         if self.human_feedback and self.current_feedbacked_player == idx:
-            print('-' * 100)
-            print("Index:", idx)
-            print("Player at ({:.2f}, {:.2f})".format(self.players[idx].playerX, self.players[idx].playerY))
-            print(f"Player age: {int(state[-1])}, energy: {int(state[-2])}")
-            print(f"Player gender: {self.players[idx].gender}")
-
-            i = 0
-            food_vectors = []
-            player_vectors = []
-            diff_to_direction = {
-                (-1, -1): "Down Left", (-1, 0): "Left", (-1, 1): "Up Left",
-                (0, -1): "Down", (0, 0): "Same", (0, 1): "Up",
-                (1, -1): "Down Right", (1, 0): "Right", (1, 1): "Up Right"
-            }
-            sex_num_to_words = {1: "Female", 2: "Male"}
-
-            while i < self.state_size - 2:
-                x, y = state[i:i+2]
-                if x != 0 or y != 0:
-                    distance = (x**2 + y**2)**(1/2)
-                    direction = diff_to_direction[(np.clip(x - self.players[idx].playerX, -1, 1), np.clip(y - self.players[idx].playerY, -1, 1))]
-                    food_vectors.append([self.players[idx].playerX + x, self.players[idx].playerY + y, distance, direction])
-                i += 2
-
-                x, y, sex = state[i:i+3]
-                if x != 0 or y != 0:
-                    distance = (x**2 + y**2)**(1/2)
-                    direction = diff_to_direction[(np.clip(x - self.players[idx].playerX, -1, 1), np.clip(y - self.players[idx].playerY, -1, 1))]
-                    player_vectors.append([self.players[idx].playerX + x, self.players[idx].playerY + y, sex_num_to_words[sex], distance, direction])
-                i += 3
-
-            for i, food in enumerate(food_vectors):
-                print("Food #{} at ({:.2f}, {:.2f}), distance = {:.2f}, direction = {}".format(i, food[0], food[1], food[2], food[3]))
-
-            for i, player in enumerate(player_vectors):
-                print("Player #{} at ({:.2f}, {:.2f}), distance = {:.2f}, gender = {}, direction = {}".format(i, player[0], player[1], player[3], player[2], player[4]))
-
-            # Dictionary to map actions from integer to descriptive string
-            action_number_to_action = {
-                0: "Left",
-                1: "Right",
-                2: "Up",
-                3: "Down",
-                4: "Up Left",
-                5: "Up Right",
-                6: "Down Left",
-                7: "Down Right",
-                8: "Stay",
-                9: "Ingestion",
-                10: "Asexual Reproduction",
-                11: "Sexual Reproduction",
-                12: "Fight",
-            }
-
-            failed = "Failed " if reward == -0.1 else ""
-            print("Action taken:", failed + action_number_to_action[action])
-            reward = int(input("Positive or negative (1 or -1): "))
+            reward = self.ask_feedback(idx, state, action, reward)
 
         # Log all the movement actions
         if action <= 7:
-            # Failed movement action
-            if self.players[idx].cannot_move == False:
-                self.players[idx].update_history(action, self.time, reward)
-            # Successful movement action
-            else:
-                self.players[idx].update_history(action, self.time, reward)
+            self.players[idx].update_history(action, self.time, reward)
 
-        # If food regeneration condition is met then regenerate food particles
-        if self.food_regen_condition_is_met:
-            print("Food regenerated!")
-            self.food_particles, _ = self.refresh_particles()
-            self.food_regen_condition_is_met = False
+        # Put rewards and scores into players object
+        if population.alive[idx]:
+            self.model.rewards[idx].append(reward)
+            self.model.scores[idx] += reward
 
         if self.mode == "human":
-            # Show all particles
-            for j in range(len(self.food_particles)):
-                if type(self.food_particles[j]) != int:
-                    self.food_particles[j].show_particle(self.screen)
-
-        now_time = self.time
-
-        # Loop through all the players
-        for i in range(self.leading_zeros, len(self.players)):
-            # If agent is still alive
-            if i not in self.killed:
-                # Put rewards and scores into players object
-                if i == idx:
-                    self.model.rewards[idx].append(reward)
-                    self.model.scores[idx] += reward
-
-                if self.mode == "human":
-                    # Find food particles in fixed radius
-                    (
-                        env_food_vector,
-                        env_particle_distance,
-                        env_particles,
-                    ) = self.food_in_env(self.players[i], get_idx=True)
-
-                    # Push the food particles near an agent to its object
-                    self.players[i].food_near = env_particle_distance
-
-                    # Find players in proximity
-                    (
-                        env_player_vector,
-                        env_player_distance,
-                        env_players,
-                    ) = self.players_in_env(self.players[i], get_idx=True)
-
-                    # Push the players in proximity to this agent to current agent's object
-                    self.players[i].players_near = env_player_distance
-
-                    # Change colors of food particles in proximity
-                    for index in range(0, len(env_particles)):
-                        local = env_particles[index]
-                        if type(self.food_particles[local]) != int:
-                            self.food_particles[local].show_close(self.screen)
-
-                    # Change color of players in proximity
-                    if not env_players:
-                        self.players[i].show_player(self.screen)
-                    else:
-                        self.players[i].show_close(self.screen)
-
-                # Check if ingestion action is complete or not (if ingesting)
-                if (
-                    type(self.players[i]) != int
-                    and self.players[i].ingesting_begin_time != 0
-                    and self.time - self.players[i].ingesting_begin_time >= 1
-                ):
-                    self.players[i].food_ate += 1
-                    self.players[i].ingesting_begin_time = 0
-                    self.players[i].cannot_move = False
-
-                # Check if mating action is complete or not (if mating)
-                if (
-                    type(self.players[i]) != int
-                    and self.players[i].mating_begin_time != 0
-                    and self.time - self.players[i].mating_begin_time >= 2
-                ):
-                    self.players[i].mating_begin_time = 0
-                    self.players[i].cannot_move = False
-
-                # If the agent's energy is less than or equal to zero (0) kill the agent
-                if type(self.players[i]) != int and self.players[i].energy <= 0:
-                    self.players[i].write_data(self.time, self.current_population)
-                    self.players[i] = 0
-                    self.killed = np.append(self.killed, i)
-                    self.model.kill_agent(i)
-
-                    if self.current_feedbacked_player == idx:
-                        self.current_feedbacked_player = -1
-
-                # If the agent has reached maximum age then kill the agent
-                if (
-                    type(self.players[i]) != int
-                    and now_time - self.players[i].born_at >= self.max_age
-                ):
-                    self.players[i].write_data(self.time, self.current_population)
-                    self.players[i] = 0
-                    self.killed = np.append(self.killed, i)
-                    self.model.kill_agent(i)
-
-                    if self.current_feedbacked_player == idx:
-                        self.current_feedbacked_player = -1
+            with self.profiler.phase("render"):
+                self.show_world()
+
+        with self.profiler.phase("lifecycle"):
+            self.update_lifecycle()
+
+    def take_actions(self, states):
+        """
+        Let all alive agents act simultaneously (synchronous tick mode), every agent observes the same
+        snapshot of the environment and all actions are predicted in one batched forward pass, the
+        actions are then resolved together (see resolve_actions)
+
+        Params
+        ======
+        states (numpy.ndarray)
+            : States of all the agents (as returned by get_current_state)
+        """
+
+        population = self.population
+        agents = self.alive_agents()
+
+        if len(agents) == 0:
+            return
+
+        # Predict actions and embeddings of all the agents at once
+        with self.profiler.phase("predict"):
+            actions, embeds = self.model.predict_actions(agents, states[agents])
+        population.embeddings.update(agents, embeds.cpu().numpy())
+
+        with self.profiler.phase("resolve"):
+            rewards = self.resolve_actions(agents, actions)
+
+        # Put rewards and scores into players object
+        for k in np.flatnonzero(population.alive[agents]):
+            idx = agents[k]
+            self.model.rewards[idx].append(rewards[k])
+            self.model.scores[idx] += rewards[k]
+
+    def resolve_actions(self, agents, actions):
+        """
+        Resolve actions taken at the same time by many agents and complete the tick
+
+        Actions are resolved in a fixed order of phases, so that conflicts have a well-defined
+        outcome:
+        1. Asexual reproduction, parents leave the world before any interaction happens
+        2. Stay
+        3. Food ingestion, a food particle claimed by several agents goes to the claimant closest to
+           it (lowest index on ties) and the other claimants fail
+        4. Sexual reproduction, initiators are handled in increasing order of index and an agent mates
+           at most once per tick, an initiator that has already been chosen as mate this tick
+           succeeds without mating again (mutual choice)
+        5. Fight, a pair of agents fights at most once per tick (mutual attacks are one fight), an
+           agent attacked by several agents fights each of them
+        6. Movement, applied last so that every interaction above uses the observed positions
+
+        Params
+        ======
+        agents  (numpy.ndarray)
+            : Indices of the agents taking actions
+        actions (numpy.ndarray)
+            : Action of every agent
+
+        Returns
+        =======
+        rewards (numpy.ndarray)
+            : Reward of every agent
+        """
+
+        population = self.population
+        self.energy_changed.extend(agents.tolist())
+
+        # Surroundings of every agent at the time of observation
+        with self.profiler.phase("neighbours"):
+            neighbour_index = self.build_neighbour_index()
+
+        rewards = np.zeros(len(agents))
 
         if self.mode == "human":
-            # Update the pygame window
-            pygame.display.update()
+            # Fill the screen with green
+            self.screen.fill((0, 178, 0))
+
+            # Event loop
+            for event in pygame.event.get():
+                pass
+
+        # Action: asexual reproduction
+        for k in np.flatnonzero(actions == 10):
+            idx = agents[k]
+            if self.can_reproduce_asexually(idx):
+                rewards[k] = self.reproduce_asexually(idx)
+            else:
+                rewards[k] = self.fail_action(idx, 10)
+
+        # Action: stay
+        for k in np.flatnonzero(actions == 8):
+            idx = agents[k]
+            population.energy[idx] -= 2
+            rewards[k] = 0.1
+            self.players[idx].update_history(8, self.time, rewards[k])
+
+        # Action: food ingestion, every agent claims the food particle it would eat
+        claims, particles, distances = [], [], []
+        for k in np.flatnonzero(actions == 9):
+            idx = agents[k]
+            food_particle = self.food_nearby(self.players[idx], neighbour_index)
+            if food_particle == -1:
+                rewards[k] = self.fail_action(idx, 9)
+                continue
+
+            claims.append(k)
+            particles.append(food_particle)
+            dx, dy = minimal_image(
+                neighbour_index.food_x[food_particle] - population.x[idx] - 16,
+                neighbour_index.food_y[food_particle] - population.y[idx] - 16,
+                self.period,
+            )
+            distances.append(dx ** 2 + dy ** 2)
+
+        # Closest claimant of every food particle eats it, others fail
+        claims, particles = np.array(claims, dtype=np.int64), np.array(particles, dtype=np.int64)
+        order = np.lexsort((claims, distances, particles))
+        for rank, c in enumerate(order):
+            k = claims[c]
+            if rank == 0 or particles[c] != particles[order[rank - 1]]:
+                rewards[k] = self.ingest_food(agents[k], particles[c])
+            else:
+                rewards[k] = self.fail_action(agents[k], 9)
+
+        # Action: sexual reproduction, partner of every agent that mated in this tick
+        partner = {}
+        for k in np.flatnonzero(actions == 11):
+            idx = agents[k]
+
+            # Already chosen as mate by someone else in this tick
+            if idx in partner:
+                rewards[k] = 10
+                continue
+
+            if population.mating_begin_time[idx] != 0:
+                rewards[k] = self.fail_action(idx, 11)
+                continue
+
+            mates = [
+                mate
+                for mate in self.mate_candidates(self.players[idx], neighbour_index)
+                if mate not in partner
+            ]
+            if mates:
+                rewards[k] = self.reproduce_sexually(idx, mates[0])
+                partner[idx], partner[mates[0]] = mates[0], idx
+            else:
+                rewards[k] = self.fail_action(idx, 11)
+
+        # Action: fight, pairs of agents that fought in this tick
+        fought = set()
+        for k in np.flatnonzero(actions == 12):
+            idx = agents[k]
+
+            enemy = (
+                self.search_enemy(self.players[idx], neighbour_index)
+                if population.fighting_with[idx] == -1
+                else -1
+            )
+            if enemy == -1:
+                rewards[k] = self.fail_action(idx, 12)
+            # The other agent has already attacked this agent in this tick
+            elif (enemy, idx) in fought:
+                rewards[k] = 10
+            else:
+                rewards[k] = self.fight(idx, enemy)
+                fought.add((idx, enemy))
+
+        # Action: movement in one of 8 directions
+        for k in np.flatnonzero(actions <= 7):
+            idx = agents[k]
+            rewards[k] = self.move_player(idx, actions[k])
+            self.players[idx].update_history(actions[k], self.time, rewards[k])
+
+        if self.mode == "human":
+            with self.profiler.phase("render"):
+                self.show_world()
+
+        with self.profiler.phase("lifecycle"):
+            self.update_lifecycle()
+
+        return rewards
+
+    def move_player(self, idx, action):
+        """
+        Move a player in one of 8 directions (left, right, up, down, up left, up right, down left,
+        down right)
+
+        Params
+        ======
+        idx    (int)
+            : Index of the player
+        action (int)
+            : Movement action (0 - 7)
+
+        Returns
+        =======
+        reward (int)
+            : Reward for the movement
+        """
+
+        player = self.players[idx]
+
+        # Action left
+        if action == 0:
+            player.change_player_xposition(-self.speed)
+        # Action right
+        elif action == 1:
+            player.change_player_xposition(self.speed)
+        # Action: up
+        elif action == 2:
+            player.change_player_yposition(-self.speed)
+        # Action: down
+        elif action == 3:
+            player.change_player_yposition(self.speed)
+        # Action: up left (move north-west)
+        elif action == 4:
+            player.change_player_yposition(-self.root_speed, no_energy_change=True)
+            player.change_player_xposition(-self.root_speed)
+        # Action: up right (move north-east)
+        elif action == 5:
+            player.change_player_yposition(-self.root_speed, no_energy_change=True)
+            player.change_player_xposition(self.root_speed)
+        # Action: down left (move south-west)
+        elif action == 6:
+            player.change_player_yposition(self.root_speed, no_energy_change=True)
+            player.change_player_xposition(-self.root_speed)
+        # Action: down right (move south-east)
+        elif action == 7:
+            player.change_player_yposition(self.root_speed, no_energy_change=True)
+            player.change_player_xposition(self.root_speed)
+
+        return 1
+
+    def fail_action(self, idx, action):
+        """
+        Punish an agent for a failed action (ingestion, reproduction or fight) and log it
+
+        Params
+        ======
+        idx    (int)
+            : Index of the agent
+        action (int)
+            : Action that failed
+
+        Returns
+        =======
+        reward (float)
+            : Reward for the failed action
+        """
+
+        reward = -0.1
+        self.population.energy[idx] -= 1
+
+        # Log the failed action
+        self.players[idx].update_history(action, self.time, reward)
+
+        return reward
+
+    def ingest_food(self, idx, food_particle):
+        """
+        Begin ingestion of a food particle (the particle is removed from the environment)
+
+        Params
+        ======
+        idx           (int)
+            : Index of the agent
+        food_particle (int)
+            : Index of the food particle
+
+        Returns
+        =======
+        reward (int)
+            : Reward for the ingestion
+        """
+
+        # Begin food ingestion (it ends after 1 tick)
+        self.players[idx].ingesting_food(food_particle, self.time)
+        self.food.eat(food_particle)
+        self.events.push(self.time + 1, INGESTION_DONE, idx, self.time)
+
+        # Reward proportional to initial energy
+        reward = 10
+
+        # Log the ingestion action
+        self.players[idx].update_history(9, self.time, reward)
+        self.event_log.record(
+            self.time,
+            INGESTION,
+            self.players[idx].index,
+            food_particle,
+            energy=self.population.energy[idx],
+        )
+
+        return reward
+
+    def can_reproduce_asexually(self, idx):
+        """
+        Check whether an agent is potent and of age to reproduce [10, 60]
+
+        Params
+        ======
+        idx (int)
+            : Index of the agent
+        """
+
+        population = self.population
+
+        return (
+            not population.is_impotent[idx]
+            and 10 <= (self.time - population.born_at[idx]) <= 60
+        )
+
+    def reproduce_asexually(self, idx):
+        """
+        Perform asexual reproduction, offsprings are added to the environment and the RL model and
+        the parent is killed
+
+        Params
+        ======
+        idx (int)
+            : Index of the parent
+
+        Returns
+        =======
+        reward (int)
+            : Reward for the reproduction
+        """
+
+        # Reward proportional to initial energy
+        reward = 10
+
+        # Perform asexual reproduction and get offsprings
+        offspring_players, offspring_ids = self.players[idx].asexual_reproduction(
+            self.next_id, self.time, self.initial_energy
+        )
+        self.next_id += len(offspring_players)
+
+        # Put the offsprings to player array
+        self._players.extend(offspring_players)
+
+        # Add the number of agents in initial_population
+        self.initial_population += len(offspring_players)
+        self.births += len(offspring_players)
+
+        # Add to logs the action asexual reproduction
+        self.players[idx].update_history(
+            10,
+            self.time,
+            reward,
+            num_offspring=len(offspring_ids),
+            offspring_ids=offspring_ids,
+        )
+        self.event_log.record(
+            self.time,
+            ASEXUAL_REPRODUCTION,
+            self.players[idx].index,
+            offspring_begin=offspring_ids[0],
+            num_offspring=len(offspring_ids),
+            energy=self.population.energy[idx],
+        )
+
+        # Add agents to RL model
+        if self.model is not None:
+            self.model.add_agents(idx, len(offspring_players))
+
+        # Kill the agent after asexual reproduction :)
+        self.kill_player(idx)
+
+        return reward
+
+    def reproduce_sexually(self, idx, mate_idx):
+        """
+        Perform sexual reproduction between two agents, offsprings are born to the first one and
+        are added to the environment and the RL model
+
+        Params
+        ======
+        idx      (int)
+            : Index of the agent giving birth
+        mate_idx (int)
+            : Index of the mate
+
+        Returns
+        =======
+        reward (int)
+            : Reward for the reproduction
+        """
+
+        population = self.population
+
+        # Time at which mating begins
+        mating_begin_time = self.time
+
+        # Reward proportional to initial energy
+        reward = 10
+
+        # Get offsprings after sexual reproduction
+        offspring_players, offspring_ids = self.players[idx].sexual_reproduction(
+            mating_begin_time,
+            self.next_id,
+            self.initial_energy,
+            True,
+            mate_id=self.players[mate_idx].index,
+            mate_tob=int(population.born_at[mate_idx]),
+        )
+        self.next_id += len(offspring_players)
+
+        # Perform mating for other parent too but don't generate offsprings
+        self.players[mate_idx].sexual_reproduction(mating_begin_time, self.next_id)
+        self.energy_changed.append(mate_idx)
+
+        # Mating ends after 2 ticks
+        self.events.push(mating_begin_time + 2, MATING_DONE, idx, mating_begin_time)
+        self.events.push(mating_begin_time + 2, MATING_DONE, mate_idx, mating_begin_time)
+
+        # Add the offsprings to player array
+        self._players.extend(offspring_players)
+
+        # Increase the total population
+        self.initial_population += len(offspring_players)
+        self.births += len(offspring_players)
+
+        # Update logs for sexual reproduction action
+        self.players[idx].update_history(
+            11,
+            mating_begin_time,
+            reward,
+            num_offspring=len(offspring_ids),
+            offspring_ids=offspring_ids,
+            mate_id=self.players[mate_idx].index,
+        )
+
+        # Update logs for sexual reproduction action
+        self.players[mate_idx].update_history(
+            11,
+            mating_begin_time,
+            reward,
+            num_offspring=len(offspring_ids),
+            offspring_ids=offspring_ids,
+            mate_id=self.players[idx].index,
+        )
+        self.event_log.record(
+            mating_begin_time,
+            SEXUAL_REPRODUCTION,
+            self.players[idx].index,
+            self.players[mate_idx].index,
+            offspring_ids[0],
+            len(offspring_ids),
+            population.energy[idx],
+        )
+
+        # Find out percentage of offsprings that will inherit dominant and recessive genes
+        dominant_percent = 10 * int(
+            self.random_streams.interactions.integers(0, 10, endpoint=True)
+        )
+        recessive_percent = 100 - dominant_percent
+        offsprings = len(offspring_players)
+        num_dominant = round(offsprings * (dominant_percent / 100))
+        num_recessive = offsprings - num_dominant
+
+        # Find dominant and recessive parent
+        dominant_idx = (
+            idx if population.energy[idx] > population.energy[mate_idx] else mate_idx
+        )
+        recessive_idx = idx if dominant_idx == mate_idx else mate_idx
+
+        # Add offsprings to RL model
+        if self.model is not None:
+            self.model.add_agents(dominant_idx, num_dominant)
+            self.model.add_agents(recessive_idx, num_recessive)
+
+        return reward
+
+    def fight(self, idx, enemy):
+        """
+        Perform a fight between two agents (both lose energy)
+
+        Params
+        ======
+        idx   (int)
+            : Index of the agent starting the fight
+        enemy (int)
+            : Index of the agent being fought
+
+        Returns
+        =======
+        reward (int)
+            : Reward for the fight
+        """
+
+        population = self.population
+
+        # Fighting isn't promoted, so a negative reward is given
+        reward = 10
+
+        # Fighting action
+        population.fighting_with[idx] = enemy
+        population.fighting_with[enemy] = idx
+        population.energy[idx] -= 10
+        population.energy[enemy] -= 10
+        self.energy_changed.append(enemy)
+        population.fighting_with[idx] = -1
+        population.fighting_with[enemy] = -1
+
+        # Log fight action
+        player, enemy_player = self.players[idx], self.players[enemy]
+        player.update_history(12, self.time, reward, fight_with=enemy_player.index)
+
+        # Log fight action
+        enemy_player.update_history(12, self.time, reward, fight_with=player.index)
+        self.event_log.record(
+            self.time, FIGHT, player.index, enemy_player.index, energy=population.energy[idx]
+        )
+
+        return reward
+
+    def ask_feedback(self, idx, state, action, reward):
+        """
+        Show the surroundings and action of an agent and ask the user for the reward
+
+        Params
+        ======
+        idx    (int)
+            : Index of the agent
+        state  (numpy.ndarray)
+            : State that the agent experienced
+        action (int)
+            : Action taken by the agent
+        reward (float)
+            : Reward given by the environment
+
+        Returns
+        =======
+        reward (int)
+            : Reward given by the user
+        """
+
+        print('-' * 100)
+        print("Index:", idx)
+        print("Player at ({:.2f}, {:.2f})".format(self.players[idx].playerX, self.players[idx].playerY))
+        print(f"Player age: {int(state[-1])}, energy: {int(state[-2])}")
+        print(f"Player gender: {self.players[idx].gender}")
+
+        i = 0
+        food_vectors = []
+        player_vectors = []
+        diff_to_direction = {
+            (-1, -1): "Down Left", (-1, 0): "Left", (-1, 1): "Up Left",
+            (0, -1): "Down", (0, 0): "Same", (0, 1): "Up",
+            (1, -1): "Down Right", (1, 0): "Right", (1, 1): "Up Right"
+        }
+        sex_num_to_words = {1: "Female", 2: "Male"}
+
+        while i < self.state_size - 2:
+            x, y = state[i:i+2]
+            if x != 0 or y != 0:
+                distance = (x**2 + y**2)**(1/2)
+                direction = diff_to_direction[(np.clip(x - self.players[idx].playerX, -1, 1), np.clip(y - self.players[idx].playerY, -1, 1))]
+                food_vectors.append([self.players[idx].playerX + x, self.players[idx].playerY + y, distance, direction])
+            i += 2
+
+            x, y, sex = state[i:i+3]
+            if x != 0 or y != 0:
+                distance = (x**2 + y**2)**(1/2)
+                direction = diff_to_direction[(np.clip(x - self.players[idx].playerX, -1, 1), np.clip(y - self.players[idx].playerY, -1, 1))]
+                player_vectors.append([self.players[idx].playerX + x, self.players[idx].playerY + y, sex_num_to_words[sex], distance, direction])
+            i += 3
+
+        for i, food in enumerate(food_vectors):
+            print("Food #{} at ({:.2f}, {:.2f}), distance = {:.2f}, direction = {}".format(i, food[0], food[1], food[2], food[3]))
+
+        for i, player in enumerate(player_vectors):
+            print("Player #{} at ({:.2f}, {:.2f}), distance = {:.2f}, gender = {}, direction = {}".format(i, player[0], player[1], player[3], player[2], player[4]))
+
+        # Dictionary to map actions from integer to descriptive string
+        action_number_to_action = {
+            0: "Left",
+            1: "Right",
+            2: "Up",
+            3: "Down",
+            4: "Up Left",
+            5: "Up Right",
+            6: "Down Left",
+            7: "Down Right",
+            8: "Stay",
+            9: "Ingestion",
+            10: "Asexual Reproduction",
+            11: "Sexual Reproduction",
+            12: "Fight",
+        }
+
+        failed = "Failed " if reward == -0.1 else ""
+        print("Action taken:", failed + action_number_to_action[action])
+        reward = int(input("Positive or negative (1 or -1): "))
+
+        return reward
+
+    def show_world(self):
+        """
+        Draw food particles and players on the pygame screen (human mode)
+        """
+
+        # Show all particles
+        for food_particle in self.food_particles:
+            if type(food_particle) != int:
+                food_particle.show_particle(self.screen)
+
+        # Loop through all the alive players
+        for i in self.alive_agents():
+            # Find food particles in fixed radius
+            (
+                env_food_vector,
+                env_particle_distance,
+                env_particles,
+            ) = self.food_in_env(self.players[i], get_idx=True)
+
+            # Push the food particles near an agent to its object
+            self.players[i].food_near = env_particle_distance
+
+            # Find players in proximity
+            (
+                env_player_vector,
+                env_player_distance,
+                env_players,
+            ) = self.players_in_env(self.players[i], get_idx=True)
+
+            # Push the players in proximity to this agent to current agent's object
+            self.players[i].players_near = env_player_distance
+
+            # Change colors of food particles in proximity
+            for local in env_particles:
+                Particle(field=self.food, slot=local).show_close(self.screen)
+
+            # Change color of players in proximity
+            if not env_players:
+                self.players[i].show_player(self.screen)
+            else:
+                self.players[i].show_close(self.screen)
+
+        # Update the pygame window
+        pygame.display.update()
+
+    def update_lifecycle(self):
+        """
+        Complete ingestion and mating actions whose time is over and kill agents that ran out of
+        energy or reached maximum age (the population cap is enforced once per tick by
+        cull_population)
+
+        Ends of ingestion and mating and age-out deaths are taken from the event queue (only events
+        that are due are touched) and only agents whose energy changed are checked for death by
+        energy, so the cost doesn't grow with the number of alive agents
+        """
+
+        population = self.population
+
+        # Schedule age-out deaths of players born since the last update
+        born = np.arange(self.scheduled_rows, len(self.players))
+        for idx in born[population.alive[born]]:
+            born_at = int(population.born_at[idx])
+            self.events.push(born_at + self.max_age, AGE_OUT, idx, born_at)
+        self.scheduled_rows = len(self.players)
+
+        # Fire due events (skipping stale ones, of dead agents or of actions begun again)
+        ingested, mated, dead = [], [], []
+        for kind, idx, token in self.events.pop_due(self.time):
+            if not population.alive[idx]:
+                continue
+            if kind == INGESTION_DONE and population.ingesting_begin_time[idx] == token:
+                ingested.append(idx)
+            elif kind == MATING_DONE and population.mating_begin_time[idx] == token:
+                mated.append(idx)
+            elif kind == AGE_OUT:
+                dead.append(idx)
+
+        # Ingestion action is complete
+        population.food_ate[ingested] += 1
+        population.ingesting_begin_time[ingested] = 0
+        population.cannot_move[ingested] = False
+
+        # Mating action is complete
+        population.mating_begin_time[mated] = 0
+        population.cannot_move[mated] = False
+
+        # If the agent's energy is less than or equal to zero (0) or the agent has reached maximum
+        # age then kill the agent
+        changed = np.array(self.energy_changed, dtype=np.int64)
+        self.energy_changed = []
+        changed = changed[population.alive[changed] & (population.energy[changed] <= 0)]
+        self.kill_players(np.unique(np.concatenate((changed, np.array(dead, dtype=np.int64)))))
+
+        # Compute number of alive agents
+        self.current_population = population.num_alive
+
+    def cull_population(self):
+        """
+        Kill random agents if current population exceeds max_allowed_population (called once per
+        tick), all victims are sampled at once without replacement and killed as a batch
+
+        Returns
+        =======
+        extra_agent_count (int)
+            : Number of agents killed
+        """
+
+        population = self.population
 
         # Compute number of alive agents
-        self.current_population = len(self.players) - len(self.killed)
+        self.current_population = population.num_alive
 
-        # If current population exceeds a max threshold then kill people randomly
+        # If current population doesn't exceed a max threshold then nobody is killed
         if (
-            self.kill_type != ""
-            and self.max_allowed_population != -1
-            and self.current_population > self.max_allowed_population
+            self.kill_type == ""
+            or self.max_allowed_population == -1
+            or self.current_population <= self.max_allowed_population
         ):
-            # Compute number of extra agents
-            extra_agent_count = (
-                self.current_population - self.max_allowed_population
-                if self.kill_type == "difference"
-                else random.randint(
+            return 0
+
+        # Compute number of extra agents
+        extra_agent_count = (
+            self.current_population - self.max_allowed_population
+            if self.kill_type == "difference"
+            else int(
+                self.random_streams.interactions.integers(
                     self.current_population - self.max_allowed_population,
                     self.current_population - 1,
+                    endpoint=True,
                 )
             )
+        )
 
-            print(
-                "Max population exceeded! Number of people to be killed: %d"
-                % (extra_agent_count)
-            )
-            for _ in range(extra_agent_count):
-                # Alive agents index
-                alive_agents_index = list(
-                    set(np.arange(len(self.players))) - set(self.killed)
+        print(
+            "Max population exceeded! Number of people to be killed: %d"
+            % (extra_agent_count)
+        )
+
+        # Pick random alive agents (from the dense list of alive slots) and kill them
+        victims = self.random_streams.interactions.choice(
+            population.alive_indices(), extra_agent_count, replace=False
+        )
+        self.kill_players(victims)
+
+        return extra_agent_count
+
+    def kill_player(self, idx):
+        """
+        Kill an agent (see kill_players)
+
+        Params
+        ======
+        idx (int)
+            : Index of the player to be killed
+        """
+
+        self.kill_players([idx])
+
+    def kill_players(self, indices):
+        """
+        Kill a batch of agents, their logs are written, their slots in population are marked dead
+        and their entries in the RL model are freed
+
+        Params
+        ======
+        indices (numpy.ndarray/list)
+            : Indices of the players to be killed (in order of death)
+        """
+
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) == 0:
+            return
+
+        # Write logs (with the number of agents left alive after each death)
+        alive_count = self.population.num_alive
+        with self.profiler.phase("write_data"):
+            for k, idx in enumerate(indices):
+                self.players[idx].write_data(self.time, alive_count - k - 1, self.life_log)
+                self.event_log.record(
+                    self.time,
+                    DEATH,
+                    self.players[idx].index,
+                    energy=self.population.energy[idx],
                 )
-                idx = random.choice(alive_agents_index)
-                self.current_population -= 1
-                self.players[idx].write_data(self.time, self.current_population)
-                self.players[idx] = 0
-                self.killed = np.append(self.killed, idx)
-                self.model.kill_agent(idx)
+        self.logs_written += len(indices)
+
+        # Remove the agents from the environment and the RL model
+        self.players[indices] = 0
+        for idx in indices:
+            self.population.kill(idx)
+        self.killed.extend(indices.tolist())
+        if self.model is not None:
+            self.model.kill_agents(indices)
+        self.current_population = self.population.num_alive
+
+        if self.current_feedbacked_player in indices:
+            self.current_feedbacked_player = -1
+
+    def end_tick(self):
+        """
+        Add the counters of the current tick to the event log and its phases to the profiler
+        (called once the tick is over)
+        """
+
+        population = self.population
+        alive = population.alive_indices()
+
+        self.event_log.end_tick(
+            self.time,
+            population.num_alive,
+            self.food.num_uneaten,
+            population.energy[alive].mean() if len(alive) else 0.0,
+        )
+        self.profiler.end_tick(self.time)
 
     def update_time(self):
         """
@@ -992,51 +2231,123 @@ class PrimaVita:
 
         self.time += 1
 
-    def food_nearby(self, player):
+    def update_food(self):
+        """
+        Regrow food particles at the beginning of a tick if the regrowth condition is met
+        """
+
+        # If food regeneration condition is met then regenerate food particles
+        self.food_regen_condition_is_met = self.check_food_regen()
+        if self.food_regen_condition_is_met:
+            print("Food regenerated!")
+            self.refresh_particles()
+            self.food_regen_condition_is_met = False
+
+    def check_food_regen(self):
+        """
+        Check whether food should regrow at current time (see food_regen_mode)
+
+        Returns
+        =======
+        regrow (bool)
+            : Whether food particles are to be regrown now
+        """
+
+        if self.food_regen_mode == "threshold":
+            threshold = (
+                self.food_regen_threshold
+                if self.food_regen_threshold is not None
+                else self.number_of_particles // 2
+            )
+            return self.food.num_uneaten < threshold
+
+        if self.food_regen_mode in ("periodic", "density"):
+            return self.time > 0 and self.time % self.food_regen_period == 0
+
+        return False
+
+    def food_nearby(self, player, neighbour_index=None):
         """
         Find nearby food
 
         Params
         ======
-        player (pygeneses.envs.prima_vita.player_class.Player)
+        player          (pygeneses.envs.prima_vita.player_class.Player)
             : The player whose surroundings is to be checked for food particle
+        neighbour_index (pygeneses.envs.prima_vita.neighbours.NeighbourIndex)
+            : Precomputed neighbour lists to answer from (optional)
 
         Returns
         =======
         i/-1 (int)
-            : The index of closest food particle if available or -1
+            : The index of closest uneaten food particle within 30 of the player's center if
+              available or -1
         """
 
         # If player is dead then return -1
         if type(player) == int:
             return -1
-        # Otherwise loop through all food particles
-        for i, food_particle in enumerate(self.food_particles):
-            # If food particle hasn't been consumed yet
-            if type(food_particle) != int:
-                # Compute euclidean distance between player and food particle
-                ed = (
-                    (food_particle.particleX - (player.playerX + 16)) ** 2
-                    + (food_particle.particleY - (player.playerY + 16)) ** 2
-                ) ** (1 / 2)
 
-                # If distance is less than or equal to 20 then return index of that food particle
-                if ed <= 30:
-                    return i
+        # Center of the player
+        player_x, player_y = player.playerX + 16, player.playerY + 16
 
-        # If there isn't any food particle in range of the agent then return -1
-        return -1
+        # Closest uneaten particle among all food particles (or only those in nearby cells)
+        return self.food.nearest(
+            self.food_candidates(player, player_x, player_y, 30, neighbour_index),
+            player_x,
+            player_y,
+            30,
+        )
+
+    def food_candidates(self, player, x, y, radius, neighbour_index=None):
+        """
+        Return indices of food particles that can be within radius of a point near a player
+
+        Params
+        ======
+        player          (pygeneses.envs.prima_vita.player_class.Player)
+            : The player around which the point lies
+        x               (float)
+            : x coordinate of the point
+        y               (float)
+            : y coordinate of the point
+        radius          (float)
+            : Radius around the point
+        neighbour_index (pygeneses.envs.prima_vita.neighbours.NeighbourIndex)
+            : Precomputed neighbour lists to answer from (optional)
+
+        Returns
+        =======
+        candidates (numpy.ndarray)
+            : Indices (in increasing order) of food particles to be checked
+        """
+
+        # Use the player's precomputed food list if it covers the whole circle
+        if (
+            neighbour_index is not None
+            and player.population is self.population
+            and ((x - player.playerX) ** 2 + (y - player.playerY) ** 2) ** (1 / 2) + radius
+            <= neighbour_index.radius
+        ):
+            return neighbour_index.food_of(player.slot)[0]
+
+        if self.food.spatial_index is None:
+            return np.arange(len(self.food))
+
+        return self.food.spatial_index.query(x, y, radius)
 
-    def food_in_env(self, player, get_idx=False):
+    def food_in_env(self, player, get_idx=False, neighbour_index=None):
         """
         Return all food particles within a fixed radius of the agent
 
         Params
         ======
-        player  (pygeneses.envs.prima_vita.player_class.Player)
+        player          (pygeneses.envs.prima_vita.player_class.Player)
             : The player whose surroundings is to be checked for food particle
-        get_idx (bool)
+        get_idx         (bool)
             : Boolean to decide whether to return index or not
+        neighbour_index (pygeneses.envs.prima_vita.neighbours.NeighbourIndex)
+            : Precomputed neighbour lists to answer from (optional)
 
         Returns
         =======
@@ -1048,48 +2359,41 @@ class PrimaVita:
             : The index of food particles inside fixed radius of current agent
         """
 
-        # Create empty lists
-        env = []
-        vec = []
-        distances = []
-
         # If agent is dead return -1
         if type(player) == int:
             return -1
 
-        # Otherwise loop through all food particles
-        for i, food_particle in enumerate(self.food_particles):
-
-            # If food particles isn't consumed yet
-            if type(food_particle) != int:
-                # Compute euclidean distance of food particle and current agent
-                ed = (
-                    (food_particle.particleX - (player.playerX)) ** 2
-                    + (food_particle.particleY - (player.playerY)) ** 2
-                ) ** (1 / 2)
-
-                # If distance is less than or equal to 100 then push to lists
-                if ed <= self.sensory_radius:
-                    env.append(i)
-                    vec.append(food_particle.particleX - player.playerX)
-                    vec.append(food_particle.particleY - player.playerY)
-                    distances.append(ed)
+        player_x, player_y = player.playerX, player.playerY
+
+        # Uneaten food particles at distance less than or equal to sensory radius (checking all food
+        # particles or only those in nearby cells)
+        env, dx, dy, distances = self.food.within(
+            self.food_candidates(
+                player, player_x, player_y, self.sensory_radius, neighbour_index
+            ),
+            player_x,
+            player_y,
+            self.sensory_radius,
+        )
+        vec = np.column_stack((dx, dy)).ravel()
 
         if not get_idx:
-            return vec, distances
+            return vec.tolist(), distances.tolist()
 
-        return vec, distances, env
+        return vec.tolist(), distances.tolist(), env.tolist()
 
-    def players_in_env(self, host, get_idx=False):
+    def players_in_env(self, host, get_idx=False, neighbour_index=None):
         """
         Return all players within a fixed radius of the current player
 
         Params
         ======
-        host    (pygeneses.envs.prima_vita.player_class.Player)
+        host            (pygeneses.envs.prima_vita.player_class.Player)
             : The player whose surroundings is to be checked for food particle
-        get_idx (bool)
+        get_idx         (bool)
             : Boolean to decide whether to return index or not
+        neighbour_index (pygeneses.envs.prima_vita.neighbours.NeighbourIndex)
+            : Precomputed neighbour lists to answer from (optional)
 
         Returns
         =======
@@ -1101,49 +2405,31 @@ class PrimaVita:
             : The index of players inside fixed radius of current player
         """
 
-        # Create empty lists
-        env = []
-        vec = []
-        distances = []
-
-        # Mapping gender to number
-        gender_to_number = {"Female": 1, "Male": 2}
-
         # If player is dead then return -1
         if type(host) == int:
             return [], []
 
-        # Otherwise loop through all players
-        for i in range(self.leading_zeros, len(self.players)):
-            # If the player is not dead and is not the host itself then
-            if (type(self.players[i]) != int) and (self.players[i] != host):
-                # Compute euclidean distance between two agents
-                ed = (
-                    (host.playerX - (self.players[i].playerX)) ** 2
-                    + (host.playerY - (self.players[i].playerY)) ** 2
-                ) ** (1 / 2)
-
-                # If distance is less than equal to 100 then push to list
-                if ed <= self.sensory_radius:
-                    env.append(i)
-                    vec.append(host.playerX - self.players[i].playerX)
-                    vec.append(host.playerY - self.players[i].playerY)
-                    vec.append(gender_to_number[self.players[i].gender])
-                    distances.append(ed)
+        # Alive players (other than the host) at distance less than equal to sensory radius
+        env, dx, dy, distances = self.players_within(
+            host, self.sensory_radius, neighbour_index
+        )
+        vec = np.column_stack((dx, dy, self.population.gender[env])).ravel()
 
         if not get_idx:
-            return vec, distances
+            return vec.tolist(), distances.tolist()
 
-        return vec, distances, env
+        return vec.tolist(), distances.tolist(), env.tolist()
 
-    def search_mate(self, host):
+    def search_mate(self, host, neighbour_index=None):
         """
         Search for a mate (for sexual reproduction)
 
         Params
         ======
-        host (pygeneses.envs.prima_vita.player_class.Player)
+        host            (pygeneses.envs.prima_vita.player_class.Player)
             : The player whose surroundings is to be checked for food particle
+        neighbour_index (pygeneses.envs.prima_vita.neighbours.NeighbourIndex)
+            : Precomputed neighbour lists to answer from (optional)
 
         Returns
         =======
@@ -1151,44 +2437,58 @@ class PrimaVita:
             : Closest agent in proximity to current agent (to mate with)
         """
 
-        env = []
-
         # If agent is dead then return -1
         if type(host) == int:
             return -1
 
-        # Otherwise loop through all players
-        for i in range(self.leading_zeros, len(self.players)):
-            # If player isn't dead and isn't the host itself and is not impotent
-            # and is of appropriate age of reproduction and gender is not opposite of host then
-            if (
-                (type(self.players[i]) != int)
-                and (self.players[i] != host)
-                and (not self.players[i].is_impotent)
-                and ((self.time - self.players[i].born_at) in range(10, 61))
-                and (self.players[i].gender != host.gender)
-            ):
-                # Compute euclidean distance between player and host
-                ed = (
-                    ((host.playerX + 16) - (self.players[i].playerX + 16)) ** 2
-                    + ((host.playerY + 16) - (self.players[i].playerY + 16)) ** 2
-                ) ** (1 / 2)
-
-                # If distance is less than or equal to 30 then append it to env list
-                if ed <= 30:
-                    env.append(i)
+        env = self.mate_candidates(host, neighbour_index)
 
         # Return the closest agent, if there is one else return -1
-        return env[np.array(env).argsort()[0]] if len(env) > 0 else -1
+        return int(env[0]) if len(env) > 0 else -1
 
-    def search_enemy(self, host):
+    def mate_candidates(self, host, neighbour_index=None):
+        """
+        Find all players the host can mate with
+
+        Params
+        ======
+        host            (pygeneses.envs.prima_vita.player_class.Player)
+            : The player looking for a mate
+        neighbour_index (pygeneses.envs.prima_vita.neighbours.NeighbourIndex)
+            : Precomputed neighbour lists to answer from (optional)
+
+        Returns
+        =======
+        env (numpy.ndarray)
+            : Indices (in increasing order) of possible mates
+        """
+
+        population = self.population
+
+        # Players which aren't dead and aren't the host itself and are at distance less than or
+        # equal to 30
+        env, _, _, _ = self.players_within(host, 30, neighbour_index)
+        age = self.time - population.born_at[env]
+
+        # Keep those which are not impotent and are of appropriate age of reproduction and gender
+        # is not opposite of host
+        return env[
+            ~population.is_impotent[env]
+            & (age >= 10)
+            & (age <= 60)
+            & (population.gender[env] != population.gender[host.slot])
+        ]
+
+    def search_enemy(self, host, neighbour_index=None):
         """
         Search for a player to fight with
 
         Params
         ======
-        host (pygeneses.envs.prima_vita.player_class.Player)
+        host            (pygeneses.envs.prima_vita.player_class.Player)
             : The player whose surroundings is to be checked for food particle
+        neighbour_index (pygeneses.envs.prima_vita.neighbours.NeighbourIndex)
+            : Precomputed neighbour lists to answer from (optional)
 
         Returns
         =======
@@ -1196,57 +2496,147 @@ class PrimaVita:
             : Closest agent in proximity to current agent (to fight with)
         """
 
-        env = []
-
         # If agent is dead then return -1
         if type(host) == int:
             return -1
 
-        # Otherwise loop through all players
-        for i in range(self.leading_zeros, len(self.players)):
-            # If player isn't dead and isn't the host itself and isn't fighting with anyone else
-            if (
-                (type(self.players[i]) != int)
-                and (self.players[i] != host)
-                and (self.players[i].fighting_with == -1)
-            ):
-                # Compute euclidean distance between player and host
-                ed = (
-                    ((host.playerX + 16) - (self.players[i].playerX + 16)) ** 2
-                    + ((host.playerY + 16) - (self.players[i].playerY + 16)) ** 2
-                ) ** (1 / 2)
-
-                # If distance is less than or equal to 30 then append it to env list
-                if ed <= 30:
-                    env.append(i)
+        # Players which aren't dead and aren't the host itself and are at distance less than or
+        # equal to 30
+        env, _, _, _ = self.players_within(host, 30, neighbour_index)
+
+        # Keep those which aren't fighting with anyone else
+        env = env[self.population.fighting_with[env] == -1]
 
         # Return the closes agent, if there is one else return -1
-        return env[np.array(env).argsort()[0]] if len(env) > 0 else -1
+        return int(env[0]) if len(env) > 0 else -1
+
+    def players_within(self, host, radius, neighbour_index=None):
+        """
+        Find all alive players (other than the host) within a radius of the host, only players in
+        the host's precomputed neighbour list or in nearby grid cells are checked if available
+
+        Params
+        ======
+        host            (pygeneses.envs.prima_vita.player_class.Player)
+            : The player whose surroundings is to be checked
+        radius          (float)
+            : Radius around the host
+        neighbour_index (pygeneses.envs.prima_vita.neighbours.NeighbourIndex)
+            : Precomputed neighbour lists to answer from (optional)
+
+        Returns
+        =======
+        env       (numpy.ndarray)
+            : Indices (in increasing order) of players inside the radius
+        dx        (numpy.ndarray)
+            : Difference of x coordinates (host - player)
+        dy        (numpy.ndarray)
+            : Difference of y coordinates (host - player)
+        distances (numpy.ndarray)
+            : Euclidean distances between host and players
+        """
+
+        population = self.population
+        host_x, host_y = host.playerX, host.playerY
+
+        # Candidate players
+        if (
+            neighbour_index is not None
+            and host.population is population
+            and radius <= neighbour_index.radius
+        ):
+            env = neighbour_index.players_of(host.slot)[0]
+        elif population.spatial_index is not None:
+            env = population.spatial_index.query(host_x, host_y, radius)
+        else:
+            env = self.alive_agents()
+
+        # Drop dead players, the leading dead part of the players array and the host itself
+        env = env[population.alive[env] & (env >= self.leading_zeros)]
+        if host.population is population:
+            env = env[env != host.slot]
+
+        # Compute euclidean distance between host and candidates (across the seams of a toroidal
+        # world)
+        dx, dy = minimal_image(
+            host_x - population.x[env].astype(np.float64),
+            host_y - population.y[env].astype(np.float64),
+            self.period,
+        )
+        distances = np.sqrt(dx ** 2 + dy ** 2)
+
+        inside = distances <= radius
+
+        return env[inside], dx[inside], dy[inside], distances[inside]
+
+    def build_neighbour_index(self):
+        """
+        Compute neighbour lists (agents and food particles) of all alive agents in one vectorized
+        pass, the radius covers the sensory radius as well as the ranges used by food_nearby,
+        search_mate and search_enemy so that all of them can be answered from this index
+
+        Returns
+        =======
+        neighbour_index (pygeneses.envs.prima_vita.neighbours.NeighbourIndex)
+            : Neighbour lists of every alive agent at current time
+        """
+
+        population = self.population
+
+        # Positions of all alive agents
+        agents = self.alive_agents()
+        agent_x, agent_y = population.x[agents], population.y[agents]
+
+        # Positions of all uneaten food particles
+        all_food_x, all_food_y = self.food_positions()
+        food = np.flatnonzero(~np.isnan(all_food_x))
+        food_x, food_y = all_food_x[food], all_food_y[food]
+
+        # Radius large enough for every query (food_nearby searches 30 around player's center)
+        radius = max(self.sensory_radius, 30 + 16 * 2 ** (1 / 2))
+
+        players = radius_neighbours(
+            agent_x, agent_y, agent_x, agent_y, radius, exclude_self=True, period=self.period
+        )
+        players.indices = agents[players.indices]
+
+        food_lists = radius_neighbours(
+            agent_x, agent_y, food_x, food_y, radius, period=self.period
+        )
+        food_lists.indices = food[food_lists.indices]
+
+        return NeighbourIndex(
+            self.time,
+            radius,
+            agents,
+            len(self.players),
+            players,
+            food_lists,
+            all_food_x,
+            all_food_y,
+        )
+
+    def food_positions(self):
+        """
+        Return coordinates of all food particles
+
+        Returns
+        =======
+        food_x (numpy.ndarray)
+            : x coordinates of food particles (NaN for consumed ones)
+        food_y (numpy.ndarray)
+            : y coordinates of food particles (NaN for consumed ones)
+        """
+
+        return self.food.positions()
 
     def check_particles(self):
         """
-        Remove particles that are too close to others
-        """
-
-        # Loop through all food particles
-        for my_particle in self.food_particles:
-            # Again loop through all food particles
-            for j, my_particle_inner in enumerate(self.food_particles):
-                # If food particle isn't consumed then
-                if (
-                    my_particle_inner != my_particle
-                    and type(my_particle) != int
-                    and type(my_particle_inner) != int
-                ):
-                    # Compute euclidean distance
-                    ed = (
-                        (my_particle.particleX - my_particle_inner.particleX) ** 2
-                        + (my_particle.particleY - my_particle_inner.particleY) ** 2
-                    ) ** (1 / 2)
-
-                    # If distance is less than 20 then delete the food particle
-                    if ed < 20:
-                        self.food_particles[j] = 0
+        Remove particles that are too close to others (a particle is removed if an earlier
+        particle which is kept lies at distance less than 20 from it)
+        """
+
+        self.food.prune(20)
 
     def regenerate_species(self):
         """
@@ -1254,32 +2644,93 @@ class PrimaVita:
         """
 
         # Loop till iterator reaches initial population count
-        for i in range(self.initial_population):
+        for _ in range(self.initial_population):
             # Generate a new player and add it to player pool
-            self.players = np.append(
-                self.players,
-                Player(i, self.log_dir, self.time, self.initial_energy, mode=self.mode),
+            self._players.append(
+                Player(
+                    self.next_id,
+                    self.log_dir,
+                    self.time,
+                    self.initial_energy,
+                    mode=self.mode,
+                    population=self.population,
+                    history_detail=self.history_detail,
+                )
             )
+            self.next_id += 1
 
     def refresh_particles(self):
         """
-        Replenish food particles based on certain conditions
+        Replenish food particles, a batch of particles is generated in bulk (uniformly over the world
+        or, in density mode, inside the grid cells that are short of food) and the ones too close
+        to other particles are rejected at once
+
+        Returns
+        =======
+        slots (numpy.ndarray)
+            : Indices of the food particles that were added
         """
 
-        # Choose the number of particles to be generated
-        NEW_PARTICLES = random.randint(
-            self.particles_to_regrow[0], self.particles_to_regrow[1]
+        if self.food_regen_mode == "density":
+            x, y = self.sparse_cell_positions()
+        else:
+            # Choose the number of particles to be generated
+            rng = self.random_streams.food
+            NEW_PARTICLES = int(
+                rng.integers(self.particles_to_regrow[0], self.particles_to_regrow[1], endpoint=True)
+            )
+            x = rng.integers(10, self.world_width - 9, size=NEW_PARTICLES)
+            y = rng.integers(10, self.world_height - 9, size=NEW_PARTICLES)
+
+        # Add food particles which aren't too close to others
+        return self.food.spawn(x, y, 20)
+
+    def sparse_cell_positions(self):
+        """
+        Generate positions of new food particles for density regrowth, the world is divided into
+        square cells of side food_regen_cell_size and a cell with a deficit of d particles (below
+        food_regen_density) gets a Poisson(d) number of particles placed uniformly inside it
+
+        Returns
+        =======
+        x (numpy.ndarray)
+            : x coordinates of new particles
+        y (numpy.ndarray)
+            : y coordinates of new particles
+        """
+
+        cell_size = self.food_regen_cell_size
+        columns = int(np.ceil(self.world_width / cell_size))
+        rows = int(np.ceil(self.world_height / cell_size))
+
+        # Target density (default is the density of the initial food particles)
+        density = (
+            self.food_regen_density
+            if self.food_regen_density is not None
+            else self.number_of_particles
+            * cell_size ** 2
+            / (self.world_width * self.world_height)
         )
 
-        # Loop through all new particles
-        for j in range(NEW_PARTICLES):
-            # Generate food particle and append to food particles pool
-            self.food_particles = np.append(
-                self.food_particles, Particle(mode=self.mode)
-            )
+        # Number of uneaten particles in every cell
+        uneaten = self.food.uneaten_indices()
+        cell_x = np.minimum(self.food.x[uneaten] // cell_size, columns - 1).astype(np.int64)
+        cell_y = np.minimum(self.food.y[uneaten] // cell_size, rows - 1).astype(np.int64)
+        counts = np.bincount(cell_x * rows + cell_y, minlength=columns * rows)
+
+        # Number of new particles in every cell
+        rng = self.random_streams.food
+        new = rng.poisson(np.maximum(density - counts, 0))
+        cells = np.repeat(np.arange(columns * rows), new)
+
+        # Uniform positions inside the cells (and at least 10 pixels away from the borders)
+        low_x = np.maximum((cells // rows) * cell_size, 10)
+        high_x = np.minimum((cells // rows + 1) * cell_size, self.world_width - 9)
+        low_y = np.maximum((cells % rows) * cell_size, 10)
+        high_y = np.minimum((cells % rows + 1) * cell_size, self.world_height - 9)
+        inside = (low_x < high_x) & (low_y < high_y)
 
-        # Delete food particles which are too close to others
-        self.food_particles = self.check_particles()
+        x = np.floor(rng.uniform(low_x[inside], high_x[inside]))
+        y = np.floor(rng.uniform(low_y[inside], high_y[inside]))
 
-        # Update the total number of particles
-        self.number_of_particles += NEW_PARTICLES
+        return x, y
@@ -0,0 +1,240 @@
+# TickProfiler class measuring where the time of a tick of prima vita environment goes
+
+# Import required libraries
+import time
+import numpy as np
+
+# Import growable arrays (per-tick records are kept in one)
+from .growable_array import GrowableArray
+
+# Phases of a tick, food - food regrowth, states - state construction, neighbours - neighbour
+# search, predict - action prediction by the RL model, resolve - action resolution, lifecycle -
+# timed actions, deaths and population cap, write_data - logging lives of dead agents, update -
+# training of the RL model, render - drawing the world (human mode)
+PHASES = (
+    "food",
+    "states",
+    "neighbours",
+    "predict",
+    "resolve",
+    "lifecycle",
+    "write_data",
+    "update",
+    "render",
+)
+
+# One row per tick, wall time of the tick, time spent in every phase (time of nested phases isn't
+# counted in the enclosing one, so the rest of the tick is total minus the sum of phases) and number
+# of times every phase was entered
+TICK_PROFILE_DTYPE = np.dtype(
+    [("tick", np.int32), ("total", np.float64)]
+    + [(name, np.float64) for name in PHASES]
+    + [(name + "_calls", np.int32) for name in PHASES]
+)
+
+
+class Phase:
+    """
+    Context manager timing one phase of a TickProfiler
+    """
+
+    __slots__ = ("profiler", "index")
+
+    def __init__(self, profiler, index):
+        self.profiler = profiler
+        self.index = index
+
+    def __enter__(self):
+        self.profiler.enter(self.index)
+
+    def __exit__(self, *args):
+        self.profiler.exit()
+
+
+class NullPhase:
+    """
+    Context manager doing nothing (phases of a disabled TickProfiler)
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+NULL_PHASE = NullPhase()
+
+
+class TickProfiler:
+    """
+    Profiler recording the wall time and number of calls of every phase of every tick (see PHASES),
+    a disabled profiler hands out a shared context manager that does nothing, so instrumented code
+    costs a dictionary lookup per phase
+
+    Data members
+    ============
+    enabled     (bool)
+        : Whether phases are timed
+    phases      (dict)
+        : Mapping from phase name to its context manager
+    tick_time   (numpy.ndarray)
+        : Time spent in every phase in the current tick
+    tick_calls  (numpy.ndarray)
+        : Number of calls of every phase in the current tick
+    stack       (list)
+        : Phases entered and not exited yet (innermost last)
+    mark        (float)
+        : Time at which the innermost phase was entered or resumed
+    tick_begin  (float/None)
+        : Time at which the current tick began
+    ticks       (pygeneses.envs.prima_vita.growable_array.GrowableArray)
+        : Records of all ticks profiled (TICK_PROFILE_DTYPE)
+    """
+
+    def __init__(self, enabled=True):
+        """
+        Initializer for TickProfiler class
+
+        Params
+        ======
+        enabled (bool)
+            : Whether phases are timed (optional)
+        """
+
+        self.enabled = enabled
+        self.phases = {
+            name: Phase(self, i) if enabled else NULL_PHASE for i, name in enumerate(PHASES)
+        }
+        self.tick_time = np.zeros(len(PHASES))
+        self.tick_calls = np.zeros(len(PHASES), dtype=np.int32)
+        self.stack = []
+        self.mark = 0.0
+        self.tick_begin = None
+        self.ticks = GrowableArray(dtype=TICK_PROFILE_DTYPE, capacity=1024)
+
+    def phase(self, name):
+        """
+        Return the context manager timing a phase
+
+        Params
+        ======
+        name (str)
+            : Name of the phase (one of PHASES)
+        """
+
+        return self.phases[name]
+
+    def enter(self, index):
+        """
+        Begin a phase (the enclosing phase, if any, is paused)
+        """
+
+        now = time.perf_counter()
+        if self.stack:
+            self.tick_time[self.stack[-1]] += now - self.mark
+        self.stack.append(index)
+        self.tick_calls[index] += 1
+        self.mark = now
+
+    def exit(self):
+        """
+        End the innermost phase (the enclosing phase, if any, is resumed)
+        """
+
+        now = time.perf_counter()
+        self.tick_time[self.stack.pop()] += now - self.mark
+        self.mark = now
+
+    def begin_tick(self):
+        """
+        Mark the beginning of a tick
+        """
+
+        if not self.enabled:
+            return
+
+        # Phases timed outside of ticks (e.g. the initial observation) are forgotten
+        self.tick_time[:] = 0
+        self.tick_calls[:] = 0
+        self.tick_begin = time.perf_counter()
+
+    def end_tick(self, tick):
+        """
+        Record the phases of the current tick
+
+        Params
+        ======
+        tick (int)
+            : Time (in ticks) of the tick
+        """
+
+        if not self.enabled or self.tick_begin is None:
+            return
+
+        record = np.zeros(1, dtype=TICK_PROFILE_DTYPE)
+        record["tick"] = tick
+        record["total"] = time.perf_counter() - self.tick_begin
+        for i, name in enumerate(PHASES):
+            record[name] = self.tick_time[i]
+            record[name + "_calls"] = self.tick_calls[i]
+        self.ticks.extend(record)
+
+        self.tick_time[:] = 0
+        self.tick_calls[:] = 0
+        self.tick_begin = None
+
+    def summary(self):
+        """
+        Return totals over all ticks profiled
+
+        Returns
+        =======
+        summary (dict)
+            : Mapping from phase name (and other, time of ticks outside any phase) to a dictionary
+              with its total time (seconds), number of calls and share of the total time
+        """
+
+        ticks = self.ticks.view()
+        total = ticks["total"].sum()
+
+        summary = {}
+        for name in PHASES:
+            summary[name] = {
+                "time": float(ticks[name].sum()),
+                "calls": int(ticks[name + "_calls"].sum()),
+            }
+        summary["other"] = {
+            "time": float(total - sum(phase["time"] for phase in summary.values())),
+            "calls": len(ticks),
+        }
+        for phase in summary.values():
+            phase["share"] = phase["time"] / total if total > 0 else 0.0
+
+        return summary
+
+    def report(self):
+        """
+        Return a table of the time spent in every phase over all ticks profiled (slowest first)
+        """
+
+        ticks = len(self.ticks)
+        lines = [
+            "%-12s %10s %12s %14s %7s" % ("phase", "calls", "time (s)", "ms per tick", "share")
+        ]
+        for name, phase in sorted(self.summary().items(), key=lambda item: -item[1]["time"]):
+            lines.append(
+                "%-12s %10d %12.4f %14.4f %6.1f%%"
+                % (
+                    name,
+                    phase["calls"],
+                    phase["time"],
+                    1000 * phase["time"] / max(ticks, 1),
+                    100 * phase["share"],
+                )
+            )
+        lines.append("%d ticks, %.4f s" % (ticks, self.ticks.view()["total"].sum()))
+
+        return "\n".join(lines)
@@ -0,0 +1,74 @@
+# RandomStreams class deriving the random number generators of prima vita environment from one seed
+
+# Import required libraries
+import numpy as np
+
+# Subsystems with a stream of their own, food - food counts, positions and regrowth, players -
+# gender, impotency and position of new players and number of offspring, interactions - fights,
+# population culling and the agent asked for human feedback, model - initial weights and action
+# sampling of the RL model
+STREAMS = ("food", "players", "interactions", "model")
+
+# Generator used by players and particles created without a stream (unseeded)
+shared_rng = None
+
+
+def default_rng():
+    """
+    Return the unseeded generator shared by players and particles created without a stream
+    """
+
+    global shared_rng
+    if shared_rng is None:
+        shared_rng = np.random.default_rng()
+
+    return shared_rng
+
+
+class RandomStreams:
+    """
+    Independent random number generators (numpy.random.Generator) of the subsystems of the
+    environment (see STREAMS), spawned from one seed so that the same seed always gives the same
+    draws and a subsystem drawing more or fewer numbers doesn't shift the draws of the others
+
+    Data members
+    ============
+    seed         (int)
+        : Seed the streams were spawned from (drawn from OS entropy if none was given)
+    food         (numpy.random.Generator)
+        : Stream of food counts, positions and regrowth
+    players      (numpy.random.Generator)
+        : Stream of attributes of new players and of numbers of offspring
+    interactions (numpy.random.Generator)
+        : Stream of fights, population culling and human feedback
+    model        (numpy.random.Generator)
+        : Stream from which seeds of the RL model are drawn
+    """
+
+    def __init__(self, seed=None):
+        """
+        Initializer for RandomStreams class
+
+        Params
+        ======
+        seed (int)
+            : Seed of all streams (optional)
+        """
+
+        sequence = np.random.SeedSequence(seed)
+        self.seed = sequence.entropy
+
+        for name, child in zip(STREAMS, sequence.spawn(len(STREAMS))):
+            setattr(self, name, np.random.default_rng(child))
+
+    def model_seed(self):
+        """
+        Draw a seed for a new RL model (torch generators are seeded with it)
+
+        Returns
+        =======
+        seed (int)
+            : Seed
+        """
+
+        return int(self.model.integers(2 ** 63))
@@ -0,0 +1,175 @@
+# SpatialHash class for answering radius queries in prima vita environment
+
+# Import required libraries
+import numpy as np
+
+# Import other functions
+from .neighbours import periodic_copies
+
+
+class SpatialHash:
+    """
+    Uniform grid over the 2D world, every item (agent or food particle) is hashed to the square
+    cell containing it so that a radius query only visits the cells overlapping the query circle
+
+    Data members
+    ============
+    cell_size  (float)
+        : Length of the side of each square cell
+    cells      (dict)
+        : Mapping from cell (cx, cy) to the set of ids inside it, only occupied cells are stored
+    item_cells (dict)
+        : Mapping from id to the cell it is currently in
+    period     (tuple/None)
+        : Size (width, height) of a toroidal world, queries then wrap around the seams
+    """
+
+    def __init__(self, cell_size, period=None):
+        """
+        Initializer for SpatialHash class
+
+        Params
+        ======
+        cell_size (float)
+            : Length of the side of each square cell (usually the sensory radius)
+        period    (tuple)
+            : Size (width, height) of a toroidal world (optional)
+        """
+
+        self.cell_size = float(cell_size)
+        self.period = period
+        self.cells = {}
+        self.item_cells = {}
+
+    def __len__(self):
+        return len(self.item_cells)
+
+    def __contains__(self, id):
+        return id in self.item_cells
+
+    def cell_of(self, x, y):
+        """
+        Return the cell containing point (x, y)
+
+        Params
+        ======
+        x (float)
+            : x coordinate
+        y (float)
+            : y coordinate
+
+        Returns
+        =======
+        cell (tuple)
+            : Cell coordinates (cx, cy)
+        """
+
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, id, x, y):
+        """
+        Add an item to the grid
+
+        Params
+        ======
+        id (int)
+            : Id of the item
+        x  (float)
+            : x coordinate of the item
+        y  (float)
+            : y coordinate of the item
+        """
+
+        cell = self.cell_of(x, y)
+        self.cells.setdefault(cell, set()).add(id)
+        self.item_cells[id] = cell
+
+    def remove(self, id):
+        """
+        Remove an item from the grid (no-op if the item isn't in the grid)
+
+        Params
+        ======
+        id (int)
+            : Id of the item
+        """
+
+        cell = self.item_cells.pop(id, None)
+        if cell is None:
+            return
+
+        items = self.cells[cell]
+        items.discard(id)
+
+        # Forget empty cells so that memory is proportional to occupied cells
+        if not items:
+            del self.cells[cell]
+
+    def move(self, id, x, y):
+        """
+        Update the position of an item, the grid only changes if the item changed cells
+
+        Params
+        ======
+        id (int)
+            : Id of the item
+        x  (float)
+            : New x coordinate of the item
+        y  (float)
+            : New y coordinate of the item
+        """
+
+        cell = self.cell_of(x, y)
+        if self.item_cells.get(id) == cell:
+            return
+
+        self.remove(id)
+        self.cells.setdefault(cell, set()).add(id)
+        self.item_cells[id] = cell
+
+    def query(self, x, y, radius):
+        """
+        Return ids of all items in cells overlapping the circle of given radius around (x, y), this
+        is a superset of the items inside the circle (in a toroidal world the circle wraps around
+        the seams)
+
+        Params
+        ======
+        x      (float)
+            : x coordinate of the center
+        y      (float)
+            : y coordinate of the center
+        radius (float)
+            : Radius of the query circle
+
+        Returns
+        =======
+        ids (numpy.ndarray)
+            : Sorted ids of candidate items
+        """
+
+        # Centers to search around (shifted copies of the center in a toroidal world)
+        centers = [(x, y)]
+        if self.period is not None:
+            copies_x, copies_y, _ = periodic_copies(
+                np.array([x], dtype=np.float64), np.array([y], dtype=np.float64), radius, self.period
+            )
+            centers = zip(copies_x, copies_y)
+
+        cells = set()
+        for center_x, center_y in centers:
+            x_begin, y_begin = self.cell_of(center_x - radius, center_y - radius)
+            x_end, y_end = self.cell_of(center_x + radius, center_y + radius)
+            cells.update(
+                (cx, cy)
+                for cx in range(x_begin, x_end + 1)
+                for cy in range(y_begin, y_end + 1)
+            )
+
+        ids = []
+        for cell in cells:
+            items = self.cells.get(cell)
+            if items:
+                ids.extend(items)
+
+        return np.sort(np.array(ids, dtype=np.int64))
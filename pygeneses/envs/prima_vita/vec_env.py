@@ -0,0 +1,441 @@
+# SubprocVecPrimaVita class running many prima vita environments in worker processes
+
+# Import required libraries
+import time
+import random
+import traceback
+import numpy as np
+import multiprocessing
+from multiprocessing import shared_memory
+
+# Import other classes
+from .prima_vita import PrimaVita
+
+
+def attach_buffers(names, shapes, dtypes):
+    """
+    Attach to shared memory blocks and view them as numpy arrays
+
+    Params
+    ======
+    names  (dict)
+        : Name of the shared memory block of every buffer
+    shapes (dict)
+        : Shape of every buffer
+    dtypes (dict)
+        : Data type of every buffer
+
+    Returns
+    =======
+    blocks  (dict)
+        : Shared memory blocks (kept to close them later)
+    buffers (dict)
+        : Numpy arrays over the shared memory blocks
+    """
+
+    blocks = {key: shared_memory.SharedMemory(name=names[key]) for key in names}
+    buffers = {
+        key: np.ndarray(shapes[key], dtype=dtypes[key], buffer=blocks[key].buf)
+        for key in names
+    }
+
+    return blocks, buffers
+
+
+def episode_log_dir(log_dir, episode):
+    """
+    Return the log directory of an episode of an environment, the first episode (0) logs into the
+    log directory of the environment and episode n into <log_dir>_episode_<n>
+    """
+
+    return log_dir if episode == 0 else "%s_episode_%d" % (log_dir, episode)
+
+
+def worker(remote, index, params_dic, log_dir_info, seed, names, shapes, dtypes):
+    """
+    Run one environment in a worker process, commands (reset/step/close) are received through a
+    pipe and observations, rewards and dones are written into row index of the shared buffers,
+    every episode is logged into a log directory of its own (see episode_log_dir)
+
+    Params
+    ======
+    remote       (multiprocessing.connection.Connection)
+        : Worker end of the pipe
+    index        (int)
+        : Index of the environment (row of the shared buffers)
+    params_dic   (dict)
+        : Parameters of the environment
+    log_dir_info (str)
+        : To be appended to the log directory name of the environment
+    seed         (int)
+        : Seed of the random streams of the environment
+    names        (dict)
+        : Name of the shared memory block of every buffer
+    shapes       (dict)
+        : Shape of every buffer
+    dtypes       (dict)
+        : Data type of every buffer
+    """
+
+    blocks, buffers = attach_buffers(names, shapes, dtypes)
+    observations, rewards, dones, agent_ids, actions = (
+        buffers["observations"][index],
+        buffers["rewards"][index],
+        buffers["dones"][index],
+        buffers["agent_ids"][index],
+        buffers["actions"][index],
+    )
+    capacity = len(agent_ids)
+
+    def publish(env_observations, env_agent_ids):
+        # Write states and ids of alive agents into the shared buffers
+        if len(env_agent_ids) > capacity:
+            raise RuntimeError(
+                "Environment %d has %d alive agents but max_agents is %d"
+                % (index, len(env_agent_ids), capacity)
+            )
+        observations[: len(env_agent_ids)] = env_observations[env_agent_ids]
+        agent_ids[: len(env_agent_ids)] = env_agent_ids
+
+        return env_agent_ids
+
+    try:
+        env = PrimaVita(dict(params_dic, seed=seed), mode="bot", log_dir_info=log_dir_info)
+        first_log_dir = env.log_dir
+        episode = 0
+        current_ids = np.zeros(0, dtype=np.int64)
+
+        def new_episode():
+            # Reset into a new log directory once the episode has begun (reset deletes log_dir)
+            nonlocal episode
+            if env.time >= 0:
+                episode += 1
+                env.log_dir = episode_log_dir(first_log_dir, episode)
+
+            return env.reset()
+
+        while True:
+            command = remote.recv()
+
+            if command == "reset":
+                current_ids = publish(*new_episode())
+                remote.send((len(current_ids), False))
+            elif command == "step":
+                num_agents = len(current_ids)
+                (
+                    env_observations,
+                    env_rewards,
+                    env_dones,
+                    env_agent_ids,
+                ) = env.step(actions[:num_agents])
+
+                # Rewards and dones of the agents that acted (in the order of their actions)
+                rewards[:num_agents] = env_rewards[current_ids]
+                dones[:num_agents] = env_dones[current_ids]
+
+                # Start a new episode once everyone is dead
+                episode_over = len(env_agent_ids) == 0
+                if episode_over:
+                    env_observations, env_agent_ids = new_episode()
+
+                current_ids = publish(env_observations, env_agent_ids)
+                remote.send((len(current_ids), episode_over))
+            elif command == "close":
+                # Write lives and events that are still pending (worker processes skip atexit)
+                env.life_log.close()
+                env.event_log.flush()
+                break
+    except Exception:
+        remote.send(RuntimeError(traceback.format_exc()))
+    finally:
+        for block in blocks.values():
+            block.close()
+        remote.close()
+
+
+class SubprocVecPrimaVita:
+    """
+    Many independent PrimaVita environments stepped together, every environment runs in its own
+    worker process and observations, rewards, dones, agent ids and actions are exchanged through
+    shared memory (only small commands go through pipes)
+
+    Environment i only reports its alive agents, so that the shared buffers have a fixed size,
+    observations[i][k] is the state of agent agent_ids[i][k] and actions[i][k] passed to step is its
+    action, rewards[i][k] and dones[i][k] returned by step belong to the agents which acted (i.e.
+    agent_ids[i] of the previous call), an environment whose population has perished is reset
+    automatically
+
+    Data members
+    ============
+    num_envs    (int)
+        : Number of environments
+    state_size  (int)
+        : Size of the state of an agent
+    max_agents  (int)
+        : Maximum number of alive agents in an environment (size of the shared buffers)
+    counts      (numpy.ndarray)
+        : Number of alive agents in every environment
+    episodes    (numpy.ndarray)
+        : Number of finished episodes of every environment
+    processes   (list)
+        : Worker processes
+    remotes     (list)
+        : Parent ends of the pipes to the workers
+    blocks      (dict)
+        : Shared memory blocks of the buffers
+    buffers     (dict)
+        : Numpy arrays over the shared memory blocks
+    closed      (bool)
+        : Whether workers have been stopped and shared memory has been freed
+    """
+
+    def __init__(
+        self,
+        num_envs,
+        params_dic={},
+        log_dir_info=None,
+        max_agents=None,
+        seeds=None,
+        start_method=None,
+    ):
+        """
+        Initializer for SubprocVecPrimaVita class
+
+        Params
+        ======
+        num_envs     (int)
+            : Number of environments
+        params_dic   (dict)
+            : Parameters of every environment (same as PrimaVita, model is always None since actions
+              come from step)
+        log_dir_info (str)
+            : To be appended to log directory names, environment i logs its first episode into
+              Players_Data_<log_dir_info>_<i> and episode n into
+              Players_Data_<log_dir_info>_<i>_episode_<n> (optional)
+        max_agents   (int)
+            : Maximum number of alive agents in an environment, defaults to the larger of
+              initial_population and max_allowed_population (optional)
+        seeds        (list)
+            : Seed of every environment, derived from the seed in params_dic if not given
+              (optional)
+        start_method (str)
+            : Start method of worker processes (fork/spawn/forkserver) (optional)
+        """
+
+        params_dic = dict(params_dic)
+        params_dic["model"] = None
+
+        initial_population = (
+            params_dic["initial_population"]
+            if "initial_population" in params_dic.keys()
+            else 10
+        )
+        max_allowed_population = (
+            params_dic["max_allowed_population"]
+            if "max_allowed_population" in params_dic.keys()
+            else 100
+        )
+        if max_agents is None:
+            if max_allowed_population == -1:
+                raise ValueError("max_agents is needed if population is not bounded")
+            max_agents = max(initial_population, max_allowed_population)
+
+        log_dir_info = log_dir_info if log_dir_info != None else str(round(time.time()))
+        # Seeds of environments are derived from the seed in params_dic (if any) unless given
+        if seeds is None:
+            rng = random.Random(params_dic["seed"] if "seed" in params_dic.keys() else None)
+            seeds = [rng.randrange(2 ** 31) for _ in range(num_envs)]
+
+        self.num_envs = num_envs
+        self.state_size = (
+            params_dic["state_size"] if "state_size" in params_dic.keys() else 21
+        )
+        self.max_agents = max_agents
+        self.counts = np.zeros(num_envs, dtype=np.int64)
+        self.episodes = np.zeros(num_envs, dtype=np.int64)
+
+        # Allocate shared buffers
+        shapes = {
+            "observations": (num_envs, max_agents, self.state_size),
+            "rewards": (num_envs, max_agents),
+            "dones": (num_envs, max_agents),
+            "agent_ids": (num_envs, max_agents),
+            "actions": (num_envs, max_agents),
+        }
+        dtypes = {
+            "observations": np.float32,
+            "rewards": np.float64,
+            "dones": np.bool_,
+            "agent_ids": np.int64,
+            "actions": np.int64,
+        }
+        self.blocks = {
+            key: shared_memory.SharedMemory(
+                create=True,
+                size=max(int(np.prod(shapes[key])) * np.dtype(dtypes[key]).itemsize, 1),
+            )
+            for key in shapes
+        }
+        self.buffers = {
+            key: np.ndarray(shapes[key], dtype=dtypes[key], buffer=self.blocks[key].buf)
+            for key in shapes
+        }
+        names = {key: block.name for key, block in self.blocks.items()}
+
+        # Start worker processes
+        context = multiprocessing.get_context(start_method)
+        self.remotes, self.processes = [], []
+        for i in range(num_envs):
+            remote, worker_remote = context.Pipe()
+            process = context.Process(
+                target=worker,
+                args=(
+                    worker_remote,
+                    i,
+                    params_dic,
+                    log_dir_info + "_" + str(i),
+                    seeds[i],
+                    names,
+                    shapes,
+                    dtypes,
+                ),
+                daemon=True,
+            )
+            process.start()
+            worker_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+
+        self.closed = False
+
+    def gather(self):
+        """
+        Receive replies of all workers (raising errors that happened in workers)
+
+        Returns
+        =======
+        episode_over (numpy.ndarray)
+            : Whether each environment was reset because its population perished
+        """
+
+        episode_over = np.zeros(self.num_envs, dtype=np.bool_)
+        for i, remote in enumerate(self.remotes):
+            reply = remote.recv()
+            if isinstance(reply, Exception):
+                raise reply
+            self.counts[i], episode_over[i] = reply
+
+        self.episodes += episode_over
+
+        return episode_over
+
+    def observations(self):
+        """
+        Return observations and ids of alive agents of every environment (views over the shared
+        buffers, overwritten by the next call to reset or step)
+        """
+
+        observations = [
+            self.buffers["observations"][i, :count] for i, count in enumerate(self.counts)
+        ]
+        agent_ids = [
+            self.buffers["agent_ids"][i, :count] for i, count in enumerate(self.counts)
+        ]
+
+        return observations, agent_ids
+
+    def reset(self):
+        """
+        Reset all environments
+
+        Returns
+        =======
+        observations (list)
+            : States of alive agents of every environment
+        agent_ids    (list)
+            : Ids of alive agents of every environment
+        """
+
+        for remote in self.remotes:
+            remote.send("reset")
+        self.gather()
+
+        return self.observations()
+
+    def step_async(self, actions):
+        """
+        Write actions into shared memory and tell all workers to step
+
+        Params
+        ======
+        actions (list)
+            : Actions of every environment (one per agent in agent_ids of that environment)
+        """
+
+        for i, env_actions in enumerate(actions):
+            env_actions = np.asarray(env_actions, dtype=np.int64).ravel()
+            if len(env_actions) != self.counts[i]:
+                raise ValueError(
+                    "Expected %d actions for environment %d, got %d"
+                    % (self.counts[i], i, len(env_actions))
+                )
+            self.buffers["actions"][i, : self.counts[i]] = env_actions
+
+        for remote in self.remotes:
+            remote.send("step")
+
+    def step_wait(self):
+        """
+        Wait for all workers to finish stepping
+
+        Returns
+        =======
+        observations (list)
+            : States of alive agents of every environment
+        rewards      (list)
+            : Rewards of the agents which acted in every environment
+        dones        (list)
+            : Whether each agent which acted died in every environment
+        agent_ids    (list)
+            : Ids of alive agents of every environment
+        """
+
+        acted = self.counts.copy()
+        self.gather()
+        observations, agent_ids = self.observations()
+
+        rewards = [self.buffers["rewards"][i, :count] for i, count in enumerate(acted)]
+        dones = [self.buffers["dones"][i, :count] for i, count in enumerate(acted)]
+
+        return observations, rewards, dones, agent_ids
+
+    def step(self, actions):
+        """
+        Step all environments with given actions (see step_async and step_wait)
+        """
+
+        self.step_async(actions)
+
+        return self.step_wait()
+
+    def close(self):
+        """
+        Stop worker processes and free shared memory
+        """
+
+        if self.closed:
+            return
+
+        for remote in self.remotes:
+            try:
+                remote.send("close")
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join()
+
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+
+        self.closed = True
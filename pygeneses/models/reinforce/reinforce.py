@@ -6,7 +6,7 @@ import torch.optim as optim
 import multiprocessing
 
 # Import the NN
-from .reinforce_nn import Agent
+from .reinforce_nn import Agent, act_batch
 
 
 class ReinforceModel:
@@ -33,9 +33,11 @@ class ReinforceModel:
         : Rewards of agent at each trajectory
     policy_loss     (dict)
         : Loss function used for each individual agent
+    generator       (torch.Generator/None)
+        : Generator of initial weights and sampled actions, None to use torch's global generator
     """
 
-    def __init__(self, initial_population, state_size, action_size):
+    def __init__(self, initial_population, state_size, action_size, seed=None):
         """
         Initializer for ReinforceModel class
 
@@ -47,6 +49,9 @@ class ReinforceModel:
             : Size of state (variables) that the agent experiences in environment
         action_size        (int)
             : Number of possible actions an agent can take
+        seed               (int)
+            : Seed of initial weights and sampled actions, same seed gives same agents and same
+              actions for same states (optional)
         """
 
         self.state_size = state_size
@@ -58,6 +63,9 @@ class ReinforceModel:
         self.saved_log_probs = {}
         self.rewards = {}
         self.policy_loss = {}
+        self.generator = (
+            torch.Generator().manual_seed(seed) if seed is not None else None
+        )
 
         # Initialize agents
         self.init(initial_population)
@@ -75,9 +83,7 @@ class ReinforceModel:
         # Loop through the entire population count
         for idx in range(initial_population):
             # Create NN for the player
-            self.agents.append(
-                Agent(self.state_size, self.action_size, self.device).to(self.device)
-            )
+            self.agents.append(self.new_agent())
 
             # Create optimizer for the agent
             self.optimizers.append(optim.Adam(self.agents[-1].parameters(), lr=1e-2))
@@ -90,6 +96,24 @@ class ReinforceModel:
             self.policy_loss[idx] = []
             self.rewards[idx] = []
 
+    def new_agent(self):
+        """
+        Create the NN of an agent, its initial weights are drawn from generator if the model is
+        seeded (torch's global generator is left untouched)
+
+        Returns
+        =======
+        agent (pygeneses.models.reinforce.reinforce_nn.Agent)
+            : NN of the agent
+        """
+
+        if self.generator is None:
+            return Agent(self.state_size, self.action_size, self.device).to(self.device)
+
+        with torch.random.fork_rng(devices=[]):
+            torch.manual_seed(int(torch.randint(2 ** 62, (1,), generator=self.generator)))
+            return Agent(self.state_size, self.action_size, self.device).to(self.device)
+
     def predict_action(self, idx, state):
         """
         Predict action using NN
@@ -110,11 +134,39 @@ class ReinforceModel:
         """
 
         # Compute action, lob probability of action and embedding from NN
-        action, log_prob, embed = self.agents[idx].act(state)
+        action, log_prob, embed = self.agents[idx].act(state, self.generator)
         self.saved_log_probs[idx].append(log_prob)
 
         return action, embed
 
+    def predict_actions(self, indices, states):
+        """
+        Predict actions of many agents using one batched forward pass
+
+        Params
+        ======
+        indices (numpy.ndarray)
+            : Ids of agents for whom actions are to be predicted
+        states  (numpy.ndarray)
+            : States that the agents are experiencing in environment (one row per agent)
+
+        Returns
+        =======
+        actions (numpy.ndarray)
+            : Actions taken at current states
+        embeds  (torch.Tensor)
+            : Embeddings computed from NN (one row per agent)
+        """
+
+        # Compute actions, log probabilities of actions and embeddings from NNs
+        actions, log_probs, embeds = act_batch(
+            [self.agents[idx] for idx in indices], states, self.device, self.generator
+        )
+        for k, idx in enumerate(indices):
+            self.saved_log_probs[idx].append(log_probs[k : k + 1])
+
+        return actions, embeds
+
     def update_reward(self, idx, reward):
         """
         Update reward of an agent
@@ -145,9 +197,7 @@ class ReinforceModel:
         # Loop until new offsprings are added
         for idx in range(len(self.agents), len(self.agents) + num_offsprings):
             # Create NN
-            self.agents.append(
-                Agent(self.state_size, self.action_size, self.device).to(self.device)
-            )
+            self.agents.append(self.new_agent())
 
             # Load weights from parent
             self.agents[-1].load_state_dict(self.agents[parent_idx].state_dict())
@@ -179,6 +229,39 @@ class ReinforceModel:
         self.policy_loss[idx] = []
         self.rewards[idx] = 0
 
+    def compact(self, indices):
+        """
+        Drop every agent not in indices (e.g. dead agents), agent indices[k] becomes agent k and
+        keeps its NN, optimizer, score, log probabilities and rewards
+
+        Params
+        ======
+        indices (iterable)
+            : Ids of the agents to be kept (in their new order)
+        """
+
+        indices = [int(idx) for idx in indices]
+
+        self.agents = [self.agents[idx] for idx in indices]
+        self.optimizers = [self.optimizers[idx] for idx in indices]
+        self.scores = [self.scores[idx] for idx in indices]
+        self.saved_log_probs = {k: self.saved_log_probs[idx] for k, idx in enumerate(indices)}
+        self.policy_loss = {k: self.policy_loss[idx] for k, idx in enumerate(indices)}
+        self.rewards = {k: self.rewards[idx] for k, idx in enumerate(indices)}
+
+    def kill_agents(self, indices):
+        """
+        Kill many agents at once (i.e. free all their entries)
+
+        Params
+        ======
+        indices (iterable)
+            : Ids of the agents to be killed
+        """
+
+        for idx in indices:
+            self.kill_agent(idx)
+
     def update_single_agent(self, idx):
         """
         Update an agent
@@ -189,26 +272,50 @@ class ReinforceModel:
             : Id of the agent to be updated
         """
 
-        # If agent is alive and has experienced someting (i.e. taken some action in lifetime) then
-        if type(self.agents[idx]) != int and len(self.saved_log_probs[idx]) > 0:
-            # Set policy loss to an empty list
-            self.policy_loss[idx] = []
+        self.update_agents([idx])
 
-            # Compute log_probs[i] * rewards[i] for current agent
-            for j in range(len(self.saved_log_probs[idx])):
-                self.policy_loss[idx].append(
-                    -(self.saved_log_probs[idx][j] * self.rewards[idx][j])
-                )
+    def update_agents(self, indices):
+        """
+        Update many agents with one backward pass, the losses of all agents are summed (every agent
+        only has gradients from its own loss as agents share no weights) so that log probabilities
+        from a batched forward pass (see predict_actions) are backpropagated through only once
 
-            self.saved_log_probs[idx] = []
-            self.rewards[idx] = []
+        Params
+        ======
+        indices (iterable)
+            : Ids of the agents to be updated
+        """
+
+        updated = []
+        for idx in indices:
+            # If agent is alive and has experienced someting (i.e. taken some action in lifetime) then
+            if type(self.agents[idx]) != int and len(self.saved_log_probs[idx]) > 0:
+                # Set policy loss to an empty list
+                self.policy_loss[idx] = []
+
+                # Compute log_probs[i] * rewards[i] for current agent
+                for j in range(len(self.saved_log_probs[idx])):
+                    self.policy_loss[idx].append(
+                        -(self.saved_log_probs[idx][j] * self.rewards[idx][j])
+                    )
+
+                self.saved_log_probs[idx] = []
+                self.rewards[idx] = []
+
+                # Sum all the products
+                self.policy_loss[idx] = torch.cat(self.policy_loss[idx]).sum()
+                updated.append(idx)
 
-            # Sum all the products
-            self.policy_loss[idx] = torch.cat(self.policy_loss[idx]).sum()
+        if len(updated) == 0:
+            return
 
-            # Backpropagate through the network
+        # Backpropagate through the networks of all agents at once
+        for idx in updated:
             self.optimizers[idx].zero_grad()
-            self.policy_loss[idx].backward(retain_graph=True)
+        torch.stack([self.policy_loss[idx] for idx in updated]).sum().backward(
+            retain_graph=True
+        )
+        for idx in updated:
             self.optimizers[idx].step()
 
     def update_all_agents(self, start_pos):
@@ -216,6 +323,4 @@ class ReinforceModel:
         Update all agent (i.e. backward propagation)
         """
 
-        # Loop through all agents
-        for idx in range(start_pos, len(self.agents)):
-            self.update_single_agent(idx)
+        self.update_agents(range(start_pos, len(self.agents)))
@@ -70,14 +70,16 @@ class Agent(nn.Module):
         # also return the embedding for the agent
         return F.softmax(x, dim=1), embed.detach()
 
-    def act(self, state):
+    def act(self, state, generator=None):
         """
         Take an action
 
         Params
         ======
-        state (numpy.ndarray)
+        state     (numpy.ndarray)
             : Input to neural network (state of the agent)
+        generator (torch.Generator)
+            : Generator the action is sampled with, torch's global generator if not given (optional)
 
         Returns
         =======
@@ -94,5 +96,51 @@ class Agent(nn.Module):
         probs = probs.cpu()
         embed = embed.cpu()
         m = Categorical(probs)
-        action = m.sample()
+        action = torch.multinomial(probs, 1, generator=generator).squeeze(1)
         return action.item(), m.log_prob(action), embed
+
+
+def act_batch(agents, states, device, generator=None):
+    """
+    Take actions for many agents (each with its own weights) in one batched forward pass, the
+    weights of all agents are stacked so that gradients still flow back to every agent
+
+    Params
+    ======
+    agents    (list)
+        : Agent objects (one per state)
+    states    (numpy.ndarray)
+        : States of the agents (one row per agent)
+    device    (torch.device)
+        : Device on which the forward pass is done
+    generator (torch.Generator)
+        : Generator the actions are sampled with, torch's global generator if not given (optional)
+
+    Returns
+    =======
+    actions   (numpy.ndarray)
+        : Action taken by every agent
+    log_probs (torch.Tensor)
+        : Log probability of every action
+    embed     (torch.Tensor)
+        : Embeddings of all agents from NN (one row per agent)
+    """
+
+    x = torch.as_tensor(states, dtype=torch.float32, device=device)
+
+    # Stack weights of all agents
+    fc1_weight = torch.stack([agent.fc1.weight for agent in agents])
+    fc1_bias = torch.stack([agent.fc1.bias for agent in agents])
+    fc2_weight = torch.stack([agent.fc2.weight for agent in agents])
+    fc2_bias = torch.stack([agent.fc2.bias for agent in agents])
+
+    # Same layers as Agent.forward, every agent's state goes through its own weights
+    x = torch.einsum("nhs,ns->nh", fc1_weight, x) + fc1_bias
+    embed = x.detach().clone()
+    x = F.relu(x)
+    x = torch.einsum("nah,nh->na", fc2_weight, x) + fc2_bias
+    probs = F.softmax(x, dim=1).cpu()
+
+    m = Categorical(probs)
+    actions = torch.multinomial(probs, 1, generator=generator).squeeze(1)
+    return actions.numpy(), m.log_prob(actions), embed.cpu()
@@ -7,7 +7,15 @@ import pkgutil
 import json
 
 # Import functions to compute values used in VitaBoard
-from .graph_gen import get_life_stats, tsne, get_parents, get_children, get_sum_rewards
+from .graph_gen import (
+    get_life_stats,
+    tsne,
+    get_parents,
+    get_children,
+    get_sum_rewards,
+    open_life_log,
+)
+from pygeneses.envs.prima_vita.life_log import parse_agent_path, segment_files
 
 # Instantiate flask app
 app = Flask(__name__)
@@ -18,6 +26,24 @@ app.secret_key = "my-secret-key"
 app.config["SESSION_TYPE"] = "filesystem"
 
 
+def is_logged(path):
+    """
+    Check whether a path names the life of an agent in a log directory (log_dir/born_at-index)
+
+    Params
+    ======
+    path (str)
+        : Path of the agent
+    """
+
+    try:
+        log_dir, born_at, index = parse_agent_path(path)
+    except ValueError:
+        return False
+
+    return os.path.isdir(log_dir) and (born_at, index) in open_life_log(log_dir)
+
+
 @app.route("/", methods=["GET", "POST"])
 def index():
     """
@@ -28,7 +54,7 @@ def index():
     GET
         : Get index.html (main file for VitaBoard)
     POST
-        : Show visualizer when provided with the full path of log file and speed
+        : Show visualizer when provided with the path of an agent (log_dir/born_at-index) and speed
     """
 
     if request.method == "GET":
@@ -42,7 +68,7 @@ def index():
     elif request.method == "POST":
         """
         file_location (str)
-            : Full path of log file which is to be visualized
+            : Path (log_dir/born_at-index) of the agent which is to be visualized
         speed         (int)
             : Speed (in seconds) with which the visualizer's frame should change
         """
@@ -51,22 +77,12 @@ def index():
         file_location = request.form["file_location"]
         speed = request.form["speed"]
 
-        # Check if file exists or not
-        if not os.path.exists(file_location):
-            return jsonify(
-                {
-                    "title": "Error",
-                    "text": "The location " + file_location + " does not exist",
-                    "icon": "error",
-                }
-            )
-
-        # Check if the file is of npy type or not
-        if ".npy" not in file_location:
+        # Check if the agent is in the life log of its directory or not
+        if not is_logged(file_location):
             return jsonify(
                 {
                     "title": "Error",
-                    "text": "You need to pass a npy file",
+                    "text": "The agent " + file_location + " is not in any life log",
                     "icon": "error",
                 }
             )
@@ -130,8 +146,8 @@ def groups():
                 }
             )
 
-        # Check if Embeddings directory exists inside the directory or not
-        if not os.path.exists(os.path.join(location, "Embeddings")):
+        # Check if the directory holds a life log or not
+        if not segment_files(location):
             return jsonify(
                 {
                     "title": "Error",
@@ -145,7 +161,7 @@ def groups():
         # Get coordinates in 2D space after training t-SNE
         coord = tsne(location)
 
-        # If there are no npy files inside Embeddings folder (no one died before stopping training) then throw error
+        # If no agent acted before dying (or no one died before stopping training) then throw error
         if coord == -1:
             return jsonify(
                 {
@@ -201,7 +217,7 @@ def stats():
         # Get the mean, variance and qof (Quality of life)
         mean, variance, qof = get_life_stats(location)
 
-        # If there were no npy files then the mean, variance and qof values will be -1 (which means no one died before training was stopped)
+        # If the life log is empty then the mean, variance and qof values will be -1 (which means no one died before training was stopped)
         # throw an error in this case
         if mean == -1 and variance == -1 and qof == -1:
             return jsonify(
@@ -233,34 +249,24 @@ def lineage():
     Methods
     =======
     POST
-        : Returns family tree (both ancestors and successors) of an agent whose log file location is passed
+        : Returns family tree (both ancestors and successors) of an agent whose path (log_dir/born_at-index) is passed
     """
 
     if request.method == "POST":
         """
-        location (str)
-            : Full path of log file containing information about a particular agent whose family tree is to be generated
+        filename (str)
+            : Path (log_dir/born_at-index) of the agent whose family tree is to be generated
         """
 
-        # Get the location of log directory from AJAX call
+        # Get the path of the agent from AJAX call
         filename = request.form["filename"]
 
-        # Check if the directory exists or not
-        if not os.path.exists(filename):
-            return jsonify(
-                {
-                    "title": "Error",
-                    "text": "The location " + filename + " does not exist",
-                    "icon": "error",
-                }
-            )
-
-        # Check if the file is of npy type or not
-        if ".npy" not in filename:
+        # Check if the agent is in the life log of its directory or not
+        if not is_logged(filename):
             return jsonify(
                 {
                     "title": "Error",
-                    "text": "You need to pass a npy file",
+                    "text": "The agent " + filename + " is not in any life log",
                     "icon": "error",
                 }
             )
@@ -292,11 +298,7 @@ def lineage():
         successor_list = sorted(successor_list, key=lambda k: int(k["level"]))
 
         for i in range(len(successor_list)):
-            succ_filename = successor_list[i]["filename"]
-            if os.path.exists(succ_filename):
-                successor_list[i]["reward_sum"] = get_sum_rewards(successor_list[i]["filename"])
-            else:
-                successor_list[i]["reward_sum"] = -1000
+            successor_list[i]["reward_sum"] = get_sum_rewards(successor_list[i]["filename"])
 
         # Dump successor_list into JSON object
         successor_list = json.dumps(successor_list)
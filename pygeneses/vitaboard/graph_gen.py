@@ -2,13 +2,42 @@
 
 # Import required libraries
 import os
-import glob
 import numpy as np
 import re
 from collections import OrderedDict
 import json
 from sklearn.manifold import TSNE
 
+# Import life log reader
+from pygeneses.envs.prima_vita.life_log import LifeLogReader, agent_path, parse_agent_path
+
+# Readers of the life logs opened so far (one per log directory)
+readers = {}
+
+
+def open_life_log(address):
+    """
+    Return a reader of the life log in a directory, readers are kept between calls and only read
+    the segments written since they were last used
+
+    Params
+    ======
+    address (str)
+        : Address of the folder containing the log files
+
+    Returns
+    =======
+    reader (pygeneses.envs.prima_vita.life_log.LifeLogReader)
+        : Reader of the life log
+    """
+
+    if address not in readers:
+        readers[address] = LifeLogReader(address)
+    else:
+        readers[address].refresh()
+
+    return readers[address]
+
 
 def add_node(id, parent_id, fam_tree):
     """
@@ -17,19 +46,15 @@ def add_node(id, parent_id, fam_tree):
     Params
     ======
     id        (str)
-        : file name of the current node (to be added)
+        : Name (born_at-index) of the current node (to be added)
 
     parent_id (str)
-        : file name (minus the extension) of the parent of id
+        : Name (born_at-index) of the parent of id
 
     fam_tree  (dict)
         : Dictionary Containing {id: parents}
 
     """
-    # Check if the parent_id is not None
-    if parent_id != None:
-        # Add the extension (.npy) to the parent_id
-        parent_id = parent_id + ".npy"
     # Check if id is not in fam_tree
     if id not in fam_tree:
         # Add a new entry in the dict`
@@ -64,10 +89,10 @@ def add_life_exp(life, tob, life_data, id, address):
 
     # Check if tob already exists in life_data or not
     if tob not in life_data.keys():
-        life_data[tob] = [[life], [os.path.join(address, str(tob) + "-" + str(id))]]
+        life_data[tob] = [[life], [agent_path(address, tob, id)]]
     else:
         life_data[tob][0].append(life)
-        life_data[tob][1].append(os.path.join(address, str(tob) + "-" + str(id)))
+        life_data[tob][1].append(agent_path(address, tob, id))
 
     return life_data
 
@@ -89,25 +114,18 @@ def gen_fam_graph(address):
 
     # Initialise Dictionary
     fam_tree = {}
-    # Get file names from the directory
-    f_names = os.listdir(address)
-    # Filter out non .npy files
-    f_names = check_ext(f_names)
-    # Iterate over all the file names in the list f_names
-    for f_name in f_names:
-        # Load the values of a file
-        log_values = np.load(address + "/" + f_name, allow_pickle=True)
-        # Extract parents from log_values
-        parents = log_values[1]
-        # Check if there exists only one parent
-        if parents.shape == (2,):
-            # Make an entry in the fam_tree Dictionary
-            add_node(f_name, str(parents[1]) + "-" + str(parents[0]), fam_tree)
-        # Check if there exist two parents
-        elif parents.shape == (2, 2):
-            # Make entries in the fam_tree Dictionary
-            add_node(f_name, str(parents[0][1]) + "-" + str(parents[0][0]), fam_tree)
-            add_node(f_name, str(parents[1][1]) + "-" + str(parents[1][0]), fam_tree)
+    # Read the agents of all segments of the life log
+    reader = open_life_log(address)
+    # Iterate over all the agents
+    for agent in reader.agents:
+        born_at, index = int(agent["born_at"]), int(agent["index"])
+        # Make an entry in the fam_tree Dictionary for every parent (none for initial population)
+        for parent_born_at, parent in reader.parents(born_at, index):
+            add_node(
+                str(born_at) + "-" + str(index),
+                str(parent_born_at) + "-" + str(parent),
+                fam_tree,
+            )
     return fam_tree
 
 
@@ -132,30 +150,21 @@ def get_life_stats(address):
         : Dictionary containing the Quality of life index of players born at a particular time {time_of_birth: count_qof}
     """
 
-    # Get all npy files from address
-    f_names = glob.glob(os.path.join(address, "*.npy"))
+    # Read the agents of all segments of the life log
+    agents = open_life_log(address).agents
 
-    if len(f_names) == 0:
+    if len(agents) == 0:
         return -1, -1, -1
 
     life_data = {}
 
-    for f_name in f_names:
-        # Load log file
-        log_values = np.load(f_name, allow_pickle=True)
-
+    # Agents which died without doing anything are skipped
+    for agent in agents[agents["num_actions"] > 0]:
         # Extract tob (time of birth) and id of the player
-        tob, id = os.path.basename(f_name).split("-")
-        tob = int(tob)
-
-        if len(log_values) == 2:
-            continue
-
-        # Extract the tod (time of death) of the player
-        tod = log_values[-1][1]
+        tob, id = int(agent["born_at"]), int(agent["index"])
 
         # Calculate the lifetime of the player
-        lifetime = tod - tob
+        lifetime = int(agent["died_at"]) - tob
 
         # Update life_data
         life_data = add_life_exp(lifetime, tob, life_data, id, address)
@@ -213,29 +222,23 @@ def tsne(address):
         : Dictionary containting the t-SNE embedding of players. {time_of_birth: mean}
     """
 
-    embeddings = glob.glob(os.path.join(address, "Embeddings/*.npy"))
+    # Embeddings of agents which acted at least once
+    agents, embedding_values = open_life_log(address).embedding_matrix()
+    embedding_paths = [
+        agent_path(address, born_at, index)
+        for born_at, index in zip(agents["born_at"].tolist(), agents["index"].tolist())
+    ]
 
-    if len(embeddings) == 0:
+    if len(embedding_values) == 0:
         return -1
 
-    embedding_values = []
-    embedding_ids = []
-    for i, embedding in enumerate(embeddings):
-        data = np.load(embedding, allow_pickle=True)
-        if data[0].shape != ():
-            embedding_values.append(data[0])
-            embedding_ids.append(i)
-
-    embedding_values = np.array(embedding_values)
-
     X_embedded = TSNE(n_components=2, random_state=42).fit_transform(embedding_values)
 
     coord = []
     for i, embedding in enumerate(X_embedded):
-        path = embeddings[embedding_ids[i]]
-        path = os.path.normpath(path)
-        path = "/".join(path.split(os.sep)[:-2] + [path.split(os.sep)[-1]])
-        coord.append({"x": int(embedding[0]), "y": int(embedding[1]), "agent": path})
+        coord.append(
+            {"x": int(embedding[0]), "y": int(embedding[1]), "agent": embedding_paths[i]}
+        )
 
     coord = json.dumps(coord)
     return coord
@@ -250,7 +253,7 @@ def get_parents(path, filename, ancestor_list, level=0):
     path          (str)
         : Path of the folder containing the log files
     filename      (str)
-        : Log file name containing log of agent whose parents are to be found
+        : Name (born_at-index) of agent whose parents are to be found
     ancestor_list (list)
         : A list of dictionaries containing information about parents and their level of depth
     level         (int)
@@ -258,162 +261,94 @@ def get_parents(path, filename, ancestor_list, level=0):
 
     """
 
-    # Read the log file
-    agent_data = np.load(os.path.join(path, filename), allow_pickle=True)
+    reader = open_life_log(path)
+    _, born_at, index = parse_agent_path(filename)
 
-    # If the agent is from initial population and died without performing any action then break from recursion
-    if len(agent_data) < 2:
-        return
-    # If the agent is from initial population then he/she will not have any other parent
-    elif len(agent_data[1]) != 2:
+    # If the agent isn't logged (alive when training stopped) then break from recursion
+    if (born_at, index) not in reader:
         return
-    # Otherwise recursively find parent at each generation
-    else:
-        parents = agent_data[1]
-
-        # If there are two parents (sexual reproduction)
-        if type(parents[0]) == list:
-            level += 1
-
-            # Extract data of both parents from child log
-            id_1, tob_1 = parents[0]
-            id_2, tob_2 = parents[1]
-
-            # Append to ancestor_list the details of first parent and find parent(s) of parent recursively
-            ancestor_list.append(
-                {
-                    "parent_of": filename,
-                    "filename": os.path.join(
-                        path, str(tob_1) + "-" + str(id_1) + ".npy"
-                    ),
-                    "level": int(level),
-                    "reward_sum": reward
-                }
-            )
-            get_parents(
-                path, str(tob_1) + "-" + str(id_1) + ".npy", ancestor_list, level
-            )
 
-            # Append to ancestor_list the details of second parent and find parent(s) of parent recursively
-            ancestor_list.append(
-                {
-                    "parent_of": filename,
-                    "filename": os.path.join(
-                        path, str(tob_2) + "-" + str(id_2) + ".npy"
-                    ),
-                    "level": int(level)
-                }
-            )
-            get_parents(
-                path, str(tob_2) + "-" + str(id_2) + ".npy", ancestor_list, level
-            )
-        # If there is only single parent (asexual reproduction)
-        else:
-            level += 1
+    level += 1
 
-            # Extract data of parent from child log
-            id_1, tob_1 = parents
+    # Agents of initial population have no parents, otherwise there is one parent (asexual
+    # reproduction) or two (sexual reproduction)
+    for parent_born_at, parent in reader.parents(born_at, index):
+        parent_name = str(parent_born_at) + "-" + str(parent)
 
-            # Append to ancestor_list the details of parent and find parent(s) of parent recursively
-            ancestor_list.append(
-                {
-                    "parent_of": filename,
-                    "filename": os.path.join(
-                        path, str(tob_1) + "-" + str(id_1) + ".npy"
-                    ),
-                    "level": int(level)
-                }
-            )
-            get_parents(
-                path, str(tob_1) + "-" + str(id_1) + ".npy", ancestor_list, level
-            )
+        # Append to ancestor_list the details of parent and find parent(s) of parent recursively
+        ancestor_list.append(
+            {
+                "parent_of": filename,
+                "filename": agent_path(path, parent_born_at, parent),
+                "level": int(level),
+            }
+        )
+        get_parents(path, parent_name, ancestor_list, level)
 
 
 def get_children(path, filename, successor_list, level=0):
     """
-    Generates list of parents recursively until the initial population
+    Generates list of children recursively until agents without offspring
 
     Params
     ======
-    path          (str)
+    path           (str)
         : Path of the folder containing the log files
-    filename      (str)
-        : Log file name containing log of agent whose parents are to be found
-    ancestor_list (list)
-        : A list of dictionaries containing information about parents and their level of depth
-    level         (int)
-        : Depth of ancestor tree denoting the generation (generation 1 denotes immediate parents)
+    filename       (str)
+        : Name (born_at-index) of agent whose children are to be found
+    successor_list (list)
+        : A list of dictionaries containing information about children and their level of depth
+    level          (int)
+        : Depth of successor tree denoting the generation (generation 1 denotes immediate children)
 
     """
 
-    full_path = os.path.join(path, filename)
+    reader = open_life_log(path)
+    _, born_at, index = parse_agent_path(filename)
 
     # If the agent was alive when training stopped then break from recursion
-    if not os.path.exists(full_path):
+    if (born_at, index) not in reader:
         return
 
-    # Load agent logs
-    agent_data = np.load(full_path, allow_pickle=True)
+    level += 1
+
+    # Children of successful sexual or asexual reproduction
+    for child_born_at, child in reader.children(born_at, index):
+        child_name = str(child_born_at) + "-" + str(child)
+
+        # Append the child details into successor_list and find its children recursively
+        successor_list.append(
+            {
+                "child_of": filename,
+                "filename": agent_path(path, child_born_at, child),
+                "level": int(level),
+            }
+        )
+        get_children(path, child_name, successor_list, level)
 
-    # If agent died without performing any action then there won't be any children
-    if len(agent_data) <= 2:
-        return
-    # Otherwise search for children
-    else:
-        # Boolean flag to check if the current agent had any children or not
-        has_child = False
-
-        level += 1
-
-        # Logs for action starts from index 2 for agents not in initial population otherwise they start
-        # at index 1
-        logdata = agent_data[2:] if not filename.startswith("0-") else agent_data[1:]
-
-        for data in logdata:
-            # Extract type of action and reward for current action
-            action = data[0]
-            reward = data[2]
-
-            # If action was sexual or asexual reproduction and it was successful then append children to tree
-            if action in [10, 11] and reward > 0:
-                # The agent has atleast one child
-                has_child = True
-
-                # Extract action time, number of offsprings and their ids
-                time = data[1]
-                num_offsprings = data[4]
-                offspring_ids = data[5]
-
-                for offspring_id in offspring_ids:
-                    # Append the child details into successor_list and find its children recursively
-                    successor_list.append(
-                        {
-                            "child_of": filename,
-                            "filename": os.path.join(
-                                path, str(time) + "-" + str(offspring_id) + ".npy"
-                            ),
-                            "level": int(level),
-                        }
-                    )
-                    get_children(
-                        path,
-                        str(time) + "-" + str(offspring_id) + ".npy",
-                        successor_list,
-                        level,
-                    )
-
-        # If the current agent does not have any child then break out of recursion
-        if not has_child:
-            return
 
 def get_sum_rewards(filename):
-    # Load agent logs
-    agent_data = np.load(filename, allow_pickle=True)
+    """
+    Return the sum of rewards of an agent over its life (-1000 if it isn't logged or did nothing)
 
-    if len(agent_data) <= 2:
+    Params
+    ======
+    filename (str)
+        : Path (log_dir/born_at-index) of the agent
+    """
+
+    path, born_at, index = parse_agent_path(filename)
+    reader = open_life_log(path)
+
+    if (born_at, index) not in reader:
+        return -1000
+
+    actions = reader.actions(born_at, index)
+    if len(actions) == 0:
         return -1000
 
-    return sum([ad[2] for ad in agent_data[2:]])
+    return float(actions["reward"].sum())
+
 
 # Uncomment to check if the functions are working properly
 if __name__ == "__main__":
@@ -12,6 +12,7 @@ import argparse
 from pygeneses.envs.prima_vita.global_constants import *
 from pygeneses.envs.prima_vita.player_class import Player
 from pygeneses.envs.prima_vita.particle_class import Particle
+from pygeneses.envs.prima_vita.life_log import LifeLogReader, parse_agent_path
 
 
 def current_action_time(result, action, timestamp, age, myfont):
@@ -77,7 +78,7 @@ def visualize(file_location, speed):
     Params
     ======
     file_location  (str)
-        : Full path of log file of agent containing all the actions performed by the agent throughout his/her lifetime
+        : Path (log_dir/born_at-index) of the agent whose actions throughout his/her lifetime are to be shown
     speed          (int)
         : Speed (in seconds) after which the next frame should be loaded (display speed)
     """
@@ -97,38 +98,32 @@ def visualize(file_location, speed):
     # Create font in which everything will be rendered in screen
     myfont = pygame.font.SysFont("monospace", 32)
 
-    # Extract all events in the agent's life
-    life_events = np.load(file_location, allow_pickle=True)
+    # Find the agent in the life log of its directory
+    log_dir, tob, index = parse_agent_path(file_location)
+    reader = LifeLogReader(log_dir)
+    agent = reader.agent(tob, index)
 
-    # Get initial position (stored at index 0 of log file)
-    x, y = life_events[0][0], life_events[0][1]
+    # Get initial position
+    x, y = float(agent["x"]), float(agent["y"])
     i = 0
-    try:
-        # Get time of birth (though it is present in the filename itself), this line helps to identify
-        # if the agent died without doing anything or not
-        tob = life_events[2][1] if len(life_events[1]) == 2 else life_events[1][1]
-
-        # Actual time of birth
-        tob = int(os.path.basename(file_location).split("-")[0])
-    except:
+
+    if agent["num_actions"] == 0:
         # Agent died without doing anything, exit the visualizer
-        print(
-            os.path.basename(file_location).split(".")[0].split("-")[1],
-            "died without doing anything",
-        )
+        print(index, "died without doing anything")
         sys.exit()
 
-    # Get all the actions from life events
-    life_events = life_events[2:] if len(life_events[1]) == 2 else life_events[1:]
+    # Get all the actions and the vectors of food particles and players seen at every action
+    life_events = reader.actions(tob, index)
+    proximity = reader.vectors(tob, index)
 
     # Initialize player object for the current player
     player = Player(i, log_dir=".", tob=tob, energy=200, x=x, y=y, mode="human")
 
-    for life_event in life_events:
+    for life_event, (food_in_proximity, players_in_proximity) in zip(life_events, proximity):
         # Extract action result, action and time at which it was done
-        result = "" if life_event[2] != 0 else "Failed "
-        action = life_event[0]
-        timestamp = life_event[1]
+        result = "" if life_event["reward"] != 0 else "Failed "
+        action = int(life_event["action"])
+        timestamp = int(life_event["time"])
         age = timestamp - tob
 
         # Get the text for action and timestamp
@@ -137,43 +132,35 @@ def visualize(file_location, speed):
         # Fill the screen with green color
         screen.fill((0, 178, 0))
 
-        # Find the food particles and players in proximity to current agent
-        food_in_proximity = life_event[-1][0]
-        players_in_proximity = life_event[-1][1]
-
         particles = []
         players = []
 
-        # Display the food particle which are in the agent's state
-        for i in range(len(food_in_proximity) // 2):
-            food_info = food_in_proximity[i : i + 2]
-            if len(food_info) > 0:
-                particles.append(
-                    Particle(
-                        x=(player.playerX + food_info[0]),
-                        y=(player.playerY + food_info[1]),
-                        mode="human",
-                    )
+        # Display the food particle which are in the agent's state (rows are (dx, dy))
+        for food_info in food_in_proximity:
+            particles.append(
+                Particle(
+                    x=(player.playerX + food_info[0]),
+                    y=(player.playerY + food_info[1]),
+                    mode="human",
                 )
-                particles[-1].show_close(screen)
+            )
+            particles[-1].show_close(screen)
 
-        # Display the agents which are in close proximity to current agent
+        # Display the agents which are in close proximity to current agent (rows are (dx, dy, sex))
         # All other agents appear yellow (as they are shown using show_close) while the current agent is shown in red color
-        for i in range(len(players_in_proximity) // 3):
-            player_info = players_in_proximity[i : i + 3]
-            if len(player_info) > 0:
-                players.append(
-                    Player(
-                        i=i,
-                        tob=i,
-                        log_dir=".",
-                        energy=200,
-                        x=(player.playerX + player_info[0]),
-                        y=(player.playerY + player_info[1]),
-                        mode="human",
-                    )
+        for i, player_info in enumerate(players_in_proximity):
+            players.append(
+                Player(
+                    i=i,
+                    tob=i,
+                    log_dir=".",
+                    energy=200,
+                    x=(player.playerX + player_info[0]),
+                    y=(player.playerY + player_info[1]),
+                    mode="human",
                 )
-                players[-1].show_close(screen)
+            )
+            players[-1].show_close(screen)
 
         for event in pygame.event.get():
             pass
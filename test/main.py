@@ -1,11 +1,11 @@
 import unittest
 
-from test_envs import TestPlayerClass, TestPrimaVitaClass
+from test_envs import TestPlayerClass, TestPopulationClass, TestGrowableArrayClass, TestEmbeddingStatsClass, TestFoodFieldClass, TestSpatialHashClass, TestNeighbours, TestLifeLogClasses, TestPrimaVitaClass, TestSubprocVecPrimaVita
 # from test_hypertune import TestHyperTuneClass
 from test_models import TestReinforceModelClass
 
 if __name__ == "__main__":
-    test_classes_to_run = [TestPlayerClass, TestPrimaVitaClass]
+    test_classes_to_run = [TestPlayerClass, TestPopulationClass, TestGrowableArrayClass, TestEmbeddingStatsClass, TestFoodFieldClass, TestSpatialHashClass, TestNeighbours, TestLifeLogClasses, TestPrimaVitaClass, TestSubprocVecPrimaVita]
 
     loader = unittest.TestLoader()
 
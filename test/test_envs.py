@@ -1,11 +1,34 @@
 import unittest
 import numpy as np
+import torch
 import os
 import shutil
 
 from pygeneses.envs.prima_vita.player_class import Player
 from pygeneses.envs.prima_vita.particle_class import Particle
-from pygeneses.envs.prima_vita import PrimaVita
+from pygeneses.envs.prima_vita.population import Population
+from pygeneses.envs.prima_vita.growable_array import GrowableArray
+from pygeneses.envs.prima_vita.embedding_stats import EmbeddingStats
+from pygeneses.envs.prima_vita.event_log import (
+    read_events,
+    read_ticks,
+    DEATH,
+    FIGHT,
+    INGESTION,
+    SEXUAL_REPRODUCTION,
+)
+from pygeneses.envs.prima_vita.profiler import PHASES, NULL_PHASE
+from pygeneses.envs.prima_vita.food_field import FoodField
+from pygeneses.envs.prima_vita.spatial_hash import SpatialHash
+from pygeneses.envs.prima_vita.neighbours import radius_neighbours
+from pygeneses.envs.prima_vita.env import save, load
+from pygeneses.envs.prima_vita.life_log import (
+    LifeLogWriter,
+    BackgroundLifeLogWriter,
+    LifeLogReader,
+    INDEX_FILE,
+)
+from pygeneses.envs.prima_vita import PrimaVita, SubprocVecPrimaVita
 
 
 class TestPlayerClass(unittest.TestCase):
@@ -15,7 +38,8 @@ class TestPlayerClass(unittest.TestCase):
         """
 
         player = Player(i=1, log_dir=".", tob=10, energy=200, x=100, y=300)
-        self.assertEqual(player.action_history, [[100, 300]])
+        self.assertEqual((player.action_history.x, player.action_history.y), (100, 300))
+        self.assertEqual(len(player.action_history), 0)
 
     def test_add_parent_single_parent(self):
         """
@@ -24,8 +48,7 @@ class TestPlayerClass(unittest.TestCase):
 
         player = Player(i=10, log_dir=".", tob=10, energy=200)
         player.add_parent(id=1, tob=0)
-        self.assertEqual(player.action_history[1][0], 1)
-        self.assertEqual(player.action_history[1][1], 0)
+        self.assertEqual(player.action_history.parents.tolist(), [[1, 0]])
 
     def test_add_parent_two_parents(self):
         """
@@ -34,10 +57,7 @@ class TestPlayerClass(unittest.TestCase):
 
         player = Player(i=10, log_dir=".", tob=10, energy=200)
         player.add_parent(id=1, tob=0, mate_id=2, mate_tob=3)
-        self.assertEqual(player.action_history[1][0][0], 1)
-        self.assertEqual(player.action_history[1][0][1], 0)
-        self.assertEqual(player.action_history[1][1][0], 2)
-        self.assertEqual(player.action_history[1][1][1], 3)
+        self.assertEqual(player.action_history.parents.tolist(), [[1, 0], [2, 3]])
 
     def test_write_data(self):
         """
@@ -51,7 +71,7 @@ class TestPlayerClass(unittest.TestCase):
         player = Player(i=1, log_dir=model.log_dir, tob=10, energy=200)
         player.write_data(time=10, alive_count=10)
 
-        self.assertTrue(os.path.exists(os.path.join(model.log_dir, "10-1.npy")))
+        self.assertTrue((10, 1) in LifeLogReader(model.log_dir))
 
         shutil.rmtree(model.log_dir)
 
@@ -62,14 +82,20 @@ class TestPlayerClass(unittest.TestCase):
         """
 
         player = Player(i=10, log_dir=".", tob=10, energy=200, x=0, y=0)
-        player.states.append([-1, -1])
+        player.states = np.empty(2, dtype=object)
+        player.states[0] = np.array([3.0, 4.0, 6.0, 8.0])
+        player.states[1] = np.array([-1.0, -1.0, 1.0])
         player.update_history(action=7, time=10, reward=-2)
 
-        check_vals = [7, 10, -2, 200, 0, 0, [-1, -1]]
+        check_vals = {"action": 7, "time": 10, "reward": -2, "energy": 200, "x": 0, "y": 0,
+                      "food_count": 2, "players_count": 1, "food_nearest": 5, "enemy": -1}
 
-        for i in range(len(check_vals)):
-            with self.subTest("Check action history for an action <= 9", i=i):
-                self.assertEqual(player.action_history[-1][i], check_vals[i])
+        for field, value in check_vals.items():
+            with self.subTest("Check action history for an action <= 9", field=field):
+                self.assertAlmostEqual(player.action_history[-1][field], value, places=5)
+
+        self.assertEqual(player.action_history.food_vectors.view().tolist(), [3, 4, 6, 8])
+        self.assertEqual(player.action_history.player_vectors.view().tolist(), [-1, -1, 1])
 
     def test_update_history_action_asexual_reproduction(self):
         """
@@ -77,21 +103,18 @@ class TestPlayerClass(unittest.TestCase):
         """
 
         player = Player(i=10, log_dir=".", tob=10, energy=200, x=0, y=0)
-        player.states.append([-1, -1])
         player.update_history(
             action=10, time=10, reward=-2, num_offspring=2, offspring_ids=[11, 12]
         )
 
-        check_vals = [10, 10, -2, 200, 2, [11, 12], 0, 0, [-1, -1]]
+        check_vals = {"action": 10, "time": 10, "reward": -2, "energy": 200,
+                      "num_offspring": 2, "offspring_begin": 0, "mate": -1, "x": 0, "y": 0}
+
+        for field, value in check_vals.items():
+            with self.subTest("Check action history for asexual reproduction", field=field):
+                self.assertEqual(player.action_history[-1][field], value)
 
-        for i in range(len(check_vals)):
-            if i != 5:
-                with self.subTest("Check action history for failed action", i=i):
-                    self.assertEqual(player.action_history[-1][i], check_vals[i])
-            else:
-                with self.subTest("Check action history for failed action", i=i):
-                    self.assertEqual(player.action_history[-1][i][0], check_vals[i][0])
-                    self.assertEqual(player.action_history[-1][i][1], check_vals[i][1])
+        self.assertEqual(player.action_history.offspring.view().tolist(), [11, 12])
 
     def test_update_history_action_sexual_reproduction(self):
         """
@@ -99,7 +122,6 @@ class TestPlayerClass(unittest.TestCase):
         """
 
         player = Player(i=10, log_dir=".", tob=10, energy=200, x=0, y=0)
-        player.states.append([-1, -1])
         player.update_history(
             action=11,
             time=10,
@@ -109,16 +131,14 @@ class TestPlayerClass(unittest.TestCase):
             mate_id=5,
         )
 
-        check_vals = [11, 10, -2, 200, 2, [11, 12], 5, 0, 0, [-1, -1]]
+        check_vals = {"action": 11, "time": 10, "reward": -2, "energy": 200,
+                      "num_offspring": 2, "offspring_begin": 0, "mate": 5, "x": 0, "y": 0}
 
-        for i in range(len(check_vals)):
-            if i != 5:
-                with self.subTest("Check action history for failed action", i=i):
-                    self.assertEqual(player.action_history[-1][i], check_vals[i])
-            else:
-                with self.subTest("Check action history for failed action", i=i):
-                    self.assertEqual(player.action_history[-1][i][0], check_vals[i][0])
-                    self.assertEqual(player.action_history[-1][i][1], check_vals[i][1])
+        for field, value in check_vals.items():
+            with self.subTest("Check action history for sexual reproduction", field=field):
+                self.assertEqual(player.action_history[-1][field], value)
+
+        self.assertEqual(player.action_history.offspring.view().tolist(), [11, 12])
 
     def test_update_history_action_fight(self):
         """
@@ -126,14 +146,38 @@ class TestPlayerClass(unittest.TestCase):
         """
 
         player = Player(i=10, log_dir=".", tob=10, energy=200, x=0, y=0)
-        player.states.append([-1, -1])
         player.update_history(action=12, time=10, reward=-2, fight_with=6)
 
-        check_vals = [12, 10, -2, 200, 6, 0, 0, [-1, -1]]
+        check_vals = {"action": 12, "time": 10, "reward": -2, "energy": 200, "enemy": 6,
+                      "num_offspring": -1, "x": 0, "y": 0}
+
+        for field, value in check_vals.items():
+            with self.subTest("Check action history for fight", field=field):
+                self.assertEqual(player.action_history[-1][field], value)
 
-        for i in range(len(check_vals)):
-            with self.subTest("Check action history for failed action", i=i):
-                self.assertEqual(player.action_history[-1][i], check_vals[i])
+    def test_update_history_detail(self):
+        """
+        Test the state captured with every action at summary and none detail
+        """
+
+        for detail, counts in (("summary", (2, 0)), ("none", (-1, -1))):
+            player = Player(i=10, log_dir=".", tob=10, energy=200, x=0, y=0,
+                            history_detail=detail)
+            player.states = np.empty(2, dtype=object)
+            player.states[0] = np.array([3.0, 4.0, 6.0, 8.0])
+            player.states[1] = np.zeros(0)
+            player.update_history(action=8, time=10, reward=0.1)
+
+            with self.subTest("Check captured state", detail=detail):
+                row = player.action_history[-1]
+                self.assertEqual((row["food_count"], row["players_count"]), counts)
+                self.assertEqual(row["food_begin"], -1)
+                self.assertEqual(row["player_nearest"], -1)
+                self.assertEqual(row["food_nearest"], 5 if detail == "summary" else -1)
+                self.assertEqual(len(player.action_history.food_vectors), 0)
+
+        with self.assertRaises(ValueError):
+            Player(i=10, log_dir=".", tob=10, energy=200, history_detail="all")
 
     def test_change_x_position(self):
         """
@@ -252,8 +296,7 @@ class TestPlayerClass(unittest.TestCase):
         for i in range(len(offspring_ids)):
             with self.subTest("Testing offspring ids in asexual reproduction", i=i):
                 self.assertEqual(offspring_ids[i], len_players + i)
-                self.assertEqual(offspring_players[i].action_history[-1][0], 2)
-                self.assertEqual(offspring_players[i].action_history[-1][1], 10)
+                self.assertEqual(offspring_players[i].action_history.parents.tolist(), [[2, 10]])
 
     def test_sexual_reproduction_gen_offspring(self):
         """
@@ -280,10 +323,9 @@ class TestPlayerClass(unittest.TestCase):
         for i in range(len(offspring_ids)):
             with self.subTest("Testing offspring ids in asexual reproduction", i=i):
                 self.assertEqual(offspring_ids[i], len_players + i)
-                self.assertEqual(offspring_players[i].action_history[-1][0][0], 2)
-                self.assertEqual(offspring_players[i].action_history[-1][0][1], 10)
-                self.assertEqual(offspring_players[i].action_history[-1][1][0], 3)
-                self.assertEqual(offspring_players[i].action_history[-1][1][1], 12)
+                self.assertEqual(
+                    offspring_players[i].action_history.parents.tolist(), [[2, 10], [3, 12]]
+                )
 
     def test_sexual_reproduction_no_gen_offspring(self):
         """
@@ -318,12 +360,423 @@ class TestPlayerClass(unittest.TestCase):
         self.assertEqual(player.ingesting_begin_time, 45)
         self.assertEqual(player.ingesting_particle_index, 50)
 
+class TestPopulationClass(unittest.TestCase):
+    def test_add_and_grow(self):
+        """
+        Test adding agents beyond initial capacity
+        """
+
+        population = Population(capacity=2)
+        for i in range(5):
+            population.add(x=i, y=2 * i, energy=200, born_at=i, gender="Male")
+
+        self.assertEqual(len(population), 5)
+        self.assertEqual(population.capacity, 8)
+        self.assertEqual(population.num_alive, 5)
+        self.assertEqual(list(population.x[:5]), [0, 1, 2, 3, 4])
+        self.assertEqual(list(population.gender[:5]), [2] * 5)
+
+    def test_kill(self):
+        """
+        Test killing an agent (and killing it twice)
+        """
+
+        population = Population()
+        population.add()
+        population.add()
+        population.kill(0)
+        population.kill(0)
+
+        self.assertEqual(population.num_alive, 1)
+        self.assertEqual(list(population.alive[:2]), [False, True])
+
+    def test_alive_slots(self):
+        """
+        Test dense list of alive slots and number of leading dead slots
+        """
+
+        population = Population(2)
+        for _ in range(5):
+            population.add()
+
+        population.kill(1)
+        population.kill(0)
+        self.assertEqual(sorted(population.alive_indices()), [2, 3, 4])
+        self.assertEqual(population.leading_dead, 2)
+
+        population.kill(4)
+        population.kill(2)
+        self.assertEqual(list(population.alive_indices()), [3])
+        self.assertEqual(population.leading_dead, 3)
+
+        population.kill(3)
+        population.add()
+        self.assertEqual(list(population.alive_indices()), [5])
+        self.assertEqual(population.leading_dead, 5)
+
+    def test_player_view(self):
+        """
+        Test that a Player reads and writes the population columns
+        """
+
+        population = Population()
+        player = Player(i=0, log_dir=".", tob=10, energy=200, x=5, y=7, population=population)
+        player.energy -= 20
+        population.x[player.slot] = 9
+        player.gender = "Female"
+
+        self.assertEqual(population.energy[player.slot], 180)
+        self.assertEqual(player.playerX, 9)
+        self.assertEqual(population.gender[player.slot], 1)
+
+    def test_adopt(self):
+        """
+        Test moving a player to another population
+        """
+
+        player = Player(i=0, log_dir=".", tob=10, energy=200, x=5, y=7)
+        population = Population()
+        population.add()
+        population.adopt(player)
+
+        self.assertIs(player.population, population)
+        self.assertEqual(player.slot, 1)
+        self.assertEqual(population.born_at[1], 10)
+        self.assertEqual(population.num_alive, 2)
+
+
+class TestGrowableArrayClass(unittest.TestCase):
+    def test_append_extend(self):
+        array = GrowableArray([0, 1], capacity=2)
+        array.append(2)
+        array.extend([3, 4])
+
+        self.assertEqual(len(array), 5)
+        self.assertEqual(len(array.data), 8)
+        self.assertEqual(list(array.view()), [0, 1, 2, 3, 4])
+
+        # Writes through the view change the array
+        array.view()[1] = 10
+        self.assertEqual(array.data[1], 10)
+
+
+class TestEmbeddingStatsClass(unittest.TestCase):
+    def test_update(self):
+        stats = EmbeddingStats(capacity=2, variance=True)
+        stats.grow(3)
+        embeddings = np.random.rand(5, 3, 4).astype(np.float32)
+        for step in embeddings:
+            stats.update([0, 1, 2], step)
+
+        self.assertEqual((stats.capacity, stats.size), (4, 4))
+        self.assertEqual(list(stats.count[:3]), [5, 5, 5])
+        np.testing.assert_allclose(stats.mean[:3], embeddings.mean(axis=0), rtol=1e-5)
+        np.testing.assert_allclose(stats.variance(1), embeddings[:, 1].var(axis=0), atol=1e-5)
+
+        # Agents which didn't act keep a count of zero
+        stats.grow(10)
+        self.assertEqual(stats.count[3], 0)
+        self.assertEqual(stats.mean.shape, (16, 4))
+
+
+class TestFoodFieldClass(unittest.TestCase):
+    def test_extend_eat(self):
+        field = FoodField(capacity=2, spatial_index=SpatialHash(cell_size=100))
+        field.extend([10, 20, 30], [10, 20, 30])
+        field.eat(1)
+
+        self.assertEqual(len(field), 3)
+        self.assertEqual(field.num_uneaten, 2)
+        self.assertEqual(list(field.uneaten_indices()), [0, 2])
+        self.assertEqual(list(field.spatial_index.query(20, 20, 50)), [0, 2])
+        self.assertTrue(np.isnan(field.positions()[0][1]))
+
+        # Particle objects are views over the field
+        particle = Particle(field=field, slot=2)
+        self.assertEqual((particle.particleX, particle.particleY), (30, 30))
+
+    def test_nearest(self):
+        field = FoodField()
+        field.extend([0, 10, 5], [0, 0, 0])
+        field.eat(2)
+
+        self.assertEqual(field.nearest(np.arange(3), 6, 0, 30), 1)
+        self.assertEqual(field.nearest(np.arange(3), 100, 0, 30), -1)
+
+    def test_prune(self):
+        """
+        Test pruning keeps the same particles as comparing every pair in order of slot
+        """
+
+        rng = np.random.default_rng(0)
+        x, y = rng.integers(0, 200, 300), rng.integers(0, 200, 300)
+
+        # Nested loop over all pairs
+        kept = np.ones(300, dtype=bool)
+        for i in range(300):
+            for j in range(300):
+                if i != j and kept[i] and kept[j] and np.hypot(x[i] - x[j], y[i] - y[j]) < 20:
+                    kept[j] = False
+
+        for block_size in (7, 4096):
+            field = FoodField()
+            field.extend(x, y)
+            field.prune(20, block_size=block_size)
+
+            self.assertEqual(list(field.uneaten_indices()), list(np.flatnonzero(kept)))
+
+
+class TestSpatialHashClass(unittest.TestCase):
+    def test_insert_query(self):
+        """
+        Test radius query only returns items from neighbouring cells
+        """
+
+        grid = SpatialHash(cell_size=100)
+        grid.insert(0, 50, 50)
+        grid.insert(1, 150, 60)
+        grid.insert(2, 650, 600)
+
+        self.assertEqual(list(grid.query(60, 60, 100)), [0, 1])
+        self.assertEqual(list(grid.query(600, 600, 100)), [2])
+
+    def test_move_remove(self):
+        """
+        Test moving items across cells and removing them
+        """
+
+        grid = SpatialHash(cell_size=100)
+        grid.insert(0, 50, 50)
+        grid.move(0, 450, 50)
+
+        self.assertEqual(list(grid.query(50, 50, 10)), [])
+        self.assertEqual(list(grid.query(450, 50, 10)), [0])
+
+        grid.remove(0)
+        grid.remove(0)
+
+        self.assertEqual(len(grid), 0)
+        self.assertEqual(grid.cells, {})
+
+    def test_query_wrap(self):
+        """
+        Test radius query wraps around the seams of a toroidal world
+        """
+
+        grid = SpatialHash(cell_size=100, period=(450, 300))
+        grid.insert(0, 440, 10)
+        grid.insert(1, 200, 150)
+
+        self.assertEqual(list(grid.query(5, 295, 30)), [0])
+        self.assertEqual(list(SpatialHash(cell_size=100).query(5, 295, 30)), [])
+
+
+class TestNeighbours(unittest.TestCase):
+    def test_radius_neighbours(self):
+        """
+        Test batched radius query against pairwise distances
+        """
+
+        query_x, query_y = np.array([0, 50, 400]), np.array([0, 0, 400])
+        target_x, target_y = np.array([10, 120, 60, 390]), np.array([0, 0, 5, 400])
+
+        neighbours = radius_neighbours(query_x, query_y, target_x, target_y, 100)
+
+        self.assertEqual(list(neighbours.offsets), [0, 2, 5, 6])
+        self.assertEqual(list(neighbours.row(0)[0]), [0, 2])
+        self.assertEqual(list(neighbours.row(1)[0]), [0, 1, 2])
+        self.assertEqual(list(neighbours.row(2)[0]), [3])
+        self.assertEqual(list(neighbours.row(2)[1]), [10])
+
+    def test_radius_neighbours_exclude_self(self):
+        """
+        Test batched radius query of points against themselves
+        """
+
+        x, y = np.array([0, 5, 500]), np.array([0, 0, 0])
+
+        neighbours = radius_neighbours(x, y, x, y, 10, exclude_self=True)
+
+        self.assertEqual(list(neighbours.counts()), [1, 1, 0])
+        self.assertEqual(list(neighbours.indices), [1, 0])
+
+    def test_radius_neighbours_period(self):
+        """
+        Test neighbours are found across the seams of a toroidal world at the shortest distance
+        """
+
+        x, y = np.array([5, 445, 225]), np.array([5, 295, 150])
+
+        neighbours = radius_neighbours(x, y, x, y, 20, exclude_self=True, period=(450, 300))
+        self.assertEqual(list(neighbours.counts()), [1, 1, 0])
+        self.assertEqual(list(neighbours.indices), [1, 0])
+        self.assertTrue(np.allclose(neighbours.distances, [200 ** (1 / 2)] * 2))
+
+        # A world smaller than the search diameter reports every neighbour once
+        neighbours = radius_neighbours(x, y, x, y, 1000, period=(450, 300))
+        self.assertEqual(list(neighbours.counts()), [3, 3, 3])
+
+    def test_nearest(self):
+        """
+        Test keeping the k nearest neighbours of every query point
+        """
+
+        query_x, query_y = np.array([0, 400]), np.array([0, 400])
+        target_x, target_y = np.array([30, 10, 20, 10, 395]), np.array([0, 0, 0, 0, 400])
+
+        neighbours = radius_neighbours(query_x, query_y, target_x, target_y, 100)
+        nearest, positions = neighbours.nearest(2)
+
+        # Ties are broken by index
+        self.assertEqual(list(nearest.offsets), [0, 2, 3])
+        self.assertEqual(list(nearest.indices), [1, 3, 4])
+        self.assertEqual(list(nearest.distances), [10, 10, 5])
+        self.assertEqual(list(neighbours.indices[positions]), [1, 3, 4])
+
+
+class TestLifeLogClasses(unittest.TestCase):
+    def test_write_read(self):
+        """
+        Test lives written in segments are read back column by column
+        """
+
+        os.mkdir("Players_Data_test")
+        log = LifeLogWriter("Players_Data_test", segment_size=2)
+
+        parent = Player(i=0, log_dir="Players_Data_test", tob=0, energy=200, x=40, y=50)
+        parent.states = np.empty(2, dtype=object)
+        parent.states[0] = np.array([1.0, 2.0, 3.0, 4.0])
+        parent.states[1] = np.array([5.0, 6.0, 1.0])
+        parent.embeddings = np.array([[2.0, 4.0]])
+        parent.update_history(8, 1, 0.1)
+        parent.update_history(10, 2, 1, num_offspring=2, offspring_ids=[1, 2])
+        parent.update_history(12, 3, -0.1)
+        parent.update_history(12, 4, 1, fight_with=2)
+
+        child = Player(i=1, log_dir="Players_Data_test", tob=2, energy=200)
+        child.add_parent(0, 0, mate_id=3, mate_tob=1)
+
+        log.append(parent, 6)
+        log.append(child, 5)
+        log.append(Player(i=2, log_dir="Players_Data_test", tob=2, energy=200), 7)
+        log.flush()
+
+        reader = LifeLogReader("Players_Data_test")
+        self.assertEqual(reader.segments, [0, 1])
+        self.assertEqual(list(reader.agents["index"]), [0, 1, 2])
+
+        actions = reader.actions(0, 0)
+        self.assertEqual(list(actions["action"]), [8, 10, 12, 12])
+        self.assertEqual(list(actions["enemy"]), [-1, -1, -1, 2])
+        self.assertEqual(list(actions["num_offspring"]), [-1, 2, -1, -1])
+        self.assertEqual(reader.children(0, 0), [(2, 1), (2, 2)])
+        self.assertEqual(reader.parents(2, 1), [(0, 0), (1, 3)])
+        self.assertEqual(reader.parents(0, 0), [])
+        self.assertEqual(reader.agent(0, 0)["died_at"], 6)
+
+        food, players = reader.vectors(0, 0)[0]
+        self.assertEqual(food.tolist(), [[1, 2], [3, 4]])
+        self.assertEqual(players.tolist(), [[5, 6, 1]])
+        self.assertEqual(reader.embedding(0, 0).tolist(), [2, 4])
+
+        agents, embeddings = reader.embedding_matrix()
+        self.assertEqual(list(agents["index"]), [0])
+        self.assertEqual(embeddings.tolist(), [[2, 4]])
+
+        # A new writer appends segments after the existing ones
+        LifeLogWriter("Players_Data_test").flush()
+        Player(i=4, log_dir="Players_Data_test", tob=3, energy=200).write_data(3, 0)
+        reader.refresh()
+        self.assertEqual(reader.segments, [0, 1, 2])
+        self.assertTrue((3, 4) in reader)
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_index(self):
+        """
+        Test lookups through the index read the same rows as whole segments
+        """
+
+        os.mkdir("Players_Data_test")
+        log = LifeLogWriter("Players_Data_test", segment_size=3)
+
+        for i in range(7):
+            player = Player(i=i, log_dir="Players_Data_test", tob=i, energy=200)
+            player.states = np.empty(2, dtype=object)
+            player.states[0] = np.arange(2.0 * i)
+            player.states[1] = np.arange(3.0)
+            for t in range(i):
+                player.update_history(8, t, 0.1)
+            player.update_history(10, i, 1, num_offspring=1, offspring_ids=[10 + i])
+            log.append(player, i + 1)
+        log.flush()
+
+        reader = LifeLogReader("Players_Data_test")
+        self.assertEqual(len(reader), 7)
+        self.assertEqual(list(reader.index["segment"]), [0, 0, 0, 1, 1, 1, 2])
+
+        # Rows read with a seek match the columns of the segment
+        columns = reader.columns(1)
+        agent = columns["agents"][1]
+        begin, end = agent["actions_begin"], agent["actions_begin"] + agent["num_actions"]
+        self.assertEqual(reader.actions(4, 4).tobytes(), columns["actions"][begin:end].tobytes())
+        self.assertEqual(reader.agent(4, 4).tobytes(), agent.tobytes())
+        self.assertEqual(reader.children(4, 4), [(4, 14)])
+        self.assertEqual(reader.vectors(5, 5)[-1][0].tolist(), np.arange(10.0).reshape(-1, 2).tolist())
+
+        # Segments missing from the index are indexed from their files
+        reader.close()
+        os.remove(os.path.join("Players_Data_test", INDEX_FILE))
+        reader = LifeLogReader("Players_Data_test")
+        self.assertEqual(len(reader), 7)
+        self.assertEqual(reader.children(6, 6), [(6, 16)])
+        reader.close()
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_background_writer(self):
+        """
+        Test lives queued to the background writer are written in segments on flush and close
+        """
+
+        os.mkdir("Players_Data_test")
+        log = BackgroundLifeLogWriter("Players_Data_test", segment_size=2, max_queued=1)
+
+        for i in range(5):
+            player = Player(i=i, log_dir="Players_Data_test", tob=i, energy=200)
+            player.update_history(8, i, 0.1)
+            log.append(player, i + 1)
+
+        log.flush()
+        self.assertEqual(log.queue_depth(), 0)
+        self.assertEqual(log.max_depth, 1)
+
+        reader = LifeLogReader("Players_Data_test")
+        self.assertEqual(list(reader.agents["index"]), list(range(5)))
+        self.assertEqual(reader.agent(4, 4)["died_at"], 5)
+
+        # Closing writes the remaining lives and stops the thread
+        log.append(Player(i=5, log_dir="Players_Data_test", tob=5, energy=200), 6)
+        log.close()
+        self.assertFalse(log.thread.is_alive())
+        reader.refresh()
+        self.assertTrue((5, 5) in reader)
+
+        # A closed writer refuses lives and flushes instead of waiting forever
+        with self.assertRaisesRegex(RuntimeError, "closed"):
+            log.flush()
+        with self.assertRaisesRegex(RuntimeError, "closed"):
+            log.append(Player(i=6, log_dir="Players_Data_test", tob=6, energy=200), 7)
+        log.close()
+
+        shutil.rmtree("Players_Data_test")
+
+
 class TestPrimaVitaClass(unittest.TestCase):
     def test_initializer(self):
         model = PrimaVita(log_dir_info="test")
 
         self.assertTrue(os.path.exists("Players_Data_test"))
-        self.assertTrue(os.path.exists("Players_Data_test/Embeddings"))
 
         shutil.rmtree("Players_Data_test")
 
@@ -366,6 +819,264 @@ class TestPrimaVitaClass(unittest.TestCase):
 
         shutil.rmtree("Players_Data_test")
 
+    def test_get_current_state_one_pass(self):
+        model = PrimaVita(log_dir_info="test", params_dic={"initial_population": 40})
+
+        # States built in one pass should match states built agent by agent
+        state, _ = model.get_current_state()
+        state = state.copy()
+        model.write_some_states(np.arange(40))
+
+        self.assertEqual(state.dtype, np.float32)
+        self.assertTrue(np.array_equal(state[:, :-2], model.state_buffer[:40, :-2]))
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_get_current_state_nearest(self):
+        model = PrimaVita(log_dir_info="test",
+                          params_dic={"initial_population": 1, "observation": "nearest"})
+
+        model.players = [Player(i=0, log_dir="Players_Data_test", tob=0, x=50, y=500, energy=200),
+                         Player(i=1, log_dir="Players_Data_test", tob=0, x=90, y=500, energy=200),
+                         Player(i=2, log_dir="Players_Data_test", tob=0, x=60, y=500, energy=200)]
+        model.food_particles = [Particle(x=120, y=500), Particle(x=55, y=500)]
+        model.players[1].gender = "Male"
+        model.players[2].gender = "Male"
+        model.time = 0
+
+        # Nearest food particle and player come first
+        state, _ = model.get_current_state()
+        self.assertEqual(list(state[0, :10]), [5, 0, -10, 0, 2, 70, 0, -40, 0, 2])
+
+        with self.assertRaises(ValueError):
+            PrimaVita(log_dir_info="test", params_dic={"observation": "random"})
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_run_stop_conditions(self):
+        model = PrimaVita(log_dir_info="test", params_dic={"initial_population": 5})
+
+        model.run(max_ticks=3)
+        self.assertEqual(model.stop_reason, "max_ticks")
+        self.assertEqual(model.time, 3)
+
+        # Written logs are counted without reading the life log
+        model.kill_player(int(model.alive_agents()[0]))
+        model.life_log.flush()
+        self.assertEqual(model.logs_written, len(LifeLogReader("Players_Data_test")))
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_event_log(self):
+        model = PrimaVita(
+            log_dir_info="test", params_dic={"initial_population": 20, "event_chunk_size": 16}
+        )
+
+        model.run(max_ticks=40)
+        events, ticks = read_events("Players_Data_test"), read_ticks("Players_Data_test")
+
+        # One row of counters per tick, births and deaths add up to the environment's counts
+        self.assertEqual(list(ticks["tick"]), list(range(40)))
+        self.assertEqual(ticks["births"].sum(), model.births)
+        self.assertEqual(ticks["deaths"].sum(), len(model.killed))
+        self.assertEqual(ticks["alive"][-1], model.population.num_alive)
+        self.assertEqual(ticks["food_left"][-1], model.food.num_uneaten)
+
+        # Deaths are in order of death
+        self.assertEqual(list(events["agent"][events["event"] == DEATH]), model.killed)
+        self.assertTrue(np.all(np.diff(events["tick"]) >= 0))
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_profiler(self):
+        model = PrimaVita(
+            log_dir_info="test",
+            params_dic={"initial_population": 5, "profile": True, "tick_mode": "synchronous"},
+        )
+
+        model.run(max_ticks=4)
+        ticks = model.profiler.ticks.view()
+
+        # One record per tick, phases (timed exclusively) fit in the tick
+        self.assertEqual(list(ticks["tick"]), [0, 1, 2, 3])
+        self.assertTrue(np.all(ticks["predict_calls"] == 1))
+        phases = sum(ticks[name] for name in PHASES)
+        self.assertTrue(np.all(phases <= ticks["total"] + 1e-9))
+        self.assertAlmostEqual(sum(p["share"] for p in model.profiler.summary().values()), 1)
+        self.assertIn("predict", model.profiler.report())
+
+        # A disabled profiler records nothing
+        model = PrimaVita(log_dir_info="test", params_dic={"initial_population": 5})
+        model.run(max_ticks=2)
+        self.assertEqual(len(model.profiler.ticks), 0)
+        self.assertIs(model.profiler.phase("predict"), NULL_PHASE)
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_seed(self):
+        def trajectory(seed, **kwargs):
+            model = PrimaVita(
+                log_dir_info="test",
+                params_dic=dict({"initial_population": 20, "seed": seed}, **kwargs),
+            )
+            model.run(max_ticks=15)
+            population = model.population
+            return (
+                population.x[: population.size].copy(),
+                population.energy[: population.size].copy(),
+                read_events(model.log_dir).copy(),
+                model,
+            )
+
+        # Same seed gives the same run whatever the state of the global generators
+        for tick_mode in ("sequential", "synchronous"):
+            with self.subTest("Check same seed", tick_mode=tick_mode):
+                np.random.seed(1)
+                x, energy, events, model = trajectory(3, tick_mode=tick_mode)
+                np.random.seed(2)
+                other_x, other_energy, other_events, _ = trajectory(3, tick_mode=tick_mode)
+                self.assertTrue(np.array_equal(x, other_x))
+                self.assertTrue(np.array_equal(energy, other_energy))
+                self.assertTrue(np.array_equal(events, other_events))
+                self.assertEqual(model.seed, 3)
+
+        # Other seed gives another run
+        self.assertFalse(np.array_equal(trajectory(4)[0], trajectory(5)[0]))
+
+        # Seed is drawn if not given and reset can restart the streams
+        model = PrimaVita(log_dir_info="test", params_dic={"model": None})
+        self.assertIsInstance(model.seed, int)
+        observations, _ = model.reset(seed=6)
+        food = np.array(model.food_positions())
+        other_observations, _ = model.reset(seed=6)
+        self.assertTrue(np.array_equal(observations, other_observations))
+        self.assertTrue(np.array_equal(food, np.array(model.food_positions()), equal_nan=True))
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_compact(self):
+        model = PrimaVita(
+            log_dir_info="test",
+            params_dic={"seed": 1, "initial_population": 20, "initial_energy": 60,
+                        "max_allowed_population": 30},
+        )
+        model.run(max_ticks=40)
+
+        agents = model.alive_agents()
+        born = len(model.players)
+        self.assertGreater(born, len(agents))
+        before = {
+            idx: (
+                model.players[idx],
+                model.population.energy[idx],
+                model.population.embeddings.mean[idx].copy(),
+                model.state_buffer[idx].copy(),
+                model.model.agents[idx].fc1.weight.detach().clone(),
+            )
+            for idx in agents
+        }
+
+        mapping = model.compact()
+
+        # Rows of dead agents are gone everywhere
+        self.assertEqual(list(mapping[agents]), list(range(len(agents))))
+        self.assertTrue(np.all(np.delete(mapping, agents) == -1))
+        self.assertEqual(len(model.players), len(agents))
+        self.assertEqual(model.population.size, len(agents))
+        self.assertLess(model.population.capacity, born)
+        self.assertLess(model.population.embeddings.capacity, born)
+        self.assertLess(model.state_buffer.shape[0], born)
+        self.assertEqual(model.leading_zeros, 0)
+        self.assertEqual(len(model.model.agents), len(agents))
+        self.assertEqual(len(model.model.saved_log_probs), len(agents))
+        self.assertEqual(model.killed, [])
+
+        # Alive agents keep their state and networks under their new ids
+        for idx, (player, energy, embedding, state, weight) in before.items():
+            with self.subTest("Check agent kept", idx=idx):
+                new = mapping[idx]
+                self.assertIs(model.players[new], player)
+                self.assertEqual(player.slot, new)
+                self.assertEqual(model.population.energy[new], energy)
+                self.assertTrue(np.array_equal(model.population.embeddings.mean[new], embedding))
+                self.assertTrue(np.array_equal(model.state_buffer[new], state))
+                self.assertTrue(torch.equal(model.model.agents[new].fc1.weight, weight))
+
+        # The run goes on with the new ids
+        model.run(max_ticks=50)
+        self.assertEqual(model.time, 50)
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_compact_ids(self):
+        model = PrimaVita(
+            log_dir_info="test",
+            params_dic={"seed": 1, "initial_population": 20, "initial_energy": 60,
+                        "max_allowed_population": 30},
+        )
+        model.run(max_ticks=40)
+        next_id = model.next_id
+        model.compact()
+        compacted_at = model.time
+
+        # Offspring born after compaction get new ids, logs use ids agents were born with
+        model.run(max_ticks=70)
+        self.assertGreater(model.next_id, next_id)
+        model.kill_players(model.alive_agents())
+        model.life_log.flush()
+        model.event_log.flush()
+
+        reader = LifeLogReader(model.log_dir)
+        lives = reader.agents
+        ids = {int(index): int(born_at) for born_at, index in zip(lives["born_at"], lives["index"])}
+        self.assertEqual(len(ids), model.next_id)
+
+        # Parents and children of lives born after compaction resolve to each other
+        for born_at, index in zip(lives["born_at"], lives["index"]):
+            if born_at <= compacted_at:
+                continue
+            with self.subTest("Check parents of agent", index=index):
+                for parent in reader.parents(born_at, index):
+                    self.assertEqual(ids[parent[1]], parent[0])
+                    self.assertIn((born_at, index), reader.children(*parent))
+
+        # Agents of events after compaction are agents of the life log
+        events = read_events(model.log_dir)
+        events = events[(events["tick"] > compacted_at) & (events["event"] != INGESTION)]
+        self.assertGreater(len(events), 0)
+        for event in events:
+            self.assertIn(int(event["agent"]), ids)
+            if event["event"] in (SEXUAL_REPRODUCTION, FIGHT):
+                self.assertIn(int(event["other"]), ids)
+            begin = int(event["offspring_begin"])
+            for index in range(begin, begin + int(event["num_offspring"])):
+                self.assertEqual(ids[index], event["tick"])
+
+        reader.close()
+        shutil.rmtree("Players_Data_test")
+
+    def test_save_load(self):
+        model = PrimaVita(log_dir_info="test", params_dic={"initial_population": 10, "seed": 0})
+        model.run(max_ticks=20)
+
+        # The default (background) writer is flushed when pickled and restarted on first use
+        save(model, "test_snapshot")
+        loaded = load("test_snapshot")
+        os.remove("test_snapshot.vita")
+        self.assertIsInstance(loaded.life_log, BackgroundLifeLogWriter)
+        self.assertIsNone(loaded.life_log.thread)
+        self.assertEqual(loaded.time, model.time)
+        self.assertTrue(np.array_equal(loaded.population.x, model.population.x))
+
+        loaded.run(max_ticks=40)
+        loaded.life_log.flush()
+        self.assertTrue(loaded.life_log.thread.is_alive())
+        self.assertEqual(loaded.time, 40)
+        loaded.life_log.close()
+        model.life_log.close()
+
+        shutil.rmtree("Players_Data_test")
+
     def test_update_time(self):
         model = PrimaVita(log_dir_info="test")
 
@@ -390,6 +1101,12 @@ class TestPrimaVitaClass(unittest.TestCase):
         food = model.food_nearby(model.players[0])
         self.assertEqual(food, 0)
 
+        # Test closest food particle is chosen (not the first one in range)
+        model.food_particles = [Particle(x=45, y=502), Particle(x=64, y=514)]
+
+        food = model.food_nearby(model.players[0])
+        self.assertEqual(food, 1)
+
         shutil.rmtree("Players_Data_test")
 
     def test_food_in_env_no_get_idx(self):
@@ -458,6 +1175,85 @@ class TestPrimaVitaClass(unittest.TestCase):
 
         shutil.rmtree("Players_Data_test")
 
+    def test_world_boundary(self):
+        model = PrimaVita(
+            log_dir_info="test",
+            params_dic={"initial_population": 2, "world_width": 500, "world_height": 400,
+                        "boundary": "wrap"},
+        )
+
+        # Players and food lie inside the world
+        self.assertTrue(all(0 <= player.playerX < 500 - 32 for player in model.players))
+        self.assertTrue(all(0 <= player.playerY < 400 - 32 for player in model.players))
+        food_x, food_y = model.food_positions()
+        self.assertTrue(np.nanmax(food_x) < 500 and np.nanmax(food_y) < 400)
+
+        # Moving past an edge comes back on the opposite side
+        model.players = [Player(i=0, log_dir="Players_Data_test", tob=0, x=498, y=2, energy=200),
+                         Player(i=1, log_dir="Players_Data_test", tob=0, x=5, y=395, energy=200)]
+        model.players[0].change_player_xposition(3)
+        model.players[0].change_player_yposition(-3)
+        self.assertEqual((model.players[0].playerX, model.players[0].playerY), (1, 399))
+
+        # Neighbours are seen across the seams
+        vec, distances, env = model.players_in_env(model.players[0], get_idx=True)
+        self.assertEqual(env, [1])
+        self.assertEqual(vec[:2], [-4, 4])
+
+        model.food_particles = [Particle(x=498, y=398)]
+        self.assertEqual(model.food_in_env(model.players[0], get_idx=True)[2], [0])
+        self.assertEqual(model.food_nearby(model.players[0]), 0)
+
+        # A bounded world clamps at its own edges
+        model = PrimaVita(
+            log_dir_info="test", params_dic={"initial_population": 1, "world_width": 2000}
+        )
+        model.players = [Player(i=0, log_dir="Players_Data_test", tob=0, x=1190, y=2, energy=200)]
+        model.players[0].change_player_xposition(1000)
+        self.assertEqual(model.players[0].playerX, 2000 - 32)
+
+        with self.assertRaises(ValueError):
+            PrimaVita(log_dir_info="test", params_dic={"boundary": "reflect"})
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_spatial_hash_matches_scan(self):
+        model = PrimaVita(log_dir_info="test", params_dic={"initial_population": 40})
+        scan = PrimaVita(
+            log_dir_info="test", params_dic={"initial_population": 40, "spatial_hash": False}
+        )
+        scan.players = [Player(i=i, log_dir="Players_Data_test", tob=0, energy=200,
+                               x=model.players[i].playerX, y=model.players[i].playerY)
+                        for i in range(40)]
+        scan.food_particles = model.food_particles
+
+        for i in range(40):
+            with self.subTest("Compare grid and full scan", i=i):
+                self.assertEqual(model.players_in_env(model.players[i], get_idx=True)[2],
+                                 scan.players_in_env(scan.players[i], get_idx=True)[2])
+                self.assertEqual(model.food_in_env(model.players[i], get_idx=True)[2],
+                                 scan.food_in_env(scan.players[i], get_idx=True)[2])
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_neighbour_index(self):
+        model = PrimaVita(log_dir_info="test", params_dic={"initial_population": 40})
+        neighbour_index = model.build_neighbour_index()
+
+        for i in range(40):
+            player = model.players[i]
+            with self.subTest("Compare neighbour index and spatial hash", i=i):
+                self.assertEqual(model.players_in_env(player, get_idx=True),
+                                 model.players_in_env(player, True, neighbour_index))
+                self.assertEqual(model.food_in_env(player, get_idx=True),
+                                 model.food_in_env(player, True, neighbour_index))
+                self.assertEqual(model.food_nearby(player),
+                                 model.food_nearby(player, neighbour_index))
+                self.assertEqual(model.search_enemy(player),
+                                 model.search_enemy(player, neighbour_index))
+
+        shutil.rmtree("Players_Data_test")
+
     def test_search_mate(self):
         model = PrimaVita(log_dir_info="test", params_dic={"initial_population": 3})
 
@@ -504,6 +1300,121 @@ class TestPrimaVitaClass(unittest.TestCase):
 
         shutil.rmtree("Players_Data_test")
 
+    def test_take_actions(self):
+        model = PrimaVita(log_dir_info="test",
+                          params_dic={"initial_population": 4, "tick_mode": "synchronous"})
+
+        model.players = [Player(i=0, log_dir="Players_Data_test", tob=0, x=50, y=500, energy=200),
+                         Player(i=1, log_dir="Players_Data_test", tob=0, x=52, y=500, energy=200),
+                         Player(i=2, log_dir="Players_Data_test", tob=0, x=400, y=300, energy=200),
+                         Player(i=3, log_dir="Players_Data_test", tob=0, x=405, y=300, energy=200)]
+        model.food_particles = [Particle(x=69, y=516)]
+        model.time = 1
+
+        # Players 0 and 1 both eat the same food particle, players 2 and 3 fight each other
+        model.model.predict_actions = lambda indices, states: (
+            np.array([9, 9, 12, 12]), torch.zeros(len(indices), 30)
+        )
+        states, _ = model.get_current_state()
+        model.take_actions(states)
+
+        # Closest player eats the food particle, the other one fails
+        self.assertEqual(model.players[1].ingesting_begin_time, 1)
+        self.assertEqual(model.players[0].ingesting_begin_time, 0)
+        self.assertEqual(model.players[0].energy, 199)
+        self.assertEqual(model.food_particles[0], 0)
+
+        # Mutual attack is a single fight
+        self.assertEqual(model.players[2].energy, 190)
+        self.assertEqual(model.players[3].energy, 190)
+        self.assertEqual(model.model.rewards[3], [10])
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_reset_step(self):
+        model = PrimaVita(log_dir_info="test", params_dic={"initial_population": 10, "model": None})
+
+        observations, agent_ids = model.reset()
+        self.assertEqual(observations.shape, (10, 21))
+        self.assertEqual(list(agent_ids), list(range(10)))
+
+        # Every agent stays, so every agent gets the reward for staying
+        observations, rewards, dones, agent_ids = model.step(np.full(10, 8))
+        self.assertEqual(model.time, 0)
+        self.assertEqual(list(rewards), [0.1] * 10)
+        self.assertFalse(dones.any())
+        self.assertEqual(list(observations[:, -2]), [198] * 10)
+
+        # Dead agents keep their ids and are marked done
+        model.kill_player(3)
+        observations, rewards, dones, agent_ids = model.step(np.full(9, 8))
+        self.assertEqual(list(np.flatnonzero(dones)), [3])
+        self.assertNotIn(3, agent_ids)
+        self.assertEqual(observations[3, -1], -100)
+
+        with self.assertRaises(ValueError):
+            model.step(np.full(10, 8))
+
+        # Environment without a model cannot be run
+        with self.assertRaises(ValueError):
+            model.run()
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_update_lifecycle(self):
+        model = PrimaVita(log_dir_info="test", params_dic={"model": None, "max_age": 5})
+
+        model.players = [Player(i=0, log_dir="Players_Data_test", tob=0, x=50, y=500, energy=200),
+                         Player(i=1, log_dir="Players_Data_test", tob=2, x=400, y=300, energy=200),
+                         Player(i=2, log_dir="Players_Data_test", tob=2, x=410, y=300, energy=10)]
+        model.food_particles = [Particle(x=69, y=516)]
+        model.time = 0
+        model.update_lifecycle()
+
+        # Ingestion begun at time 0 ends at time 1
+        model.ingest_food(0, 0)
+        model.update_lifecycle()
+        self.assertTrue(model.players[0].cannot_move)
+
+        model.time = 1
+        model.update_lifecycle()
+        self.assertFalse(model.players[0].cannot_move)
+        self.assertEqual(model.players[0].food_ate, 1)
+
+        # Agent which ran out of energy in a fight dies
+        model.fight(1, 2)
+        model.update_lifecycle()
+        self.assertEqual(model.players[2], 0)
+        self.assertEqual(model.players[1].energy, 190)
+
+        # Agents die once they reach max_age
+        model.time = 5
+        model.update_lifecycle()
+        self.assertEqual(model.players[0], 0)
+        self.assertNotEqual(model.players[1], 0)
+
+        model.time = 7
+        model.update_lifecycle()
+        self.assertEqual(model.players[1], 0)
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_cull_population(self):
+        model = PrimaVita(log_dir_info="test",
+                          params_dic={"initial_population": 10, "max_allowed_population": 4})
+
+        # Extra agents are killed at once, each exactly once
+        self.assertEqual(model.cull_population(), 6)
+        self.assertEqual(model.population.num_alive, 4)
+        self.assertEqual(len(set(model.killed)), 6)
+        self.assertEqual(model.logs_written, 6)
+        self.assertTrue(all(type(model.model.agents[i]) == int for i in model.killed))
+
+        # Nobody is killed below the cap
+        self.assertEqual(model.cull_population(), 0)
+
+        shutil.rmtree("Players_Data_test")
+
     def test_check_particles(self):
         model = PrimaVita(log_dir_info="test")
 
@@ -516,6 +1427,67 @@ class TestPrimaVitaClass(unittest.TestCase):
 
         shutil.rmtree("Players_Data_test")
 
+    def test_initial_food(self):
+        model = PrimaVita(log_dir_info="test", params_dic={"model": None, "initial_food": 300})
+
+        self.assertEqual(model.number_of_particles, 300)
+        self.assertEqual(len(model.food), 300)
+        model.reset()
+        self.assertEqual(model.number_of_particles, 300)
+
+        with self.assertRaises(ValueError):
+            PrimaVita(log_dir_info="test", params_dic={"initial_food": 0})
+
+        shutil.rmtree("Players_Data_test")
+
+    def test_food_regeneration(self):
+        def min_distance(model):
+            food = model.food.uneaten_indices()
+            x, y = model.food.x[food], model.food.y[food]
+            distances = np.hypot(x[:, None] - x, y[:, None] - y) + np.eye(len(food)) * 1000
+            return distances.min()
+
+        # Threshold regrowth happens once food runs low
+        model = PrimaVita(
+            log_dir_info="test",
+            params_dic={"model": None, "food_regen_mode": "threshold", "food_regen_threshold": 5},
+        )
+        model.update_food()
+        self.assertEqual(len(model.food), model.number_of_particles)
+
+        for i in model.food.uneaten_indices()[4:]:
+            model.food.eat(i)
+        model.update_food()
+        self.assertGreater(model.food.num_uneaten, 4)
+        self.assertGreaterEqual(min_distance(model), 20)
+        self.assertFalse(model.food_regen_condition_is_met)
+
+        # Periodic regrowth happens every food_regen_period ticks
+        model = PrimaVita(
+            log_dir_info="test",
+            params_dic={"model": None, "food_regen_mode": "periodic", "food_regen_period": 5},
+        )
+        model.time = 4
+        self.assertFalse(model.check_food_regen())
+        model.time = 5
+        self.assertTrue(model.check_food_regen())
+
+        # Density regrowth fills cells which are short of food
+        model = PrimaVita(
+            log_dir_info="test",
+            params_dic={"model": None, "food_regen_mode": "density", "food_regen_density": 2},
+        )
+        for i in model.food.uneaten_indices():
+            model.food.eat(i)
+        model.refresh_particles()
+        self.assertGreater(model.food.num_uneaten, 0)
+        self.assertGreaterEqual(min_distance(model), 20)
+
+        with self.assertRaises(ValueError):
+            PrimaVita(log_dir_info="test", params_dic={"food_regen_mode": "always"})
+
+        shutil.rmtree("Players_Data_test")
+
     def test_regenerate_species(self):
         model = PrimaVita(log_dir_info="test")
 
@@ -530,3 +1502,52 @@ class TestPrimaVitaClass(unittest.TestCase):
         
 
         shutil.rmtree("Players_Data_test")
+
+
+class TestSubprocVecPrimaVita(unittest.TestCase):
+    def test_reset_step(self):
+        envs = SubprocVecPrimaVita(2, {"initial_population": 5}, log_dir_info="test", seeds=[0, 1])
+
+        observations, agent_ids = envs.reset()
+        self.assertEqual([o.shape for o in observations], [(5, 21), (5, 21)])
+        self.assertEqual([list(ids) for ids in agent_ids], [list(range(5))] * 2)
+
+        # Every agent stays
+        observations, rewards, dones, agent_ids = envs.step([np.full(5, 8), np.full(5, 8)])
+        for i in range(2):
+            with self.subTest("Check stepped environment", i=i):
+                self.assertEqual(list(rewards[i]), [0.1] * 5)
+                self.assertFalse(dones[i].any())
+                self.assertEqual(list(observations[i][:, -2]), [198] * 5)
+
+        with self.assertRaises(ValueError):
+            envs.step([np.full(4, 8), np.full(5, 8)])
+
+        envs.close()
+
+        shutil.rmtree("Players_Data_test_0")
+        shutil.rmtree("Players_Data_test_1")
+
+    def test_episode_logs(self):
+        envs = SubprocVecPrimaVita(
+            1, {"initial_population": 3, "initial_energy": 4}, log_dir_info="test", seeds=[0]
+        )
+        envs.reset()
+
+        # Populations perish after 2 ticks and environments are reset automatically
+        for _ in range(4):
+            envs.step([np.full(3, 8)])
+        envs.close()
+        self.assertEqual(list(envs.episodes), [2])
+
+        # Every episode keeps its own logs
+        for log_dir in ("Players_Data_test_0", "Players_Data_test_0_episode_1"):
+            with self.subTest("Check episode logs", log_dir=log_dir):
+                reader = LifeLogReader(log_dir)
+                self.assertEqual(len(reader), 3)
+                reader.close()
+                self.assertEqual(np.count_nonzero(read_events(log_dir)["event"] == DEATH), 3)
+
+        shutil.rmtree("Players_Data_test_0")
+        shutil.rmtree("Players_Data_test_0_episode_1")
+        shutil.rmtree("Players_Data_test_0_episode_2")
@@ -31,6 +31,80 @@ class TestReinforceModelClass(unittest.TestCase):
         model.predict_action(0, np.array([0] * 21))
         self.assertEqual(len(model.saved_log_probs[0]), 1)
 
+    def test_predict_actions(self):
+        model = ReinforceModel(initial_population=3, state_size=21, action_size=13)
+
+        actions, embeds = model.predict_actions([0, 2], np.ones((2, 21), dtype=np.float32))
+        self.assertEqual(actions.shape, (2,))
+        self.assertEqual(tuple(embeds.shape), (2, 30))
+        self.assertEqual(len(model.saved_log_probs[0]), 1)
+        self.assertEqual(len(model.saved_log_probs[1]), 0)
+
+        # Gradients flow back to each agent's own weights
+        model.saved_log_probs[2][0].sum().backward()
+        self.assertIsNone(model.agents[1].fc1.weight.grad)
+        self.assertTrue(model.agents[2].fc1.weight.grad.abs().sum() > 0)
+
+    def test_update_all_agents(self):
+        states = np.random.rand(4, 21).astype(np.float32)
+
+        # Batched log probabilities updated with one backward pass give the gradients and weights of
+        # the per-agent path
+        model = ReinforceModel(initial_population=4, state_size=21, action_size=13, seed=0)
+        other_model = ReinforceModel(initial_population=4, state_size=21, action_size=13, seed=0)
+        for t in range(3):
+            model.predict_actions([0, 1, 2, 3], states)
+            other_model.predict_actions([0, 1, 2, 3], states)
+            for idx in range(4):
+                model.update_reward(idx, idx - t)
+                other_model.update_reward(idx, idx - t)
+
+        model.update_all_agents(0)
+        for idx in range(4):
+            other_model.update_single_agent(idx)
+
+        for idx in range(4):
+            with self.subTest("Check gradients and weights of agent", idx=idx):
+                for param, other_param in zip(
+                    model.agents[idx].parameters(), other_model.agents[idx].parameters()
+                ):
+                    self.assertTrue(torch.allclose(param.grad, other_param.grad, atol=1e-6))
+                    self.assertTrue(torch.allclose(param, other_param, atol=1e-6))
+                self.assertEqual(model.saved_log_probs[idx], [])
+
+    def test_seed(self):
+        states = np.random.rand(3, 21).astype(np.float32)
+
+        # Same seed gives same weights and same actions (torch's global generator isn't used)
+        model = ReinforceModel(initial_population=3, state_size=21, action_size=13, seed=0)
+        torch.manual_seed(1)
+        actions = [model.predict_actions([0, 1, 2], states)[0] for _ in range(5)]
+        other_model = ReinforceModel(initial_population=3, state_size=21, action_size=13, seed=0)
+        torch.manual_seed(2)
+        other_actions = [other_model.predict_actions([0, 1, 2], states)[0] for _ in range(5)]
+
+        self.assertTrue(torch.equal(model.agents[2].fc1.weight, other_model.agents[2].fc1.weight))
+        self.assertTrue(np.array_equal(actions, other_actions))
+        self.assertEqual(
+            model.predict_action(1, states[1])[0], other_model.predict_action(1, states[1])[0]
+        )
+
+    def test_compact(self):
+        model = ReinforceModel(initial_population=4, state_size=21, action_size=13)
+        model.predict_action(3, np.ones(21, dtype=np.float32))
+        model.update_reward(3, 1)
+        agent = model.agents[3]
+        model.kill_agents([0, 2])
+
+        model.compact([1, 3])
+
+        self.assertEqual(len(model.agents), 2)
+        self.assertEqual(len(model.optimizers), 2)
+        self.assertEqual(sorted(model.saved_log_probs), [0, 1])
+        self.assertIs(model.agents[1], agent)
+        self.assertEqual(model.rewards[1], [1])
+        self.assertEqual(len(model.saved_log_probs[1]), 1)
+
     def test_update_reward(self):
         model = ReinforceModel(initial_population=2, state_size=21, action_size=13)
 